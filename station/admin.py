@@ -9,6 +9,10 @@ from station.models import (
     Journey,
     Order,
     Ticket,
+    SeatHold,
+    HeldSeat,
+    IdempotencyKey,
+    OrderRequest,
 )
 
 admin.site.register(Station)
@@ -19,3 +23,7 @@ admin.site.register(Train)
 admin.site.register(Journey)
 admin.site.register(Order)
 admin.site.register(Ticket)
+admin.site.register(SeatHold)
+admin.site.register(HeldSeat)
+admin.site.register(IdempotencyKey)
+admin.site.register(OrderRequest)
@@ -0,0 +1,66 @@
+"""
+Concurrent read path for ASGI deployments.
+
+Under ASGI Django runs every synchronous view on one shared thread per
+process (``thread_sensitive=True``), so a slow query in one request stalls
+all the others. ``concurrent_reads`` turns a viewset view into an async
+view that runs safe requests on the thread pool instead, each thread with
+its own database connection, while writes keep Django's default of the
+shared thread. Authentication, throttling, pagination, response caching and
+conditional GET are those of the wrapped viewset.
+
+Django 4.0 has no async ORM (``aget``, ``acount`` and ``aiterator`` arrived
+in 4.1 as thread pool wrappers around the same queries), so the queries
+themselves stay synchronous.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.urls import URLPattern
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _run_read(view, request, *args, **kwargs):
+    try:
+        response = view(request, *args, **kwargs)
+        # Render here rather than back on the shared thread
+        if hasattr(response, "render"):
+            response.render()
+        return response
+    finally:
+        # Pool threads outlive requests, so expire their connections the
+        # way request_finished does for the request thread
+        close_old_connections()
+
+
+def concurrent_reads(view):
+    """Async version of a synchronous view running reads concurrently"""
+    run_read = sync_to_async(_run_read, thread_sensitive=False)
+    run_write = sync_to_async(view, thread_sensitive=True)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await run_read(view, request, *args, **kwargs)
+        return await run_write(request, *args, **kwargs)
+
+    return wrapper
+
+
+def concurrent_read_urls(
+        patterns: list[URLPattern], prefixes: tuple[str, ...]
+) -> list[URLPattern]:
+    """Wrap the views of the url patterns whose route starts with a prefix"""
+    return [
+        URLPattern(
+            pattern.pattern,
+            concurrent_reads(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if isinstance(pattern, URLPattern)
+        and str(pattern.pattern).lstrip("^").startswith(prefixes)
+        else pattern
+        for pattern in patterns
+    ]
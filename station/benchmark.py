@@ -0,0 +1,527 @@
+"""
+Benchmark data and endpoint benchmarks.
+
+``BenchmarkData`` generates a timetable with the skew of real traffic:
+a few hub stations and busy routes carry most journeys, trains leave
+mostly in the morning and evening peaks, and most orders are for one or
+two passengers. ``run_case`` drives an endpoint through the test client
+and records latency percentiles, query counts and peak memory, which
+``compare_reports`` holds against a saved baseline.
+"""
+import random
+import statistics
+import time
+import tracemalloc
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.db import models, transaction
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from station.booking import NotEnoughSeats
+from station.geo import haversine_km
+from station.models import Journey
+from station.occupancy import (
+    find_seat_block,
+    get_bitmap,
+    held_indices,
+    seat_pair,
+)
+from station.query_budget import count_queries
+from station.throttling import clear_throttles
+
+# Password of the users created by seed_benchmark_data
+BENCHMARK_PASSWORD = "benchmark-pass"
+BENCHMARK_EMAIL = "bench-user-{}@example.com"
+
+STATION_BOUNDS = ((44.4, 52.3), (22.1, 40.2))
+# Name: (cargo_num range, places_in_cargo range, average speed in km/h)
+TRAIN_TYPES = {
+    "Regional": ((3, 6), (60, 80), 70),
+    "Intercity": ((6, 10), (50, 60), 120),
+    "Night": ((10, 16), (36, 54), 80),
+    "Express": ((4, 8), (40, 56), 140),
+}
+TRAIN_TYPE_WEIGHTS = (40, 30, 20, 10)
+# Share of departures per hour of the day, peaking at 7-9 and 17-19
+HOUR_WEIGHTS = (
+    1, 1, 1, 1, 2, 4, 8, 12, 12, 8, 6, 5,
+    5, 5, 6, 7, 9, 12, 12, 9, 6, 4, 3, 2,
+)
+PASSENGER_WEIGHTS = {1: 55, 2: 25, 3: 10, 4: 6, 5: 4}
+FIRST_NAMES = (
+    "Anna", "Bohdan", "Daria", "Ivan", "Kateryna", "Mykola", "Olena",
+    "Petro", "Sofia", "Taras", "Yulia", "Andrii",
+)
+LAST_NAMES = (
+    "Bondar", "Franko", "Hrytsenko", "Kovalenko", "Lysenko", "Melnyk",
+    "Moroz", "Shevchenko", "Tkachenko", "Zinchenko",
+)
+
+
+def zipf_weights(size: int, exponent: float = 1.1) -> list[float]:
+    """Popularity of ranked items, the first one the most popular"""
+    return [1 / rank ** exponent for rank in range(1, size + 1)]
+
+
+class BenchmarkData:
+    """Timetable rows in the format of ``TimetableImporter``"""
+
+    def __init__(self, seed: int = 0):
+        self.random = random.Random(seed)
+        self.stations: list[dict] = []
+        self.routes: list[dict] = []
+        self.trains: list[dict] = []
+
+    def generate_stations(self, count: int) -> list[dict]:
+        (lat_low, lat_high), (lon_low, lon_high) = STATION_BOUNDS
+        self.stations = [
+            {
+                "name": f"Station {number:05d}",
+                "latitude": round(self.random.uniform(lat_low, lat_high), 6),
+                "longitude": round(
+                    self.random.uniform(lon_low, lon_high), 6
+                ),
+            }
+            for number in range(1, count + 1)
+        ]
+        return self.stations
+
+    def generate_routes(self, count: int) -> list[dict]:
+        """Routes between stations, hubs being part of most of them"""
+        stations = self.stations
+        count = min(count, len(stations) * (len(stations) - 1))
+        weights = zipf_weights(len(stations))
+        pairs = set()
+
+        while len(pairs) < count:
+            source, destination = self.random.choices(
+                range(len(stations)), weights, k=2
+            )
+            if source == destination:
+                # Hub to hub draws repeat, fall back to any destination
+                destination = self.random.randrange(len(stations))
+            if source != destination:
+                pairs.add((source, destination))
+
+        self.routes = []
+        for source, destination in sorted(pairs):
+            source, destination = stations[source], stations[destination]
+            distance = haversine_km(
+                source["latitude"],
+                source["longitude"],
+                destination["latitude"],
+                destination["longitude"],
+            )
+            self.routes.append(
+                {
+                    "source": source["name"],
+                    "destination": destination["name"],
+                    # Tracks are longer than the straight line
+                    "distance": max(1, round(distance * 1.25)),
+                }
+            )
+        self.random.shuffle(self.routes)
+        return self.routes
+
+    def generate_trains(self, count: int) -> list[dict]:
+        self.trains = []
+        for number in range(1, count + 1):
+            train_type = self.random.choices(
+                list(TRAIN_TYPES), TRAIN_TYPE_WEIGHTS
+            )[0]
+            cargo_num, places_in_cargo, _ = TRAIN_TYPES[train_type]
+            self.trains.append(
+                {
+                    "name": f"{train_type} {number:04d}",
+                    "train_type": train_type,
+                    "cargo_num": self.random.randint(*cargo_num),
+                    "places_in_cargo": self.random.randint(*places_in_cargo),
+                }
+            )
+        return self.trains
+
+    def generate_journeys(
+            self, count: int, start: datetime, days: int
+    ) -> Iterator[dict]:
+        """Journeys over days from start, busy routes most often"""
+        crew = [
+            f"{first_name} {last_name}"
+            for first_name in FIRST_NAMES
+            for last_name in LAST_NAMES
+        ]
+        start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        routes = self.random.choices(
+            self.routes, zipf_weights(len(self.routes), 0.8), k=count
+        )
+
+        for route in routes:
+            train = self.random.choice(self.trains)
+            speed = TRAIN_TYPES[train["train_type"]][2]
+            departure_time = start + timedelta(
+                days=self.random.randrange(days),
+                hours=self.random.choices(range(24), HOUR_WEIGHTS)[0],
+                minutes=self.random.choice((0, 15, 30, 45)),
+            )
+            arrival_time = departure_time + timedelta(
+                minutes=round(route["distance"] / speed * 60) + 10
+            )
+            yield {
+                "source": route["source"],
+                "destination": route["destination"],
+                "train": train["name"],
+                "departure_time": departure_time.isoformat(),
+                "arrival_time": arrival_time.isoformat(),
+                "crew": self.random.sample(crew, self.random.randint(2, 4)),
+            }
+
+    def generate_tickets(
+            self,
+            orders: int,
+            users: list[int],
+            journeys: list[tuple[int, int]],
+    ) -> Iterator[tuple[int, int, list[int]]]:
+        """
+        (user id, journey id, seat indices) per order, out of (journey id,
+        capacity) pairs. Frequent travellers and popular journeys order
+        the most, sold out journeys are passed over.
+        """
+        user_weights = list(accumulate(zipf_weights(len(users), 0.7)))
+        journey_weights = list(accumulate(zipf_weights(len(journeys), 0.6)))
+        passengers = list(accumulate(PASSENGER_WEIGHTS.values()))
+        taken = {}
+
+        for _ in range(orders):
+            count = self.random.choices(
+                list(PASSENGER_WEIGHTS), cum_weights=passengers
+            )[0]
+            for _ in range(10):
+                journey_id, capacity = self.random.choices(
+                    journeys, cum_weights=journey_weights
+                )[0]
+                seats = taken.setdefault(journey_id, set())
+                if capacity - len(seats) >= count:
+                    break
+            else:
+                continue
+
+            indices = []
+            while len(indices) < count:
+                index = self.random.randrange(capacity)
+                if index not in seats:
+                    seats.add(index)
+                    indices.append(index)
+            yield (
+                self.random.choices(users, cum_weights=user_weights)[0],
+                journey_id,
+                indices,
+            )
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    path: str
+    method: str = "get"
+    data: dict | None = None
+    authenticated: bool = True
+    # Writes run in a transaction that is rolled back after each request
+    rollback: bool = False
+
+
+@dataclass
+class CaseResult:
+    method: str
+    path: str
+    status: int
+    requests: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    queries: int
+    peak_memory_kb: float
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "requests": self.requests,
+            "errors": self.errors,
+            "mean_ms": round(self.mean_ms, 3),
+            "p50_ms": round(self.p50_ms, 3),
+            "p90_ms": round(self.p90_ms, 3),
+            "p99_ms": round(self.p99_ms, 3),
+            "queries": self.queries,
+            "peak_memory_kb": round(self.peak_memory_kb, 1),
+        }
+
+
+def benchmark_cases(user) -> list[BenchmarkCase]:
+    """
+    Requests to every endpoint a passenger uses, against the busiest
+    upcoming journey that still seats two. Raises ``NotEnoughSeats`` when
+    there is no such journey.
+    """
+    journey = (
+        Journey.objects.select_related("train", "route__source", "seat_map")
+        .filter(
+            departure_time__gte=timezone.now(),
+            seats_sold__lte=(
+                models.F("train__cargo_num")
+                * models.F("train__places_in_cargo")
+                - 2
+            ),
+        )
+        .order_by("-seats_sold", "id")
+        .first()
+    )
+    if journey is None:
+        raise NotEnoughSeats(0)
+
+    train = journey.train
+    index = find_seat_block(
+        get_bitmap(journey),
+        held_indices(journey.id, train.places_in_cargo),
+        train.cargo_num,
+        train.places_in_cargo,
+        1,
+    )[0]
+    cargo, seat = seat_pair(index, train.places_in_cargo)
+    route = journey.route
+    day = timezone.localdate(journey.departure_time).isoformat()
+    refresh = RefreshToken.for_user(user)
+
+    def url(name: str, *args) -> str:
+        return reverse(name, args=args)
+
+    return [
+        BenchmarkCase("train_types", url("station:traintype-list")),
+        BenchmarkCase("trains", url("station:train-list")),
+        BenchmarkCase("train", url("station:train-detail", train.id)),
+        BenchmarkCase("crews", url("station:crew-list")),
+        BenchmarkCase("stations", url("station:station-list")),
+        BenchmarkCase(
+            "stations_nearby",
+            f"{url('station:station-nearby')}?lat={route.source.latitude}"
+            f"&lon={route.source.longitude}",
+        ),
+        BenchmarkCase("routes", url("station:route-list")),
+        BenchmarkCase("journeys", url("station:journey-list")),
+        BenchmarkCase(
+            "journeys_filtered",
+            f"{url('station:journey-list')}?source={route.source_id}"
+            f"&departure_from={day}",
+        ),
+        BenchmarkCase("journey", url("station:journey-detail", journey.id)),
+        BenchmarkCase(
+            "journey_seat_map", url("station:journey-seat-map", journey.id)
+        ),
+        BenchmarkCase(
+            "journey_connections",
+            f"{url('station:journey-connections')}?from={route.source_id}"
+            f"&to={route.destination_id}&date={day}",
+        ),
+        BenchmarkCase(
+            "journeys_export",
+            f"{url('station:journey-export')}?output=ndjson",
+        ),
+        BenchmarkCase("orders", url("station:order-list")),
+        BenchmarkCase(
+            "order_create",
+            url("station:order-list"),
+            method="post",
+            data={
+                "tickets": [
+                    {"journey": journey.id, "cargo": cargo, "seat": seat}
+                ]
+            },
+            rollback=True,
+        ),
+        BenchmarkCase(
+            "order_create_group",
+            url("station:order-list"),
+            method="post",
+            data={"journey": journey.id, "passengers": 2},
+            rollback=True,
+        ),
+        BenchmarkCase(
+            "orders_export", f"{url('station:order-export')}?output=ndjson"
+        ),
+        BenchmarkCase("holds", url("station:seathold-list")),
+        BenchmarkCase(
+            "hold_create",
+            url("station:seathold-list"),
+            method="post",
+            data={
+                "journey": journey.id,
+                "seats": [{"cargo": cargo, "seat": seat}],
+            },
+            rollback=True,
+        ),
+        BenchmarkCase(
+            "user_register",
+            url("user:create"),
+            method="post",
+            data={
+                "email": "bench-register@example.com",
+                "password": BENCHMARK_PASSWORD,
+            },
+            authenticated=False,
+            rollback=True,
+        ),
+        BenchmarkCase(
+            "user_token",
+            url("user:token_obtain_pair"),
+            method="post",
+            data={"email": user.email, "password": BENCHMARK_PASSWORD},
+            authenticated=False,
+        ),
+        BenchmarkCase(
+            "user_token_refresh",
+            url("user:token_refresh"),
+            method="post",
+            data={"refresh": str(refresh)},
+            authenticated=False,
+        ),
+        BenchmarkCase(
+            "user_token_verify",
+            url("user:token_verify"),
+            method="post",
+            data={"token": str(refresh.access_token)},
+            authenticated=False,
+        ),
+        BenchmarkCase("user_me", url("user:manage")),
+    ]
+
+
+def reset_throttles(user_id: int | None) -> None:
+    """
+    Forget the request history of the throttles, so a benchmark measures
+    the endpoint rather than 429 responses.
+    """
+    clear_throttles("127.0.0.1", *([] if user_id is None else [user_id]))
+
+
+def _send(client: Client, case: BenchmarkCase, headers: dict) -> int:
+    send = getattr(client, case.method)
+    if case.method == "get":
+        response = send(case.path, **headers)
+    else:
+        response = send(
+            case.path, case.data, content_type="application/json", **headers
+        )
+    if response.streaming:
+        # The body is produced while it is read
+        for _ in response.streaming_content:
+            pass
+    return response.status_code
+
+
+def run_case(
+        case: BenchmarkCase,
+        iterations: int,
+        warmup: int = 2,
+        headers: dict | None = None,
+        user_id: int | None = None,
+) -> CaseResult:
+    """
+    Time iterations requests of a case after warmup ones. Peak memory is
+    measured on a separate request, tracemalloc slowing down the others.
+    """
+    client = Client()
+    headers = headers if case.authenticated else {}
+
+    def request() -> int:
+        reset_throttles(user_id if case.authenticated else None)
+        if not case.rollback:
+            return _send(client, case, headers or {})
+        with transaction.atomic():
+            status = _send(client, case, headers or {})
+            transaction.set_rollback(True)
+        return status
+
+    for _ in range(warmup):
+        request()
+
+    latencies = []
+    statuses = []
+    queries = []
+    for _ in range(iterations):
+        with count_queries() as counter:
+            start = time.perf_counter()
+            statuses.append(request())
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+
+    tracemalloc.start()
+    try:
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    percentiles = (
+        statistics.quantiles(latencies, n=100, method="inclusive")
+        if len(latencies) > 1
+        else latencies * 99
+    )
+    return CaseResult(
+        method=case.method.upper(),
+        path=case.path,
+        status=statistics.mode(statuses),
+        requests=iterations,
+        errors=sum(status >= 400 for status in statuses),
+        mean_ms=statistics.fmean(latencies),
+        p50_ms=percentiles[49],
+        p90_ms=percentiles[89],
+        p99_ms=percentiles[98],
+        queries=round(statistics.median(queries)),
+        peak_memory_kb=peak / 1024,
+    )
+
+
+# Metrics compared with a baseline and the change that counts as worse
+COMPARED_METRICS = ("p50_ms", "p90_ms", "queries", "peak_memory_kb")
+
+
+def compare_reports(
+        report: dict, baseline: dict, max_regression: float
+) -> list[dict]:
+    """
+    Per case and metric, the baseline and current values with their change
+    in percent. Latency and memory regress when they grow by more than
+    max_regression percent, queries whenever there are more of them.
+    """
+    rows = []
+    for name, result in report["cases"].items():
+        before = baseline.get("cases", {}).get(name)
+        if before is None:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), result[metric]
+            if old is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            regressed = (
+                new > old if metric == "queries"
+                else change > max_regression
+            )
+            rows.append(
+                {
+                    "case": name,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change,
+                    "regressed": regressed,
+                }
+            )
+    return rows
@@ -0,0 +1,193 @@
+"""
+Orders and temporary seat holds.
+
+Everything that sells or reserves seats of a journey runs under the lock of
+its ``SeatMap`` row, taken in journey id order. A seat is therefore never
+held and sold at once, a conflict is found before any row is written, and a
+confirmed hold becomes an order in the transaction that removes it.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from station.metrics import ORDERS_CREATED, TICKETS_SOLD
+from station.models import HeldSeat, Journey, Order, SeatHold, SeatMap, Ticket
+from station.occupancy import (
+    book_seats,
+    check_available,
+    find_seat_block,
+    free_runs,
+    held_indices,
+    lock_seat_map,
+    seat_pair,
+)
+
+
+class HoldExpiredError(Exception):
+    pass
+
+
+class NotEnoughSeats(Exception):
+    def __init__(self, available: int):
+        super().__init__(available)
+        self.available = available
+
+
+def create_order(tickets: list[dict], **order_fields) -> Order:
+    """
+    Create an order with its tickets, booking their seats first.
+    Raises ``SeatsTaken`` when any of them is sold or held by someone else.
+    """
+    with transaction.atomic():
+        order = Order.objects.create(**order_fields)
+        tickets = [Ticket(order=order, **ticket) for ticket in tickets]
+
+        # bulk_create skips the signals that keep the seat maps in step
+        seats = defaultdict(list)
+        for ticket in tickets:
+            seats[ticket.journey_id].append((ticket.cargo, ticket.seat))
+        for journey_id in sorted(seats):
+            book_seats(journey_id, seats[journey_id], check_taken=True)
+
+        Ticket.objects.bulk_create(tickets)
+
+        def count_order(sold=len(tickets)):
+            ORDERS_CREATED.inc()
+            TICKETS_SOLD.inc(sold)
+
+        transaction.on_commit(count_order)
+
+    return order
+
+
+def create_group_order(
+        journey: Journey, passengers: int, **order_fields
+) -> Order:
+    """
+    Order tickets for a group, picking the seats with ``find_seat_block``
+    under the seat map lock. Raises ``NotEnoughSeats`` when the journey has
+    fewer free seats than passengers.
+    """
+    with transaction.atomic():
+        seat_map = lock_seat_map(journey.id)
+        train = seat_map.journey.train
+        blocked = held_indices(journey.id, train.places_in_cargo)
+
+        indices = find_seat_block(
+            seat_map.bitmap,
+            blocked,
+            train.cargo_num,
+            train.places_in_cargo,
+            passengers,
+        )
+        if indices is None:
+            runs = free_runs(
+                seat_map.bitmap,
+                blocked,
+                train.cargo_num,
+                train.places_in_cargo,
+            )
+            raise NotEnoughSeats(
+                sum(length for cargo in runs for _, length in cargo)
+            )
+
+        tickets = []
+        for index in indices:
+            cargo, seat = seat_pair(index, train.places_in_cargo)
+            tickets.append(
+                {"journey_id": journey.id, "cargo": cargo, "seat": seat}
+            )
+
+        return create_order(tickets, **order_fields)
+
+
+def place_hold(
+        user,
+        journey: Journey,
+        seats: list[tuple[int, int]],
+        ttl: int | None = None,
+) -> SeatHold:
+    """
+    Hold seats of a journey for ttl seconds (``SEAT_HOLD_TTL`` by default).
+    Raises ``SeatsTaken`` when any of them is sold or held already.
+    """
+    ttl = settings.SEAT_HOLD_TTL if ttl is None else ttl
+
+    with transaction.atomic():
+        seat_map = lock_seat_map(journey.id)
+        check_available(seat_map, seats)
+
+        now = timezone.now()
+        # Expired holds are ignored but still own their unique seat rows
+        SeatHold.objects.filter(journey=journey, expires_at__lte=now).delete()
+
+        hold = SeatHold.objects.create(
+            user=user, journey=journey, expires_at=now + timedelta(seconds=ttl)
+        )
+        HeldSeat.objects.bulk_create(
+            HeldSeat(hold=hold, journey=journey, cargo=cargo, seat=seat)
+            for cargo, seat in seats
+        )
+
+    return hold
+
+
+def confirm_hold(hold: SeatHold) -> Order:
+    """
+    Turn a hold into an order of its seats. Raises ``HoldExpiredError``
+    when the hold expired before it was confirmed.
+    """
+    with transaction.atomic():
+        lock_seat_map(hold.journey_id)
+        hold = SeatHold.objects.select_for_update().get(pk=hold.pk)
+        if hold.expires_at <= timezone.now():
+            raise HoldExpiredError(hold.pk)
+
+        tickets = [
+            {"journey_id": hold.journey_id, "cargo": cargo, "seat": seat}
+            for cargo, seat in hold.seats.values_list("cargo", "seat")
+        ]
+        hold.delete()
+
+        return create_order(tickets, user_id=hold.user_id)
+
+
+def sweep_expired_holds(
+        batch_size: int = 1000, now: datetime | None = None
+) -> int:
+    """
+    Delete holds expired before now, a batch of journeys per transaction.
+    Journeys whose seat map is locked by a booking are skipped, their
+    holds are picked up by the next sweep.
+    """
+    now = now or timezone.now()
+    expired = SeatHold.objects.filter(expires_at__lte=now)
+    deleted = 0
+
+    while True:
+        with transaction.atomic():
+            journey_ids = list(
+                SeatMap.objects.select_for_update(skip_locked=True)
+                .filter(journey_id__in=expired.values("journey_id"))
+                .order_by("journey_id")
+                .values_list("journey_id", flat=True)[:batch_size]
+            )
+            if not journey_ids:
+                break
+
+            deleted += _delete_holds(
+                expired.filter(journey_id__in=journey_ids)
+            )
+
+    # Holds of journeys without a seat map are never booked against
+    return deleted + _delete_holds(
+        expired.filter(journey__seat_map__isnull=True)
+    )
+
+
+def _delete_holds(holds) -> int:
+    _, deleted = holds.delete()
+    return deleted.get(SeatHold._meta.label, 0)
@@ -0,0 +1,96 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY_PREFIX = "station:version:"
+RESPONSE_KEY_PREFIX = "station:response:"
+
+
+def _version_key(name: str) -> str:
+    return f"{VERSION_KEY_PREFIX}{name}"
+
+
+def get_versions(*names: str) -> dict[str, int]:
+    """
+    Return the current version of every name, initialising missing ones.
+
+    Versions start from a nanosecond timestamp instead of 1, so a version
+    lost to eviction or a cache restart never repeats an older value.
+    """
+    keys = {_version_key(name): name for name in names}
+    versions = cache.get_many(keys)
+
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def get_version(name: str) -> int:
+    return get_versions(name)[name]
+
+
+def bump_version(name: str) -> int:
+    """Invalidate everything cached under the previous version of name"""
+    key = _version_key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def model_version_name(model) -> str:
+    return model._meta.label_lower
+
+
+def bump_version_on_commit(name: str) -> None:
+    """
+    Bump right away, so the writing transaction sees its own change, and
+    again after commit, dropping anything other requests cached from the
+    not yet committed state in between.
+    """
+    bump_version(name)
+    transaction.on_commit(lambda: bump_version(name))
+
+
+def cache_response(method):
+    """
+    Cache the data of a successful viewset ``list`` or ``retrieve``
+    response under the versions of the view's ``cache_models``.
+
+    Every save or delete of one of those models bumps its version, so an
+    entry is never served stale and the timeout only bounds memory use.
+    """
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        names = [model_version_name(model) for model in self.cache_models]
+        versions = get_versions(*names)
+        url_hash = hashlib.sha1(
+            request.build_absolute_uri().encode()
+        ).hexdigest()
+        key = (
+            f"{RESPONSE_KEY_PREFIX}{type(self).__name__}:{self.action}:"
+            f"{':'.join(str(versions[name]) for name in names)}:{url_hash}"
+        )
+
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+
+        return response
+
+    return wrapper
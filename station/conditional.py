@@ -0,0 +1,78 @@
+"""
+Conditional GET for viewset actions.
+
+A view declares a cheap ``state`` function returning the version stamp of
+what it is about to serialize. ``If-None-Match`` and ``If-Modified-Since``
+are answered with 304 from that stamp alone, before the response is built.
+"""
+import hashlib
+from datetime import datetime
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+
+def latest(*moments: datetime | None) -> datetime | None:
+    return max((moment for moment in moments if moment), default=None)
+
+
+def make_etag(request, *parts) -> str:
+    """
+    Strong ETag over the version stamp and everything else the
+    representation depends on: the URL (host, query, pagination) and the
+    negotiated media type.
+    """
+    digest = hashlib.sha1(
+        "|".join(
+            [
+                request.build_absolute_uri(),
+                getattr(request, "accepted_media_type", "") or "",
+                *map(str, parts),
+            ]
+        ).encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def conditional_get(state: str):
+    """
+    Decorate a viewset action with the name of a view method
+    ``state(request, *args, **kwargs)`` returning ``(etag_parts,
+    last_modified)``, or None when there is nothing to compare.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            current = getattr(self, state)(request, *args, **kwargs)
+            if current is None:
+                return method(self, request, *args, **kwargs)
+
+            parts, last_modified = current
+            etag = make_etag(request, *parts)
+            timestamp = (
+                int(last_modified.timestamp())
+                if isinstance(last_modified, datetime) else None
+            )
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+
+            if response.status_code in (
+                status.HTTP_200_OK,
+                status.HTTP_304_NOT_MODIFIED,
+            ):
+                response["ETag"] = etag
+                if timestamp is not None:
+                    response["Last-Modified"] = http_date(timestamp)
+
+            return response
+
+        return wrapper
+
+    return decorator
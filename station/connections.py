@@ -0,0 +1,282 @@
+"""
+Multi-leg connection search over an in-memory journey graph.
+
+Each service day (the local date of departure) is loaded once per process
+as a graph whose nodes are stations and whose edges are journeys, sorted by
+departure time. Graphs are tagged with a shared cache version: the process
+that changes a journey patches its own graph in place and bumps the
+version, every other process rebuilds the day on its next search.
+"""
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, NamedTuple
+
+from django.utils import timezone
+
+from station.cache import bump_version, get_versions
+from station.models import Journey
+
+# Journeys of the next day are searched too, so overnight legs connect
+SEARCH_DAYS = 2
+MIN_TRANSFER_TIME = timedelta(minutes=5)
+MAX_TRANSFERS = 5
+MAX_CACHED_DAYS = 31
+
+GRAPH_VERSION = "connections"
+
+_LEG_FIELDS = (
+    "id",
+    "route__source_id",
+    "route__source__name",
+    "route__destination_id",
+    "route__destination__name",
+    "departure_time",
+    "arrival_time",
+    "train__name",
+)
+
+
+class Leg(NamedTuple):
+    journey_id: int
+    source_id: int
+    source_name: str
+    destination_id: int
+    destination_name: str
+    departure_time: datetime
+    arrival_time: datetime
+    train_name: str
+
+
+class Itinerary:
+    def __init__(self, legs: list[Leg]):
+        self.legs = legs
+
+    @property
+    def departure_time(self) -> datetime:
+        return self.legs[0].departure_time
+
+    @property
+    def arrival_time(self) -> datetime:
+        return self.legs[-1].arrival_time
+
+    @property
+    def transfers(self) -> int:
+        return len(self.legs) - 1
+
+
+class ServiceDayGraph:
+    def __init__(self, day: date, legs: list[Leg]):
+        self.day = day
+        self._departures: dict[int, list[Leg]] = defaultdict(list)
+        self._times: dict[int, list[datetime]] = defaultdict(list)
+        self._stations: dict[int, int] = {}
+
+        for leg in sorted(legs, key=lambda leg: leg.departure_time):
+            self._departures[leg.source_id].append(leg)
+            self._times[leg.source_id].append(leg.departure_time)
+            self._stations[leg.journey_id] = leg.source_id
+
+    def __contains__(self, journey_id: int) -> bool:
+        return journey_id in self._stations
+
+    def departures_after(self, station_id: int, moment: datetime):
+        """Journeys leaving station_id at or after moment"""
+        legs = self._departures.get(station_id, [])
+        start = bisect_left(self._times.get(station_id, []), moment)
+        return legs[start:]
+
+    def add(self, leg: Leg) -> None:
+        self.remove(leg.journey_id)
+        times = self._times[leg.source_id]
+        position = bisect_left(times, leg.departure_time)
+        times.insert(position, leg.departure_time)
+        self._departures[leg.source_id].insert(position, leg)
+        self._stations[leg.journey_id] = leg.source_id
+
+    def remove(self, journey_id: int) -> None:
+        station_id = self._stations.pop(journey_id, None)
+        if station_id is None:
+            return
+
+        legs = self._departures[station_id]
+        for position, leg in enumerate(legs):
+            if leg.journey_id == journey_id:
+                del legs[position]
+                del self._times[station_id][position]
+                return
+
+
+def service_day(moment: datetime) -> date:
+    if timezone.is_naive(moment):
+        return moment.date()
+
+    return timezone.localtime(moment).date()
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    end = timezone.make_aware(
+        datetime.combine(day + timedelta(days=1), time.min)
+    )
+    return start, end
+
+
+def _day_version(day: date) -> str:
+    return f"{GRAPH_VERSION}:{day.isoformat()}"
+
+
+def _version_names(day: date) -> tuple[str, str]:
+    return GRAPH_VERSION, _day_version(day)
+
+
+def load_legs(queryset) -> Iterator[Leg]:
+    for row in queryset.values_list(*_LEG_FIELDS):
+        yield Leg(*row)
+
+
+class GraphCache:
+    """Process-local service day graphs checked against shared versions"""
+
+    def __init__(self):
+        self._graphs: dict[date, tuple[tuple, ServiceDayGraph]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, day: date) -> ServiceDayGraph:
+        versions = get_versions(*_version_names(day))
+        version = tuple(versions[name] for name in _version_names(day))
+
+        cached = self._graphs.get(day)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        start, end = day_bounds(day)
+        graph = ServiceDayGraph(
+            day,
+            list(load_legs(
+                Journey.objects.filter(
+                    departure_time__gte=start, departure_time__lt=end
+                )
+            )),
+        )
+        with self._lock:
+            self._graphs.pop(day, None)
+            while len(self._graphs) >= MAX_CACHED_DAYS:
+                del self._graphs[next(iter(self._graphs))]
+            self._graphs[day] = (version, graph)
+
+        return graph
+
+    def journey_changed(
+            self, journey_id: int, days: set[date], leg: Leg | None
+    ) -> None:
+        """
+        Remove a changed journey from the days it left and re-add it to
+        its current day. A local graph is only patched when nobody else
+        bumped its version in between, otherwise it is dropped.
+        """
+        for day in days:
+            new_version = bump_version(_day_version(day))
+            with self._lock:
+                cached = self._graphs.pop(day, None)
+                if cached is None:
+                    continue
+
+                (global_version, day_version), graph = cached
+                if new_version != day_version + 1:
+                    continue
+
+                graph.remove(journey_id)
+                if leg is not None and service_day(leg.departure_time) == day:
+                    graph.add(leg)
+                self._graphs[day] = ((global_version, new_version), graph)
+
+    def clear(self) -> None:
+        """Forget every graph, e.g. after stations or routes changed"""
+        bump_version(GRAPH_VERSION)
+        with self._lock:
+            self._graphs.clear()
+
+
+graphs = GraphCache()
+
+
+def find_connections(
+        origin_id: int,
+        destination_id: int,
+        day: date,
+        max_transfers: int = 3,
+) -> list[Itinerary]:
+    """
+    Round-based earliest-arrival search (RAPTOR style) from the start of
+    day. Round k finds the best arrival using k + 1 journeys, so the result
+    holds one itinerary per transfer count that arrives strictly earlier
+    than every itinerary with fewer transfers: the first one has the
+    minimum number of transfers, the last one the earliest arrival.
+    """
+    if origin_id == destination_id:
+        return []
+
+    day_graphs = [
+        graphs.get(day + timedelta(days=offset))
+        for offset in range(SEARCH_DAYS)
+    ]
+    start, _ = day_bounds(day)
+
+    best = {origin_id: start}
+    # rounds[k] maps every station improved in round k to the leg used
+    rounds: list[dict[int, Leg | None]] = [{origin_id: None}]
+    itineraries = []
+
+    for k in range(1, max_transfers + 2):
+        improved: dict[int, Leg] = {}
+        for station_id in rounds[-1]:
+            ready = best[station_id]
+            if k > 1:
+                ready += MIN_TRANSFER_TIME
+
+            for graph in day_graphs:
+                for leg in graph.departures_after(station_id, ready):
+                    target_best = best.get(destination_id)
+                    if target_best and leg.arrival_time >= target_best:
+                        continue
+
+                    current = improved.get(leg.destination_id)
+                    arrival = (
+                        current.arrival_time if current
+                        else best.get(leg.destination_id)
+                    )
+                    if arrival is None or leg.arrival_time < arrival:
+                        improved[leg.destination_id] = leg
+
+        if not improved:
+            break
+
+        for station_id, leg in improved.items():
+            best[station_id] = leg.arrival_time
+        rounds.append(improved)
+
+        if destination_id in improved:
+            itineraries.append(
+                Itinerary(_trace(rounds, origin_id, destination_id))
+            )
+
+    return itineraries
+
+
+def _trace(
+        rounds: list[dict[int, Leg | None]], origin_id: int, station_id: int
+) -> list[Leg]:
+    legs = []
+    k = len(rounds) - 1
+    while station_id != origin_id:
+        while station_id not in rounds[k]:
+            k -= 1
+        leg = rounds[k][station_id]
+        legs.append(leg)
+        station_id = leg.source_id
+        k -= 1
+
+    legs.reverse()
+    return legs
@@ -0,0 +1,53 @@
+from django.core.exceptions import RequestDataTooBig
+from rest_framework import status
+from rest_framework.exceptions import APIException, ErrorDetail
+
+
+def _seats(pairs) -> list[dict]:
+    return [{"cargo": cargo, "seat": seat} for cargo, seat in pairs]
+
+
+class SeatConflict(APIException):
+    """
+    Some of the requested seats were sold or held by someone else.
+    The response lists them together with free seats close to them.
+    """
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Some of the requested seats are no longer available."
+    default_code = "seat_conflict"
+
+    def __init__(self, seats=(), alternatives=(), detail=None):
+        super().__init__()
+        self.detail = {
+            "detail": ErrorDetail(
+                detail or self.default_detail, self.default_code
+            ),
+            "seats": _seats(seats),
+            "alternatives": _seats(alternatives),
+        }
+
+
+class HoldExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "The seat hold has expired."
+    default_code = "hold_expired"
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = (
+        "The Idempotency-Key was already used for a different request."
+    )
+    default_code = "idempotency_key_reused"
+
+
+class UploadTooLarge(RequestDataTooBig, APIException):
+    """
+    A request body or file over MAX_UPLOAD_SIZE. API views answer 413,
+    outside of them it is the RequestDataTooBig Django answers with 400.
+    """
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "The upload is too large."
+    default_code = "upload_too_large"
@@ -0,0 +1,191 @@
+"""
+Streaming exports of journeys and orders as NDJSON or CSV.
+
+Rows are read with ``values_list().iterator()`` a chunk at a time and
+encoded one by one into the response, so memory stays flat no matter how
+many rows are exported. Values are formatted like the API formats them.
+"""
+import csv
+import json
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import serializers
+
+from station.models import Journey
+
+EXPORT_CHUNK_SIZE = 2000
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+JOURNEY_FIELDS = (
+    "id",
+    "route",
+    "train_name",
+    "departure_time",
+    "arrival_time",
+    "crew",
+    "tickets_available",
+)
+TICKET_FIELDS = (
+    "order",
+    "created_at",
+    "ticket",
+    "journey",
+    "route",
+    "train_name",
+    "departure_time",
+    "arrival_time",
+    "cargo",
+    "seat",
+)
+
+_datetime_field = serializers.DateTimeField()
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return _datetime_field.to_representation(value)
+    return value
+
+
+def chunks(rows: Iterable, size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def journey_rows(queryset: QuerySet) -> Iterator[tuple]:
+    """Journeys in the shape of JourneyListSerializer, crew per chunk"""
+    rows = (
+        queryset.prefetch_related(None)
+        .order_by("departure_time", "id")
+        .values_list(
+            "id",
+            "route__source__name",
+            "route__destination__name",
+            "train__name",
+            "departure_time",
+            "arrival_time",
+            "tickets_available",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    for chunk in chunks(rows, EXPORT_CHUNK_SIZE):
+        crew = defaultdict(list)
+        for journey_id, first_name, last_name in (
+            Journey.crew.through.objects.filter(
+                journey_id__in=[row[0] for row in chunk]
+            )
+            .order_by("crew_id")
+            .values_list("journey_id", "crew__first_name", "crew__last_name")
+        ):
+            crew[journey_id].append(f"{first_name} {last_name}")
+
+        for (
+            journey_id,
+            source,
+            destination,
+            train_name,
+            departure_time,
+            arrival_time,
+            tickets_available,
+        ) in chunk:
+            yield (
+                journey_id,
+                f"{source} -> {destination}",
+                train_name,
+                departure_time,
+                arrival_time,
+                crew[journey_id],
+                tickets_available,
+            )
+
+
+def ticket_rows(queryset: QuerySet) -> Iterator[tuple]:
+    """One row per ticket with its order and journey"""
+    rows = (
+        queryset.order_by("-order__created_at", "order_id", "cargo", "seat")
+        .values_list(
+            "order_id",
+            "order__created_at",
+            "id",
+            "journey_id",
+            "journey__route__source__name",
+            "journey__route__destination__name",
+            "journey__train__name",
+            "journey__departure_time",
+            "journey__arrival_time",
+            "cargo",
+            "seat",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    for (
+        order_id,
+        created_at,
+        ticket_id,
+        journey_id,
+        source,
+        destination,
+        *rest,
+    ) in rows:
+        yield (
+            order_id,
+            created_at,
+            ticket_id,
+            journey_id,
+            f"{source} -> {destination}",
+            *rest,
+        )
+
+
+def ndjson_lines(fields: tuple, rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(
+            dict(zip(fields, map(encode_value, row))),
+            separators=(",", ":"),
+        ) + "\n"
+
+
+class _Echo:
+    """File-like object handing csv.writer output straight back"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(fields: tuple, rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            [
+                "; ".join(value) if isinstance(value, list)
+                else encode_value(value)
+                for value in row
+            ]
+        )
+
+
+def export_response(
+        fields: tuple, rows: Iterable[tuple], output: str, filename: str
+) -> StreamingHttpResponse:
+    lines = csv_lines if output == "csv" else ndjson_lines
+    return StreamingHttpResponse(
+        lines(fields, rows),
+        content_type=CONTENT_TYPES[output],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{output}"'
+            ),
+        },
+    )
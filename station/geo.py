@@ -0,0 +1,138 @@
+"""
+In-process spatial index of stations for nearest-station lookups.
+
+Stations are bucketed into a fixed latitude/longitude grid. A query only
+visits the cells overlapping the bounding box of its radius and ranks that
+handful of candidates by haversine distance. The index is rebuilt when the
+shared ``Station`` version changes.
+"""
+import copy
+import heapq
+import math
+import threading
+
+from station.cache import get_version, model_version_name
+from station.models import Station
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+CELL_SIZE = 0.5
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class StationIndex:
+    def __init__(self, stations: list[Station], cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.lon_cells = math.ceil(360 / cell_size)
+        self.size = len(stations)
+        self._grid: dict[tuple[int, int], list[tuple]] = {}
+
+        for station in stations:
+            point = (
+                math.radians(station.latitude),
+                math.radians(station.longitude),
+                math.cos(math.radians(station.latitude)),
+                station,
+            )
+            self._grid.setdefault(
+                self._cell(station.latitude, station.longitude), []
+            ).append(point)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        row = math.floor((lat + 90) / self.cell_size)
+        column = math.floor((lon + 180) / self.cell_size) % self.lon_cells
+        return row, column
+
+    def _candidates(self, lat: float, lon: float, radius_km: float):
+        lat_span = radius_km / KM_PER_DEGREE
+        low_row, _ = self._cell(max(lat - lat_span, -90), lon)
+        high_row, _ = self._cell(min(lat + lat_span, 90), lon)
+
+        # Longitude degrees shrink towards the poles, use the widest row
+        widest = max(abs(lat) + lat_span, 0)
+        cos_lat = math.cos(math.radians(min(widest, 90)))
+        lon_span = radius_km / (KM_PER_DEGREE * cos_lat) if cos_lat else 360
+
+        if lon_span >= 180:
+            columns = range(self.lon_cells)
+        else:
+            _, first = self._cell(lat, lon - lon_span)
+            count = math.ceil(2 * lon_span / self.cell_size) + 1
+            columns = [
+                (first + i) % self.lon_cells
+                for i in range(min(count, self.lon_cells))
+            ]
+
+        for row in range(low_row, high_row + 1):
+            for column in columns:
+                yield from self._grid.get((row, column), ())
+
+    def nearby(
+            self, lat: float, lon: float, radius_km: float, limit: int
+    ) -> list[tuple[float, Station]]:
+        """Up to limit (distance in km, station) pairs, closest first"""
+        lat_rad = math.radians(lat)
+        lon_rad = math.radians(lon)
+        cos_lat = math.cos(lat_rad)
+        # Compare the haversine term instead of the distance itself
+        max_h = math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2) ** 2
+
+        matches = []
+        for s_lat, s_lon, s_cos, station in self._candidates(
+            lat, lon, radius_km
+        ):
+            h = (
+                math.sin((s_lat - lat_rad) / 2) ** 2
+                + cos_lat * s_cos * math.sin((s_lon - lon_rad) / 2) ** 2
+            )
+            if h <= max_h:
+                matches.append((h, station.id, station))
+
+        return [
+            (2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h))), station)
+            for h, _, station in heapq.nsmallest(limit, matches)
+        ]
+
+
+class StationIndexCache:
+    def __init__(self):
+        self._index: tuple[int, StationIndex] | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> StationIndex:
+        version = get_version(model_version_name(Station))
+        cached = self._index
+        if cached and cached[0] == version:
+            return cached[1]
+
+        index = StationIndex(list(Station.objects.all()))
+        with self._lock:
+            self._index = (version, index)
+
+        return index
+
+
+stations = StationIndexCache()
+
+
+def nearby_stations(
+        lat: float, lon: float, radius_km: float, limit: int
+) -> list[Station]:
+    """Stations within radius_km of a point with their distance in km"""
+    result = []
+    for distance, station in stations.get().nearby(
+        lat, lon, radius_km, limit
+    ):
+        station = copy.copy(station)
+        station.distance = round(distance, 3)
+        result.append(station)
+
+    return result
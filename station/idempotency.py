@@ -0,0 +1,117 @@
+"""
+Idempotent POST requests.
+
+A request carrying an ``Idempotency-Key`` header stores its successful
+response, status, body and the headers the view set, under the key in the
+transaction that produced it. A retry of the same request gets the stored
+response back; a retry arriving while the first one still runs blocks on
+the key's row until it commits.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.status import is_success
+
+from station.exceptions import IdempotencyKeyReused
+from station.models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def make_fingerprint(request) -> str:
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path}\n{payload}".encode()
+    ).hexdigest()
+
+
+def idempotent(method):
+    """
+    Decorate a viewset action of authenticated users so it runs at most
+    once per ``Idempotency-Key``. Only successful responses are kept;
+    anything else rolls the key back so the request can be retried.
+    """
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return method(self, request, *args, **kwargs)
+
+        max_length = IdempotencyKey._meta.get_field("key").max_length
+        if not key or len(key) > max_length:
+            raise ValidationError(
+                {HEADER: f"Must be 1 to {max_length} characters long."}
+            )
+
+        fingerprint = make_fingerprint(request)
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+
+        with transaction.atomic():
+            record, created = (
+                IdempotencyKey.objects.select_for_update().get_or_create(
+                    user=request.user,
+                    key=key,
+                    defaults={
+                        "fingerprint": fingerprint,
+                        "expires_at": expires_at,
+                    },
+                )
+            )
+
+            if not created and record.expires_at > now:
+                if record.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused()
+
+                response = Response(
+                    record.response,
+                    status=record.status_code,
+                    headers=record.headers,
+                )
+                response[REPLAYED_HEADER] = "true"
+                return response
+
+            response = method(self, request, *args, **kwargs)
+
+            if is_success(response.status_code):
+                record.fingerprint = fingerprint
+                record.status_code = response.status_code
+                record.response = response.data
+                record.headers = dict(response.items())
+                record.expires_at = expires_at
+                record.save()
+            else:
+                transaction.set_rollback(True)
+
+        return response
+
+    return wrapper
+
+
+def sweep_expired_keys(
+        batch_size: int = 1000, now: datetime | None = None
+) -> int:
+    """Delete expired idempotency keys, batch_size rows per query"""
+    now = now or timezone.now()
+    deleted = 0
+
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(expires_at__lte=now).values_list(
+                "id", flat=True
+            )[:batch_size]
+        )
+        if not ids:
+            return deleted
+
+        count, _ = IdempotencyKey.objects.filter(id__in=ids).delete()
+        deleted += count
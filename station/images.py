@@ -0,0 +1,216 @@
+"""
+Train images stored by content and resized off the request.
+
+``store_image`` names an upload after the SHA-256 of its bytes, so the
+same picture uploaded twice, for one train or several, is stored once.
+The resized copies (``VARIANTS``, each as JPEG or PNG and as WebP) are
+named after the original and rendered by ``process_train_images``
+workers. They claim trains whose ``image_variants`` are still None in a
+short transaction, spread the Pillow work over a process pool with no
+lock held, and store the results with one update per image. A claim left
+by a worker that died is taken again after ``CLAIM_TIMEOUT``.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import Executor
+from datetime import timedelta
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from station.cache import bump_version_on_commit, model_version_name
+from station.models import Train
+
+logger = logging.getLogger(__name__)
+
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+IMAGE_DIR = "uploads/trains/"
+VARIANT_DIR = "uploads/trains/variants/"
+# Longest side in pixels, images are never enlarged
+VARIANTS = {"thumbnail": 320, "medium": 960}
+EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+
+def content_name(file) -> str:
+    """Storage name derived from the file's bytes and image format"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(64 * 1024), b""):
+        digest.update(chunk)
+    file.seek(0)
+
+    with Image.open(file) as image:
+        image_format = image.format
+    file.seek(0)
+    extension = EXTENSIONS.get(
+        image_format, os.path.splitext(file.name)[1].lower()
+    )
+    hexdigest = digest.hexdigest()
+    return f"{IMAGE_DIR}{hexdigest[:2]}/{hexdigest}{extension}"
+
+
+def _save_once(name: str, content) -> str:
+    """
+    Save content under name. Names follow the content, so when the
+    storage had to pick another one, the same bytes are stored already,
+    possibly by a concurrent upload, and the copy is dropped.
+    """
+    saved = default_storage.save(name, content)
+    if saved != name:
+        default_storage.delete(saved)
+    return name
+
+
+def store_image(file) -> str:
+    """Save the upload, once per content"""
+    return _save_once(content_name(file), file)
+
+
+def media_url(name: str, request=None) -> str:
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def variant_urls(variants: dict, request=None) -> dict[str, str]:
+    return {
+        variant: media_url(name, request) for variant, name in variants.items()
+    }
+
+
+def list_image_url(name: str, variants: dict | None, request=None):
+    """The thumbnail, or the original until it is rendered"""
+    name = (variants or {}).get("thumbnail") or name
+    return media_url(name, request) if name else None
+
+
+def known_variants(name: str) -> dict | None:
+    """Variants rendered for another upload of the same content"""
+    return (
+        Train.objects.filter(image=name, image_variants__isnull=False)
+        .values_list("image_variants", flat=True)
+        .first()
+    )
+
+
+def _save_variant(image: Image.Image, name: str, image_format: str) -> None:
+    if default_storage.exists(name):
+        return
+    buffer = BytesIO()
+    options = {"quality": 80}
+    if image_format == "JPEG":
+        options["optimize"] = True
+    elif image_format == "WEBP":
+        options["method"] = 6
+    image.save(buffer, image_format, **options)
+    _save_once(name, ContentFile(buffer.getvalue()))
+
+
+def render_variants(name: str) -> dict[str, str]:
+    """
+    Resize the stored image to every size of VARIANTS, as JPEG (PNG when
+    it has transparency) and as WebP. Returns the storage names by variant,
+    ``thumbnail``, ``thumbnail_webp``, ``medium`` and so on.
+    """
+    stem = os.path.splitext(os.path.basename(name))[0]
+    variants = {}
+    with default_storage.open(name) as file, Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        transparent = (
+            image.mode in ("RGBA", "LA", "PA")
+            or "transparency" in image.info
+        )
+        image = image.convert("RGBA" if transparent else "RGB")
+        fallback = "PNG" if transparent else "JPEG"
+
+        for variant, size in VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            for key, image_format in (
+                    (variant, fallback),
+                    (f"{variant}_webp", "WEBP"),
+            ):
+                variant_name = (
+                    f"{VARIANT_DIR}{stem}-{variant}"
+                    f"{EXTENSIONS[image_format]}"
+                )
+                _save_variant(resized, variant_name, image_format)
+                variants[key] = variant_name
+    return variants
+
+
+def _render_or_log(name: str) -> dict[str, str]:
+    try:
+        return render_variants(name)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.exception("Cannot render the variants of %s", name)
+        # Not retried, the original is served instead
+        return {}
+
+
+def claim_train_images(batch_size: int = 20) -> dict[str, list[int]]:
+    """
+    Mark up to batch_size trains with pending variants claimed: unclaimed
+    ones and those claimed more than CLAIM_TIMEOUT ago. Returns their ids
+    by image name.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        trains = list(
+            Train.objects.select_for_update(skip_locked=True)
+            .filter(image_variants__isnull=True)
+            .filter(
+                Q(image_claimed_at__isnull=True)
+                | Q(image_claimed_at__lt=now - CLAIM_TIMEOUT)
+            )
+            .exclude(image="")
+            .exclude(image__isnull=True)
+            .order_by("updated_at")
+            .values_list("id", "image")[:batch_size]
+        )
+        Train.objects.filter(
+            pk__in=[train_id for train_id, _ in trains]
+        ).update(image_claimed_at=now)
+
+    claimed = {}
+    for train_id, name in trains:
+        claimed.setdefault(name, []).append(train_id)
+    return claimed
+
+
+def process_train_images(
+        batch_size: int = 20, executor: Executor | None = None
+) -> int:
+    """
+    Claim up to batch_size trains whose variants are pending and render
+    them, in the executor's processes if given. Returns the number of
+    trains processed.
+    """
+    claimed = claim_train_images(batch_size)
+    names = sorted(claimed)
+    rendered = list(
+        (executor.map if executor else map)(_render_or_log, names)
+    )
+
+    now = timezone.now()
+    with transaction.atomic():
+        updated = 0
+        for name, variants in zip(names, rendered):
+            # Trains given another image meanwhile stay pending for it
+            updated += Train.objects.filter(
+                pk__in=claimed[name], image=name, image_variants__isnull=True
+            ).update(
+                image_variants=variants,
+                image_claimed_at=None,
+                updated_at=now,
+            )
+        if updated:
+            bump_version_on_commit(model_version_name(Train))
+
+    return sum(len(train_ids) for train_ids in claimed.values())
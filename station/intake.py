@@ -0,0 +1,134 @@
+"""
+Asynchronous order intake.
+
+With ``ORDER_INTAKE_ASYNC`` on, ``POST /orders/`` only runs the checks that
+need no queries and stores the payload as a pending ``OrderRequest``.
+``process_orders`` workers claim pending requests with ``SKIP LOCKED`` in a
+short transaction that marks them processing, so any number of them drain
+the queue in parallel without waiting on each other. Each request is then
+placed through the regular ``OrderSerializer`` in its own transaction, and
+a request left processing by a worker that died is claimed again after
+``CLAIM_TIMEOUT``. That transaction first locks the request and checks it
+still carries the worker's claim, so a slow worker whose request was
+claimed again leaves it to the new claim instead of placing it twice.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+
+from station.models import OrderRequest
+from station.serializers import OrderSerializer
+
+logger = logging.getLogger(__name__)
+
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def enqueue_order(user, payload: dict) -> OrderRequest:
+    return OrderRequest.objects.create(user=user, payload=payload)
+
+
+def _record(order_request: OrderRequest) -> None:
+    order_request.processed_at = timezone.now()
+    order_request.save(
+        update_fields=["order", "status", "errors", "processed_at"]
+    )
+
+
+def _hold_claim(order_request: OrderRequest) -> bool:
+    """
+    Lock the request until the end of the transaction, False when it no
+    longer carries the claim of this worker
+    """
+    held = (
+        OrderRequest.objects.select_for_update()
+        .filter(
+            pk=order_request.pk,
+            status=OrderRequest.Status.PROCESSING,
+            claimed_at=order_request.claimed_at,
+        )
+        .exists()
+    )
+    if not held:
+        logger.info(
+            "Order request %s was claimed again, skipped", order_request.id
+        )
+    return held
+
+
+def process_order_request(order_request: OrderRequest) -> bool:
+    """
+    Place the order of a claimed request and record the outcome, the
+    order and its request are committed together. Returns False, leaving
+    the request alone, when it was claimed again in the meantime.
+    """
+    serializer = OrderSerializer(data=order_request.payload)
+    try:
+        with transaction.atomic():
+            if not _hold_claim(order_request):
+                return False
+            serializer.is_valid(raise_exception=True)
+            order_request.order = serializer.save(user=order_request.user)
+            order_request.status = OrderRequest.Status.DONE
+            _record(order_request)
+            return True
+    except APIException as error:
+        errors = error.detail
+    except Exception:
+        logger.exception("Cannot place order request %s", order_request.id)
+        errors = {"detail": "The order could not be placed."}
+
+    with transaction.atomic():
+        if not _hold_claim(order_request):
+            return False
+        order_request.order = None
+        order_request.status = OrderRequest.Status.FAILED
+        order_request.errors = errors
+        _record(order_request)
+    return True
+
+
+def claim_order_requests(batch_size: int = 100) -> list[OrderRequest]:
+    """
+    Mark up to batch_size requests processing, oldest first: pending ones
+    and those claimed more than CLAIM_TIMEOUT ago
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OrderRequest.objects.select_for_update(
+                skip_locked=True, of=("self",)
+            )
+            .filter(
+                Q(status=OrderRequest.Status.PENDING)
+                | Q(
+                    status=OrderRequest.Status.PROCESSING,
+                    claimed_at__lt=now - CLAIM_TIMEOUT,
+                )
+            )
+            .select_related("user")
+            .order_by("created_at")[:batch_size]
+        )
+        OrderRequest.objects.filter(
+            pk__in=[order_request.pk for order_request in batch]
+        ).update(status=OrderRequest.Status.PROCESSING, claimed_at=now)
+
+    for order_request in batch:
+        order_request.status = OrderRequest.Status.PROCESSING
+        order_request.claimed_at = now
+    return batch
+
+
+def process_order_requests(batch_size: int = 100) -> int:
+    """
+    Claim up to batch_size requests and process each in its own
+    transaction. Returns the number processed.
+    """
+    batch = claim_order_requests(batch_size)
+    return sum(
+        process_order_request(order_request) for order_request in batch
+    )
@@ -0,0 +1,151 @@
+import asyncio
+import statistics
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import resolve
+
+from station.async_views import concurrent_reads
+from user.authentication import UserAccessToken
+
+
+def with_db_latency(view, seconds: float):
+    """Add a network round trip to every query of the view's thread"""
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with connection.execute_wrapper(delay):
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class Command(BaseCommand):
+    """Django command to compare read concurrency of one process"""
+
+    help = (
+        "Send concurrent GET requests to a view in-process, the way one "
+        "WSGI sync worker, one ASGI process with sync views and one ASGI "
+        "process with concurrent reads would serve them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/api/station/journeys/",
+            help="Path of the endpoint to request",
+        )
+        parser.add_argument(
+            "--email",
+            help="User the requests authenticate as, the first superuser "
+                 "by default",
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--db-latency-ms",
+            type=float,
+            default=2.0,
+            help="Delay added to every query to model a database over "
+                 "the network",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects
+        user = (
+            users.filter(email=options["email"]).first()
+            if options["email"]
+            else users.filter(is_superuser=True).first()
+        )
+        if user is None:
+            raise CommandError("No user to authenticate the requests as")
+
+        match = resolve(options["path"].partition("?")[0])
+        view = with_db_latency(
+            getattr(match.func, "__wrapped__", match.func),
+            options["db_latency_ms"] / 1000,
+        )
+        token = UserAccessToken.for_user(user)
+        factory = RequestFactory()
+
+        def make_request():
+            return factory.get(
+                options["path"], HTTP_AUTHORIZATION=f"Bearer {token}"
+            )
+
+        def sync_view(request, *args, **kwargs):
+            return view(request, *args, **kwargs).render()
+
+        modes = {
+            "wsgi sync worker": None,
+            # What Django does with a sync view under ASGI
+            "asgi sync views": sync_to_async(sync_view),
+            "asgi concurrent reads": concurrent_reads(view),
+        }
+
+        self.stdout.write(
+            f"{options['requests']} requests to {options['path']}, "
+            f"concurrency {options['concurrency']}, "
+            f"{options['db_latency_ms']} ms per query"
+        )
+        for name, handler in modes.items():
+            if handler is None:
+                result = self._run_sequential(
+                    sync_view, match, make_request, options["requests"]
+                )
+            else:
+                result = asyncio.run(
+                    self._run_concurrent(
+                        handler,
+                        match,
+                        make_request,
+                        options["requests"],
+                        options["concurrency"],
+                    )
+                )
+            self._report(name, *result)
+
+    @staticmethod
+    def _run_sequential(view, match, make_request, total: int):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(total):
+            began = time.perf_counter()
+            view(make_request(), *match.args, **match.kwargs)
+            latencies.append(time.perf_counter() - began)
+        return time.perf_counter() - start, latencies
+
+    @staticmethod
+    async def _run_concurrent(
+            handler, match, make_request, total: int, concurrency: int
+    ):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def one():
+            async with semaphore:
+                began = time.perf_counter()
+                await handler(make_request(), *match.args, **match.kwargs)
+                latencies.append(time.perf_counter() - began)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - start, latencies
+
+    def _report(self, name: str, elapsed: float, latencies: list[float]):
+        percentiles = statistics.quantiles(
+            [latency * 1000 for latency in latencies], n=100
+        )
+        self.stdout.write(
+            f"{name:<24} {len(latencies) / elapsed:8.1f} req/s  "
+            f"p50 {percentiles[49]:7.1f} ms  p95 {percentiles[94]:7.1f} ms"
+        )
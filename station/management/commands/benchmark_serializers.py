@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from station.views import JourneyViewSet, RouteViewSet, TrainViewSet
+
+VIEWSETS = {
+    "journeys": JourneyViewSet,
+    "trains": TrainViewSet,
+    "routes": RouteViewSet,
+}
+
+
+class Command(BaseCommand):
+    """Django command to compare the list serializers with their fast path"""
+
+    help = (
+        "Read, serialize and render the first rows of the journey, train "
+        "and route lists through the list serializers and through their "
+        "values() fast path, check that both give the same JSON and "
+        "report the best time of each"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10000,
+            help="Number of rows serialized at once",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of timed runs of each path, the best one counts",
+        )
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        request = Request(RequestFactory().get("/"))
+
+        # Let the request build absolute media URLs
+        with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+        ):
+            for name, viewset in VIEWSETS.items():
+                view = viewset(
+                    request=request,
+                    action="list",
+                    format_kwarg=None,
+                    kwargs={},
+                )
+                serializer_class = view.get_serializer_class()
+                context = view.get_serializer_context()
+                ordering = view.pagination_class.ordering
+                queryset = view.get_queryset()
+
+                def serialize():
+                    rows = queryset.order_by(*ordering)[:options["rows"]]
+                    data = serializer_class(rows, many=True, context=context)
+                    return renderer.render(data.data)
+
+                def serialize_rows():
+                    rows = serializer_class.values_queryset(queryset)
+                    rows = rows.order_by(*ordering)[:options["rows"]]
+                    return renderer.render(
+                        serializer_class.rows_data(rows, context)
+                    )
+
+                slow, content = self._time(serialize, options["repeat"])
+                fast, fast_content = self._time(
+                    serialize_rows, options["repeat"]
+                )
+                if content != fast_content:
+                    raise CommandError(f"The {name} differ between the paths")
+
+                count = content.count(b'{"id":')
+                self.stdout.write(
+                    f"{name:<10} {count:>6} rows  "
+                    f"serializer {slow * 1000:8.1f} ms  "
+                    f"rows {fast * 1000:8.1f} ms  "
+                    f"{slow / fast:5.1f}x"
+                )
+
+    @staticmethod
+    def _time(serialize, repeat: int) -> tuple[float, bytes]:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            content = serialize()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
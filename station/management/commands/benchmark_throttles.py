@@ -0,0 +1,71 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management import BaseCommand
+from rest_framework.throttling import UserRateThrottle
+
+from station.throttling import UserThrottle, clear_throttles, throttle_cache
+
+
+class Command(BaseCommand):
+    """Django command to compare the per-request cost of the throttles"""
+
+    help = (
+        "Time allow_request of DRF's UserRateThrottle, which keeps a list "
+        "of timestamps per client, and of the sliding window UserThrottle, "
+        "for clients with more and more requests in the current period. "
+        "Both use the THROTTLE_CACHE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--history",
+            type=int,
+            action="append",
+            help="Number of earlier requests of the client, can be "
+                 "repeated (10, 100 and 1000 by default)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Number of timed requests per throttle and history",
+        )
+
+    def handle(self, *args, **options):
+        request = SimpleNamespace(
+            user=SimpleNamespace(is_authenticated=True, pk=0), META={}
+        )
+        view = SimpleNamespace(action="list")
+        cache = throttle_cache()
+
+        for history in options["history"] or [10, 100, 1000]:
+            rate = f"{history + options['requests'] + 1}/day"
+            throttles = {
+                "drf timestamp list": type(
+                    "Throttle",
+                    (UserRateThrottle,),
+                    {"rate": rate, "cache": cache},
+                ),
+                "sliding window": type(
+                    "Throttle", (UserThrottle,), {"get_rate": lambda _: rate}
+                ),
+            }
+            for name, throttle_class in throttles.items():
+                cache.delete(
+                    UserRateThrottle.cache_format
+                    % {"scope": "user", "ident": 0}
+                )
+                clear_throttles(0)
+                for _ in range(history):
+                    throttle_class().allow_request(request, view)
+
+                start = time.perf_counter()
+                for _ in range(options["requests"]):
+                    throttle_class().allow_request(request, view)
+                elapsed = time.perf_counter() - start
+
+                self.stdout.write(
+                    f"history {history:>6}  {name:<20} "
+                    f"{elapsed / options['requests'] * 1e6:9.1f} us/request"
+                )
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+
+from station.timetable import (
+    IMPORT_BATCH_SIZE,
+    TimetableError,
+    TimetableImporter,
+    read_rows,
+)
+
+# Import order, each kind refers to the ones before it by natural key
+KINDS = ("stations", "trains", "routes", "journeys")
+
+
+class Command(BaseCommand):
+    """Django command to bulk import a timetable from CSV or JSONL files"""
+
+    help = (
+        "Import stations (name, latitude, longitude), trains (name, "
+        "cargo_num, places_in_cargo, train_type), routes (source, "
+        "destination, distance) and journeys (source, destination, train, "
+        "departure_time, arrival_time, crew) from .csv or .jsonl files. "
+        "Stations, trains and crew are referred to by name"
+    )
+
+    def add_arguments(self, parser):
+        for kind in KINDS:
+            parser.add_argument(f"--{kind}", help=f"File with {kind}")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Number of rows inserted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if not any(options[kind] for kind in KINDS):
+            raise CommandError(
+                "Provide at least one of: "
+                + ", ".join(f"--{kind}" for kind in KINDS)
+            )
+
+        importer = TimetableImporter(batch_size=options["batch_size"])
+        try:
+            for kind in KINDS:
+                if options[kind]:
+                    self._import(importer, kind, options[kind])
+        except TimetableError as error:
+            raise CommandError(str(error))
+        finally:
+            importer.finish()
+
+    def _import(self, importer: TimetableImporter, kind: str, path: str):
+        start = time.perf_counter()
+        created = getattr(importer, f"import_{kind}")(read_rows(path))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {created} {kind} in {elapsed:.1f} s "
+                f"({created / elapsed if elapsed else 0:.0f} rows/s)"
+            )
+        )
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management import BaseCommand
+
+from station.intake import process_order_requests
+
+
+class Command(BaseCommand):
+    """Django command to place the orders queued by the async intake"""
+
+    help = (
+        "Drain pending order requests in batches. Several processes can "
+        "run in parallel, each claims rows the others have not locked"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of order requests claimed per transaction",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new requests instead of exiting once "
+                 "the queue is empty",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls of an empty queue",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            count = process_order_requests(batch_size=options["batch_size"])
+            processed += count
+
+            if count:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {processed} order requests")
+        )
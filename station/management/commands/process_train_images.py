@@ -0,0 +1,65 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management import BaseCommand
+
+from station.images import process_train_images
+
+
+class Command(BaseCommand):
+    """Django command to render the resized copies of train images"""
+
+    help = (
+        "Render thumbnails and WebP copies of uploaded train images in a "
+        "pool of processes. Several workers can run in parallel, each "
+        "claims trains the others have not locked"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=2,
+            help="Number of processes resizing images",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20,
+            help="Number of trains claimed per transaction",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new images instead of exiting once "
+                 "none is pending",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when no image is pending",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        # Spawned processes set Django up before their first image
+        with ProcessPoolExecutor(
+                options["processes"], initializer=django.setup
+        ) as executor:
+            while True:
+                count = process_train_images(
+                    batch_size=options["batch_size"], executor=executor
+                )
+                processed += count
+
+                if count:
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {processed} train images")
+        )
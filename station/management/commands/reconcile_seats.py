@@ -0,0 +1,132 @@
+from collections import defaultdict
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from station.models import Journey, SeatMap, Ticket
+from station.occupancy import fit_bitmap, seat_index, set_seats
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the stored seat counters from tickets"""
+
+    help = (
+        "Recalculate Journey.seats_sold and, optionally, the seat map "
+        "bitmaps from the Ticket table"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of journeys locked and fixed per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report journeys whose counter has drifted",
+        )
+        parser.add_argument(
+            "--seat-maps",
+            action="store_true",
+            help="Also rebuild every seat map, e.g. after a train layout "
+                 "was changed",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        drifted_ids = list(
+            Journey.objects.annotate(actual=Count("tickets"))
+            .exclude(seats_sold=F("actual"))
+            .values_list("id", flat=True)
+        )
+        self.stdout.write(
+            f"Journeys with drifted counters: {len(drifted_ids)}"
+        )
+
+        if options["dry_run"]:
+            return
+
+        fixed = 0
+        for start in range(0, len(drifted_ids), batch_size):
+            fixed += self._rebuild(drifted_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Fixed {fixed} journeys"))
+
+        if options["seat_maps"]:
+            journey_ids = list(
+                Journey.objects.order_by("id").values_list("id", flat=True)
+            )
+            for start in range(0, len(journey_ids), batch_size):
+                self._rebuild_seat_maps(journey_ids[start:start + batch_size])
+
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {len(journey_ids)} seat maps")
+            )
+
+    @staticmethod
+    def _rebuild(journey_ids: list[int]) -> int:
+        """
+        Recount tickets while the journey rows are locked, so tickets
+        committed concurrently are either counted here or applied on top.
+        """
+        with transaction.atomic():
+            journeys = list(
+                Journey.objects.select_for_update()
+                .filter(id__in=journey_ids)
+                .only("id", "seats_sold")
+            )
+            actual = dict(
+                Journey.objects.filter(id__in=journey_ids)
+                .annotate(actual=Count("tickets"))
+                .values_list("id", "actual")
+            )
+
+            changed = []
+            for journey in journeys:
+                if journey.seats_sold != actual[journey.id]:
+                    journey.seats_sold = actual[journey.id]
+                    changed.append(journey)
+
+            Journey.objects.bulk_update(changed, ["seats_sold"])
+
+        return len(changed)
+
+    @staticmethod
+    def _rebuild_seat_maps(journey_ids: list[int]) -> None:
+        """Rewrite seat maps from tickets while the map rows are locked"""
+        with transaction.atomic():
+            SeatMap.objects.bulk_create(
+                [SeatMap(journey_id=journey_id) for journey_id in journey_ids],
+                ignore_conflicts=True,
+            )
+            seat_maps = list(
+                SeatMap.objects.select_for_update(of=("self",))
+                .select_related("journey__train")
+                .filter(journey_id__in=journey_ids)
+                .order_by("journey_id")
+            )
+
+            sold = defaultdict(list)
+            for journey_id, cargo, seat in Ticket.objects.filter(
+                journey_id__in=journey_ids
+            ).values_list("journey_id", "cargo", "seat"):
+                sold[journey_id].append((cargo, seat))
+
+            for seat_map in seat_maps:
+                train = seat_map.journey.train
+                seat_map.bitmap = fit_bitmap(
+                    set_seats(
+                        b"",
+                        (
+                            seat_index(cargo, seat, train.places_in_cargo)
+                            for cargo, seat in sold[seat_map.journey_id]
+                        ),
+                    ),
+                    train.capacity,
+                )
+
+            SeatMap.objects.bulk_update(seat_maps, ["bitmap"])
@@ -0,0 +1,175 @@
+import json
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from station.benchmark import (
+    BENCHMARK_EMAIL,
+    benchmark_cases,
+    compare_reports,
+    run_case,
+)
+from station.booking import NotEnoughSeats
+from station.models import Journey, Order, Route, Station, Ticket, Train
+from user.authentication import UserAccessToken
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API endpoints in-process"""
+
+    help = (
+        "Request every station and user endpoint through the test client "
+        "and report latency percentiles, query counts and peak memory as "
+        "JSON, optionally compared with a baseline report. Writes are "
+        "rolled back. Run seed_benchmark_data first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=50,
+            help="Number of timed requests per endpoint",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=3,
+            help="Number of untimed requests per endpoint sent first",
+        )
+        parser.add_argument(
+            "--case",
+            action="append",
+            dest="cases",
+            help="Only run the named case, can be repeated",
+        )
+        parser.add_argument(
+            "--email",
+            default=BENCHMARK_EMAIL.format(0),
+            help="User the requests authenticate as",
+        )
+        parser.add_argument(
+            "--output", help="File to write the JSON report to"
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON report to compare with, exits with an error when an "
+                 "endpoint regressed",
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=20.0,
+            help="Growth of latency or memory over the baseline, in "
+                 "percent, that counts as a regression",
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email=options["email"]).first()
+        if user is None:
+            raise CommandError(
+                f"No user {options['email']}, run seed_benchmark_data first"
+            )
+
+        try:
+            cases = benchmark_cases(user)
+        except NotEnoughSeats:
+            raise CommandError("No upcoming journey with free seats")
+        if options["cases"]:
+            unknown = set(options["cases"]) - {case.name for case in cases}
+            if unknown:
+                raise CommandError(f"Unknown cases: {', '.join(unknown)}")
+            cases = [case for case in cases if case.name in options["cases"]]
+
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {UserAccessToken.for_user(user)}"
+        }
+        results = {}
+        # Let the test client in and keep DEBUG query logging out
+        with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                DEBUG=False,
+        ):
+            for case in cases:
+                result = run_case(
+                    case,
+                    options["iterations"],
+                    warmup=options["warmup"],
+                    headers=headers,
+                    user_id=user.id,
+                )
+                results[case.name] = result.as_dict()
+                self.stdout.write(
+                    f"{case.name:<22} {result.status} "
+                    f"p50 {result.p50_ms:8.2f} ms  "
+                    f"p90 {result.p90_ms:8.2f} ms  "
+                    f"p99 {result.p99_ms:8.2f} ms  "
+                    f"{result.queries:3d} queries  "
+                    f"{result.peak_memory_kb:9.1f} KiB"
+                )
+                if result.errors:
+                    self.stderr.write(
+                        f"{case.name}: {result.errors} of {result.requests} "
+                        f"requests failed with {result.status}"
+                    )
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "rows": {
+                model._meta.model_name: model.objects.count()
+                for model in (Station, Route, Train, Journey, Order, Ticket)
+            },
+            "cases": results,
+        }
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        if options["baseline"]:
+            self._compare(
+                report, options["baseline"], options["max_regression"]
+            )
+
+    def _compare(self, report: dict, path: str, max_regression: float):
+        try:
+            with open(path, encoding="utf-8") as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read the baseline {path}: {error}")
+
+        if baseline.get("rows") != report["rows"]:
+            self.stderr.write(
+                "The baseline was measured on a different number of rows"
+            )
+
+        rows = compare_reports(report, baseline, max_regression)
+        for row in rows:
+            line = (
+                f"{row['case']:<22} {row['metric']:<15} "
+                f"{row['baseline']:>10} -> {row['current']:>10} "
+                f"{row['change']:+7.1f}%"
+            )
+            if row["regressed"]:
+                self.stdout.write(self.style.ERROR(f"{line}  regression"))
+            else:
+                self.stdout.write(line)
+
+        regressions = sorted(
+            {f"{row['case']} {row['metric']}" for row in rows
+             if row["regressed"]}
+        )
+        if regressions:
+            raise CommandError(
+                f"Regressions against {path}: {', '.join(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions"))
@@ -0,0 +1,188 @@
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, call_command
+from django.db import transaction
+from django.utils import timezone
+
+from station.benchmark import (
+    BENCHMARK_EMAIL,
+    BENCHMARK_PASSWORD,
+    BenchmarkData,
+)
+from station.models import Journey, Order, Ticket
+from station.occupancy import seat_pair
+from station.timetable import IMPORT_BATCH_SIZE, TimetableImporter
+
+# Number of rows of each kind generated by default
+VOLUMES = {
+    "stations": 300,
+    "routes": 1500,
+    "trains": 200,
+    "journeys": 50000,
+    "users": 500,
+    "orders": 20000,
+}
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with benchmark volumes"""
+
+    help = (
+        "Generate stations, routes, trains, journeys with crew, users and "
+        "orders with tickets, skewed like real traffic. Run it on an empty "
+        f"database; the users log in with password {BENCHMARK_PASSWORD!r}"
+    )
+
+    def add_arguments(self, parser):
+        for kind, count in VOLUMES.items():
+            parser.add_argument(
+                f"--{kind}",
+                type=int,
+                default=count,
+                help=f"Number of {kind} to create ({count} by default)",
+            )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=60,
+            help="Number of days from today the journeys depart on",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed of the generator, the same seed gives the same data",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Number of rows inserted per transaction",
+        )
+
+    def handle(self, *args, **options):
+        data = BenchmarkData(seed=options["seed"])
+        importer = TimetableImporter(batch_size=options["batch_size"])
+        try:
+            self._step(
+                "stations",
+                importer.import_stations,
+                data.generate_stations(options["stations"]),
+            )
+            self._step(
+                "trains",
+                importer.import_trains,
+                data.generate_trains(options["trains"]),
+            )
+            self._step(
+                "routes",
+                importer.import_routes,
+                data.generate_routes(options["routes"]),
+            )
+            self._step(
+                "journeys",
+                importer.import_journeys,
+                data.generate_journeys(
+                    options["journeys"], timezone.localtime(), options["days"]
+                ),
+            )
+        finally:
+            importer.finish()
+
+        users = self._step("users", self._create_users, options["users"])
+        self._step(
+            "tickets",
+            self._create_orders,
+            data,
+            options["orders"],
+            users,
+            options["batch_size"],
+        )
+        # Orders were bulk inserted past the seat counters and maps
+        call_command(
+            "reconcile_seats",
+            seat_maps=True,
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+        )
+
+    def _step(self, kind: str, create, *args):
+        start = time.perf_counter()
+        result = create(*args)
+        elapsed = time.perf_counter() - start
+
+        created = len(result) if isinstance(result, list) else result
+        self.stdout.write(
+            self.style.SUCCESS(f"Created {created} {kind} in {elapsed:.1f} s")
+        )
+        return result
+
+    @staticmethod
+    def _create_users(count: int) -> list[int]:
+        """Ids of the benchmark users, creating the missing ones"""
+        users = get_user_model().objects
+        emails = [BENCHMARK_EMAIL.format(number) for number in range(count)]
+        existing = set(
+            users.filter(email__in=emails).values_list("email", flat=True)
+        )
+        password = make_password(BENCHMARK_PASSWORD)
+        users.bulk_create(
+            get_user_model()(email=email, password=password)
+            for email in emails
+            if email not in existing
+        )
+
+        ids = dict(users.filter(email__in=emails).values_list("email", "id"))
+        return [ids[email] for email in emails]
+
+    @staticmethod
+    def _create_orders(
+            data: BenchmarkData, count: int, users: list[int], batch_size: int
+    ) -> int:
+        journeys = list(
+            Journey.objects.order_by("id").values_list(
+                "id", "train__cargo_num", "train__places_in_cargo"
+            )
+        )
+        if not journeys or not users:
+            return 0
+
+        places = {journey_id: places for journey_id, _, places in journeys}
+        # Which journeys are popular is up to the generator
+        data.random.shuffle(journeys)
+        orders = data.generate_tickets(
+            count,
+            users,
+            [
+                (journey_id, cargo_num * places_in_cargo)
+                for journey_id, cargo_num, places_in_cargo in journeys
+            ],
+        )
+
+        created = 0
+        while batch := list(islice(orders, batch_size)):
+            with transaction.atomic():
+                new_orders = Order.objects.bulk_create(
+                    Order(user_id=user_id) for user_id, _, _ in batch
+                )
+                tickets = [
+                    Ticket(
+                        order=order,
+                        journey_id=journey_id,
+                        cargo=cargo,
+                        seat=seat,
+                    )
+                    for order, (_, journey_id, indices) in zip(
+                        new_orders, batch
+                    )
+                    for cargo, seat in (
+                        seat_pair(index, places[journey_id])
+                        for index in indices
+                    )
+                ]
+                Ticket.objects.bulk_create(tickets, batch_size=batch_size)
+            created += len(tickets)
+        return created
@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand
+
+from station.booking import sweep_expired_holds
+from station.idempotency import sweep_expired_keys
+
+
+class Command(BaseCommand):
+    """Django command to delete expired seat holds and idempotency keys"""
+
+    help = "Delete expired seat holds and idempotency keys in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of journeys or keys swept per transaction",
+        )
+
+    def handle(self, *args, **options):
+        holds = sweep_expired_holds(batch_size=options["batch_size"])
+        keys = sweep_expired_keys(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {holds} seat holds"))
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {keys} idempotency keys")
+        )
@@ -0,0 +1,161 @@
+"""
+Media files served with long-lived caching.
+
+Uploaded images are named after their content (``station.images``) or,
+before that, a random uuid, so a media URL never changes content and is
+cached for a year as immutable. With ``MEDIA_ACCEL_REDIRECT`` set the view
+only checks the path and leaves the bytes to the front proxy through
+``X-Accel-Redirect``; otherwise it sends the file, or the one byte range
+asked for, itself.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MAX_AGE = 3600
+IMMUTABLE_NAME = re.compile(
+    r"[0-9a-f]{64}"
+    r"|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+CHUNK_SIZE = 64 * 1024
+
+
+class UnsatisfiableRange(ValueError):
+    pass
+
+
+def cache_control(name: str) -> str:
+    if IMMUTABLE_NAME.search(os.path.basename(name)):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={MAX_AGE}"
+
+
+def byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    First and last byte asked for by a ``Range`` header, or None when
+    the whole file should be sent: for several ranges, other units and
+    malformed headers
+    """
+    match = RANGE.fullmatch(header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # The last bytes
+        if int(last) == 0 or size == 0:
+            raise UnsatisfiableRange
+        return max(size - int(last), 0), size - 1
+
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise UnsatisfiableRange
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _read_range(file, first: int, length: int):
+    try:
+        file.seek(first)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def _file_response(
+        request,
+        full_path: str,
+        size: int,
+        last_modified: str,
+        content_type: str,
+):
+    header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if header and (if_range is None or if_range == last_modified):
+        try:
+            requested = byte_range(header, size)
+        except UnsatisfiableRange:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        if requested is not None:
+            first, last = requested
+            response = StreamingHttpResponse(
+                _read_range(
+                    open(full_path, "rb"), first, last - first + 1
+                ),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {first}-{last}/{size}"
+            response["Content-Length"] = str(last - first + 1)
+            return response
+
+    # Handed to the server's wsgi.file_wrapper, sendfile where available
+    return FileResponse(open(full_path, "rb"), content_type=content_type)
+
+
+@require_safe
+def serve_media(request, path: str):
+    """Send a file of MEDIA_ROOT"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stats = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not stat.S_ISREG(stats.st_mode):
+        raise Http404
+
+    last_modified = http_date(stats.st_mtime)
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    )
+    accel_redirect = getattr(settings, "MEDIA_ACCEL_REDIRECT", None)
+    if not was_modified_since(
+            request.headers.get("If-Modified-Since"), stats.st_mtime
+    ):
+        response = HttpResponseNotModified()
+    elif accel_redirect:
+        name = os.path.relpath(full_path, settings.MEDIA_ROOT)
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = (
+            f"{accel_redirect.rstrip('/')}/"
+            f"{quote(name.replace(os.sep, '/'))}"
+        )
+    else:
+        response = _file_response(
+            request, full_path, stats.st_size, last_modified, content_type
+        )
+        response["Accept-Ranges"] = "bytes"
+
+    response["Last-Modified"] = last_modified
+    response["Cache-Control"] = cache_control(path)
+    return response
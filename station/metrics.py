@@ -0,0 +1,382 @@
+"""
+Request and booking metrics in the Prometheus text format.
+
+Counters and histograms keep their values per process in a
+``MetricsRegistry``. With ``METRICS_DIR`` set, every process also writes its
+values to its own file there, at most once per ``METRICS_FLUSH_INTERVAL``
+seconds and whenever it serves ``/metrics``, and ``/metrics`` adds up the
+files of all processes, so any worker answers with the totals of the pool.
+Files of exited workers are kept, their counts are part of the totals;
+empty the directory when the service is redeployed.
+"""
+import asyncio
+import glob
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse
+
+from station.query_budget import QueryCounter
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", r"\\")
+        .replace("\n", r"\n")
+        .replace('"', r"\"")
+    )
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: tuple[str, ...] = (),
+            registry: "MetricsRegistry | None" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {', '.join(self.labelnames)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple, **extra) -> str:
+        pairs = [*zip(self.labelnames, key), *extra.items()]
+        if not pairs:
+            return ""
+        return "{" + ",".join(
+            f'{name}="{_escape(value)}"' for name, value in pairs
+        ) + "}"
+
+    def empty(self):
+        raise NotImplementedError
+
+    def add(self, value, amount: float):
+        """Value after one update of amount"""
+        raise NotImplementedError
+
+    @staticmethod
+    def merge(value, other):
+        """Sum of the values of two processes"""
+        raise NotImplementedError
+
+    def samples(self, key: tuple, value) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self.registry.update(self, self._key(labels), amount)
+
+    def empty(self) -> float:
+        return 0.0
+
+    def add(self, value: float, amount: float) -> float:
+        return value + amount
+
+    @staticmethod
+    def merge(value: float, other: float) -> float:
+        return value + other
+
+    def samples(self, key: tuple, value: float) -> list[str]:
+        return [f"{self.name}{self._labels(key)} {_format_number(value)}"]
+
+
+class Histogram(Metric):
+    """Counts per bucket, then the sum and the count of observations"""
+
+    type = "histogram"
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        self.buckets = (*sorted(buckets), math.inf)
+        super().__init__(*args, **kwargs)
+
+    def observe(self, value: float, **labels) -> None:
+        self.registry.update(self, self._key(labels), value)
+
+    def empty(self) -> list[float]:
+        return [0.0] * (len(self.buckets) + 2)
+
+    @staticmethod
+    def merge(value: list[float], other: list[float]) -> list[float]:
+        return [mine + theirs for mine, theirs in zip(value, other)]
+
+    def add(self, value: list[float], observed: float) -> list[float]:
+        for index, bound in enumerate(self.buckets):
+            if observed <= bound:
+                value[index] += 1
+                break
+        value[-2] += observed
+        value[-1] += 1
+        return value
+
+    def samples(self, key: tuple, value: list[float]) -> list[str]:
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            lines.append(
+                f"{self.name}_bucket"
+                f"{self._labels(key, le=_format_number(bound))} "
+                f"{_format_number(cumulative)}"
+            )
+        lines.append(
+            f"{self.name}_sum{self._labels(key)} {_format_number(value[-2])}"
+        )
+        lines.append(
+            f"{self.name}_count{self._labels(key)} "
+            f"{_format_number(value[-1])}"
+        )
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.reset()
+        # A forked worker starts counting from zero under its own file
+        os.register_at_fork(after_in_child=self.reset)
+
+    def reset(self) -> None:
+        # A lock held by another thread at fork time stays locked otherwise
+        self._lock = threading.Lock()
+        self._values: dict[str, dict[tuple, object]] = {}
+        self._file_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._flushed_at = 0.0
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def update(self, metric: Metric, key: tuple, amount: float) -> None:
+        with self._lock:
+            series = self._values.setdefault(metric.name, {})
+            series[key] = metric.add(series.get(key, metric.empty()), amount)
+
+    def _snapshot(self) -> dict[str, dict[tuple, object]]:
+        with self._lock:
+            return {
+                name: {
+                    key: list(value) if isinstance(value, list) else value
+                    for key, value in series.items()
+                }
+                for name, series in self._values.items()
+            }
+
+    @staticmethod
+    def _directory() -> str | None:
+        return getattr(settings, "METRICS_DIR", None)
+
+    def flush(self, force: bool = False) -> None:
+        """Write this process's values to its file in METRICS_DIR"""
+        directory = self._directory()
+        now = time.monotonic()
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 1.0)
+        if not directory or (not force and now - self._flushed_at < interval):
+            return
+
+        self._flushed_at = now
+        values = {
+            name: [[list(key), value] for key, value in series.items()]
+            for name, series in self._snapshot().items()
+        }
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"metrics-{self._file_id}.json")
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(values, file)
+        # Readers never see a half written file
+        os.replace(temporary, path)
+
+    def collect(self) -> dict[str, dict[tuple, object]]:
+        """Values of every process sharing METRICS_DIR, or of this one"""
+        directory = self._directory()
+        if not directory:
+            return self._snapshot()
+
+        self.flush(force=True)
+        totals: dict[str, dict[tuple, object]] = {}
+        for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    values = json.load(file)
+            except (OSError, ValueError):
+                # Removed or replaced while being read
+                continue
+            for name, series in values.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                merged = totals.setdefault(name, {})
+                for key, value in series:
+                    key = tuple(key)
+                    merged[key] = metric.merge(
+                        merged.get(key, metric.empty()), value
+                    )
+        return totals
+
+    def exposition(self) -> str:
+        """All metrics in the Prometheus text format"""
+        values = self.collect()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f"# HELP {name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in sorted(values.get(name, {}).items()):
+                lines.extend(metric.samples(key, value))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = Histogram(
+    "station_request_duration_seconds",
+    "Time to the response of a request, by view and action",
+    ("view", "action", "method", "status"),
+)
+REQUEST_QUERIES = Histogram(
+    "station_request_queries",
+    "Database queries run by a request, by view and action",
+    ("view", "action"),
+    buckets=QUERY_BUCKETS,
+)
+ORDERS_CREATED = Counter(
+    "station_orders_created_total", "Orders committed"
+)
+TICKETS_SOLD = Counter(
+    "station_tickets_sold_total", "Tickets committed with their orders"
+)
+SEAT_CONFLICTS = Counter(
+    "station_seat_conflicts_total",
+    "Orders and holds refused because their seats were taken",
+    ("operation", "reason"),
+)
+
+# Queries of the current request, counted on whichever thread runs them
+_request_queries: ContextVar[QueryCounter | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def count_request_query(execute, sql, params, many, context):
+    counter = _request_queries.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(connection) -> None:
+    if count_request_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_request_query)
+
+
+def view_labels(request) -> tuple[str, str]:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        # Unmatched paths are not worth a series each
+        return "unmatched", ""
+    cls = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", None) or {}
+    return (
+        cls.__name__ if cls else match.view_name,
+        actions.get(request.method.lower(), ""),
+    )
+
+
+class MetricsMiddleware:
+    """
+    Observe the latency and query count of every request. Works under
+    WSGI and ASGI alike: queries are counted through a context variable
+    that follows the request onto the threads running its view.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        counter = QueryCounter()
+        token = _request_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.observe(request, response, time.perf_counter() - start, counter)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = _request_queries.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.observe(request, response, time.perf_counter() - start, counter)
+        return response
+
+    @staticmethod
+    def observe(request, response, elapsed: float, counter: QueryCounter):
+        view, action = view_labels(request)
+        REQUEST_LATENCY.observe(
+            elapsed,
+            view=view,
+            action=action,
+            method=request.method,
+            status=response.status_code,
+        )
+        REQUEST_QUERIES.observe(counter.count, view=view, action=action)
+        REGISTRY.flush()
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. With ``METRICS_TOKEN`` set it expects
+    ``Authorization: Bearer <token>``.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+    return HttpResponse(REGISTRY.exposition(), content_type=CONTENT_TYPE)
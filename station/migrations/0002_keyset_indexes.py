@@ -0,0 +1,25 @@
+# Generated by Django 4.0.4 on 2026-10-18 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0001_squashed_0004_alter_train_options'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['departure_time', 'id'], name='journey_departure_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='station',
+            index=models.Index(fields=['name', 'id'], name='station_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='train',
+            index=models.Index(fields=['name', 'id'], name='train_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.4 on 2026-10-18 04:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0003_journey_seats_sold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatMap',
+            fields=[
+                ('journey', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seat_map', serialize=False, to='station.journey')),
+                ('bitmap', models.BinaryField(default=bytes)),
+            ],
+        ),
+    ]
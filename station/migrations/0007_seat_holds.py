@@ -0,0 +1,44 @@
+# Generated by Django 4.0.4 on 2026-10-18 05:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('station', '0006_updated_at_and_journey_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('journey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to='station.journey')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HeldSeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cargo', models.IntegerField()),
+                ('seat', models.IntegerField()),
+                ('hold', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='station.seathold')),
+                ('journey', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='held_seats', to='station.journey')),
+            ],
+            options={
+                'ordering': ['cargo', 'seat'],
+                'unique_together': {('journey', 'cargo', 'seat')},
+            },
+        ),
+    ]
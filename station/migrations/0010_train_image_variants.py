@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-18 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0009_order_request'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='train',
+            name='image_variants',
+            field=models.JSONField(editable=False, null=True),
+        ),
+    ]
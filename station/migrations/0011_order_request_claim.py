@@ -0,0 +1,31 @@
+# Generated by Django 4.0.4 on 2026-10-18 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0010_train_image_variants'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='orderrequest',
+            name='order_request_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='orderrequest',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='orderrequest',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='orderrequest',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'processing'])), fields=['created_at'], name='order_request_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-18 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('station', '0011_order_request_claim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='train',
+            name='image_claimed_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
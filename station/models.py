@@ -1,16 +1,21 @@
-import os
 import uuid
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
-from django.utils.text import slugify
 
 
 class Station(models.Model):
     name = models.CharField(max_length=255)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "id"], name="station_name_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -24,6 +29,15 @@ class Route(models.Model):
         to=Station, on_delete=models.CASCADE, related_name="route_destinations"
     )
     distance = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["source", "destination"],
+                name="route_source_destination_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.source} -> {self.destination}"
@@ -32,6 +46,7 @@ class Route(models.Model):
 class Crew(models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
@@ -39,16 +54,17 @@ class Crew(models.Model):
 
 class TrainType(models.Model):
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self) -> str:
         return self.name
 
 
 def train_image_file_path(instance, filename):
-    _, extension = os.path.splitext(filename)
-    filename = f"{slugify(instance.name)}-{uuid.uuid4()}{extension}"
+    """Name after the image's content, see station.images"""
+    from station.images import content_name
 
-    return os.path.join("uploads/trains/", filename)
+    return content_name(instance.image.file)
 
 
 class Train(models.Model):
@@ -59,9 +75,17 @@ class Train(models.Model):
         to=TrainType, on_delete=models.CASCADE, related_name="trains"
     )
     image = models.ImageField(null=True, upload_to=train_image_file_path)
+    # Storage names of the resized copies, None until they are rendered
+    image_variants = models.JSONField(null=True, editable=False)
+    # Set while a process_train_images worker renders the variants
+    image_claimed_at = models.DateTimeField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            models.Index(fields=["name", "id"], name="train_name_id_idx"),
+        ]
 
     @property
     def capacity(self) -> int:
@@ -81,11 +105,42 @@ class Journey(models.Model):
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(to=Crew)
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped together with updated_at on every ticket or crew change
+    version = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["departure_time", "id"],
+                name="journey_departure_id_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return str(self.route)
 
 
+class SeatMap(models.Model):
+    """
+    Packed occupancy of a journey: one bit per seat, cargo by cargo,
+    most significant bit first. Kept in sync with tickets by
+    ``station.occupancy`` so the seat map is read from a single row.
+    """
+
+    journey = models.OneToOneField(
+        to=Journey,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="seat_map",
+    )
+    bitmap = models.BinaryField(default=bytes)
+
+    def __str__(self) -> str:
+        return f"Seat map of {self.journey_id}"
+
+
 class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     user = models.ForeignKey(
@@ -157,3 +212,122 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("journey", "cargo", "seat")
         ordering = ["cargo", "seat"]
+
+
+class SeatHold(models.Model):
+    """
+    Seats of a journey reserved for a user until ``expires_at``. Confirming
+    the hold turns its seats into an order; expired holds are ignored and
+    deleted by the ``sweep_expired`` command.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    journey = models.ForeignKey(
+        to=Journey, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"Hold {self.id} until {self.expires_at}"
+
+    class Meta:
+        ordering = ["-created_at"]
+
+
+class HeldSeat(models.Model):
+    cargo = models.IntegerField()
+    seat = models.IntegerField()
+    journey = models.ForeignKey(
+        to=Journey, on_delete=models.CASCADE, related_name="held_seats"
+    )
+    hold = models.ForeignKey(
+        to=SeatHold, on_delete=models.CASCADE, related_name="seats"
+    )
+
+    def __str__(self) -> str:
+        return f"{str(self.journey)} (cargo: {self.cargo}, seat: {self.seat})"
+
+    class Meta:
+        unique_together = ("journey", "cargo", "seat")
+        ordering = ["cargo", "seat"]
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response of a request made with an ``Idempotency-Key`` header, replayed
+    for retries of the same request until ``expires_at``
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="idempotency_keys",
+    )
+    key = models.CharField(max_length=64)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    # Set by the view, such as Location, sent again with the response
+    headers = models.JSONField(null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:
+        return self.key
+
+    class Meta:
+        unique_together = ("user", "key")
+
+
+class OrderRequest(models.Model):
+    """
+    An order accepted for asynchronous processing. ``process_orders``
+    workers claim it, run the stored payload through the regular order
+    validation and record the resulting order or errors.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        PROCESSING = "processing"
+        DONE = "done"
+        FAILED = "failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="order_requests",
+    )
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=16, choices=Status.choices, default=Status.PENDING
+    )
+    order = models.OneToOneField(
+        to=Order,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="request",
+    )
+    errors = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"Order request {self.id} ({self.status})"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status__in=["pending", "processing"]),
+                name="order_request_pending_idx",
+            ),
+        ]
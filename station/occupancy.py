@@ -0,0 +1,328 @@
+"""
+Per-journey seat occupancy stored as a packed bitmap.
+
+Seat ``(cargo, seat)`` of a train with ``places_in_cargo`` seats per cargo
+is bit ``(cargo - 1) * places_in_cargo + (seat - 1)``, most significant bit
+of each byte first. Every ticket write goes through ``book_seats`` or
+``release_seats``, which lock the journey's ``SeatMap`` row and update the
+bitmap together with ``Journey.seats_sold``.
+"""
+import bisect
+import heapq
+from collections.abc import Iterable
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest, Now
+from django.utils import timezone
+
+from station.models import HeldSeat, Journey, SeatMap, Ticket
+
+
+def seat_index(cargo: int, seat: int, places_in_cargo: int) -> int:
+    return (cargo - 1) * places_in_cargo + (seat - 1)
+
+
+def bitmap_size(seats: int) -> int:
+    """Number of bytes needed to hold one bit per seat"""
+    return (seats + 7) // 8
+
+
+def fit_bitmap(bitmap: bytes, seats: int) -> bytes:
+    """Pad or truncate a bitmap to the size of the current train layout"""
+    size = bitmap_size(seats)
+    return bytes(bitmap[:size]).ljust(size, b"\x00")
+
+
+def is_taken(bitmap: bytes, index: int) -> bool:
+    byte = index >> 3
+    return byte < len(bitmap) and bool(bitmap[byte] & (0x80 >> (index & 7)))
+
+
+def set_seats(bitmap: bytes, indices: Iterable[int], taken=True) -> bytes:
+    bits = bytearray(bitmap)
+    for index in indices:
+        byte = index >> 3
+        if byte >= len(bits):
+            bits.extend(b"\x00" * (byte + 1 - len(bits)))
+        if taken:
+            bits[byte] |= 0x80 >> (index & 7)
+        else:
+            bits[byte] &= ~(0x80 >> (index & 7)) & 0xFF
+    return bytes(bits)
+
+
+def build_bitmap(journey: Journey) -> bytes:
+    """Rebuild the bitmap of a journey from its tickets"""
+    train = journey.train
+    seats = Ticket.objects.filter(journey=journey).values_list("cargo", "seat")
+    return fit_bitmap(
+        set_seats(
+            b"",
+            (seat_index(cargo, seat, train.places_in_cargo)
+             for cargo, seat in seats),
+        ),
+        train.capacity,
+    )
+
+
+def get_bitmap(journey: Journey) -> bytes:
+    """
+    Read the occupancy of a journey whose ``seat_map`` and ``train`` were
+    selected together with it, sized to the current train layout.
+    """
+    try:
+        bitmap = journey.seat_map.bitmap
+    except SeatMap.DoesNotExist:
+        bitmap = build_bitmap(journey)
+
+    return fit_bitmap(bitmap, journey.train.capacity)
+
+
+def lock_seat_map(journey_id: int, create=True) -> SeatMap | None:
+    """
+    Lock the seat map row of a journey, creating it from the journey's
+    tickets the first time it is needed. Must run inside a transaction.
+    """
+    queryset = SeatMap.objects.select_for_update(of=("self",)).select_related(
+        "journey__train"
+    )
+    try:
+        return queryset.get(journey_id=journey_id)
+    except SeatMap.DoesNotExist:
+        if not create:
+            return None
+        journey = Journey.objects.select_related("train").get(pk=journey_id)
+        SeatMap.objects.get_or_create(
+            journey=journey, defaults={"bitmap": build_bitmap(journey)}
+        )
+        return queryset.get(journey_id=journey_id)
+
+
+def seat_pair(index: int, places_in_cargo: int) -> tuple[int, int]:
+    """Inverse of ``seat_index``"""
+    cargo, seat = divmod(index, places_in_cargo)
+    return cargo + 1, seat + 1
+
+
+def held_indices(journey_id: int, places_in_cargo: int) -> set[int]:
+    """Seats of a journey under a hold that has not expired yet"""
+    return {
+        seat_index(cargo, seat, places_in_cargo)
+        for cargo, seat in HeldSeat.objects.filter(
+            journey_id=journey_id, hold__expires_at__gt=timezone.now()
+        ).values_list("cargo", "seat")
+    }
+
+
+def suggest_seats(
+        bitmap: bytes,
+        blocked: set[int],
+        capacity: int,
+        near: Iterable[int],
+        count: int,
+) -> list[int]:
+    """Up to count free seats, the closest to the requested ones first"""
+    near = sorted(set(near))
+    if not near or count <= 0:
+        return []
+
+    def distance(index: int) -> int:
+        position = bisect.bisect_left(near, index)
+        return min(
+            abs(index - near[i])
+            for i in (position - 1, position)
+            if 0 <= i < len(near)
+        )
+
+    free = (
+        index
+        for index in range(capacity)
+        if index not in blocked and not is_taken(bitmap, index)
+    )
+    return sorted(heapq.nsmallest(count, free, key=distance))
+
+
+def free_runs(
+        bitmap: bytes, blocked: set[int], cargo_num: int, places_in_cargo: int
+) -> list[list[tuple[int, int]]]:
+    """Runs of adjacent free seats of every cargo as (first index, length)"""
+    runs = []
+    for cargo in range(cargo_num):
+        cargo_runs = []
+        start = None
+        first = cargo * places_in_cargo
+        for index in range(first, first + places_in_cargo):
+            if index in blocked or is_taken(bitmap, index):
+                if start is not None:
+                    cargo_runs.append((start, index - start))
+                    start = None
+            elif start is None:
+                start = index
+        if start is not None:
+            cargo_runs.append((start, first + places_in_cargo - start))
+        runs.append(cargo_runs)
+
+    return runs
+
+
+def find_seat_block(
+        bitmap: bytes,
+        blocked: set[int],
+        cargo_num: int,
+        places_in_cargo: int,
+        count: int,
+) -> list[int] | None:
+    """
+    Seat indices for a group of count passengers, or None when fewer seats
+    are free. Prefers the tightest run of adjacent seats in one cargo, then
+    one cargo holding the longest runs, then the fewest cargos, filled
+    from their longest runs. One pass over the seats.
+    """
+    runs = free_runs(bitmap, blocked, cargo_num, places_in_cargo)
+
+    fitting = [
+        run for cargo_runs in runs for run in cargo_runs if run[1] >= count
+    ]
+    if fitting:
+        start, _ = min(fitting, key=lambda run: (run[1], run[0]))
+        return list(range(start, start + count))
+
+    cargos = [
+        (
+            sum(length for _, length in cargo_runs),
+            sorted(cargo_runs, key=lambda run: (-run[1], run[0])),
+        )
+        for cargo_runs in runs
+        if cargo_runs
+    ]
+    if sum(free for free, _ in cargos) < count:
+        return None
+
+    single = [cargo for cargo in cargos if cargo[0] >= count]
+    if single:
+        # The cargo with the longest run keeps the group closest together
+        chosen = [max(single, key=lambda cargo: cargo[1][0][1])]
+    else:
+        # Filling the emptiest cargos first needs the fewest of them
+        chosen = sorted(cargos, key=lambda cargo: -cargo[0])
+
+    indices = []
+    for _, cargo_runs in chosen:
+        for start, length in cargo_runs:
+            indices.extend(
+                range(start, start + min(length, count - len(indices)))
+            )
+            if len(indices) == count:
+                return sorted(indices)
+
+    return None
+
+
+class SeatsTaken(Exception):
+    """
+    Some of the seats being booked or held are sold or held already.
+    ``alternatives`` are free seats of the same journey close to them.
+    """
+
+    def __init__(
+            self,
+            journey_id: int,
+            seats: list[tuple[int, int]],
+            alternatives: list[tuple[int, int]] = (),
+    ):
+        super().__init__(journey_id, seats)
+        self.journey_id = journey_id
+        self.seats = seats
+        self.alternatives = list(alternatives)
+
+
+def check_available(
+        seat_map: SeatMap, seats: list[tuple[int, int]]
+) -> list[int]:
+    """
+    Seat indices of seats that are neither sold nor held, or SeatsTaken.
+    The seat map must be locked by the caller.
+    """
+    train = seat_map.journey.train
+    indices = [
+        seat_index(cargo, seat, train.places_in_cargo)
+        for cargo, seat in seats
+    ]
+    held = held_indices(seat_map.journey_id, train.places_in_cargo)
+    taken = [
+        pair
+        for pair, index in zip(seats, indices)
+        if index in held or is_taken(seat_map.bitmap, index)
+    ]
+    if taken:
+        alternatives = suggest_seats(
+            seat_map.bitmap,
+            held | set(indices),
+            train.capacity,
+            near=indices,
+            count=len(taken),
+        )
+        raise SeatsTaken(
+            seat_map.journey_id,
+            taken,
+            [
+                seat_pair(index, train.places_in_cargo)
+                for index in alternatives
+            ],
+        )
+
+    return indices
+
+
+def _update_seats(
+        journey_id: int,
+        seats: Iterable[tuple[int, int]],
+        taken: bool,
+        check_taken=False,
+) -> None:
+    seats = list(seats)
+    if not seats:
+        return
+
+    with transaction.atomic():
+        # A missing map is built from the tickets on its next booking, so
+        # releasing seats never creates one (the journey may be deleting)
+        seat_map = lock_seat_map(journey_id, create=taken)
+
+        if seat_map is not None:
+            places_in_cargo = seat_map.journey.train.places_in_cargo
+            indices = [
+                seat_index(cargo, seat, places_in_cargo)
+                for cargo, seat in seats
+            ]
+            if check_taken:
+                check_available(seat_map, seats)
+
+            seat_map.bitmap = set_seats(
+                seat_map.bitmap, indices, taken=taken
+            )
+            seat_map.save(update_fields=["bitmap"])
+
+        delta = len(seats) if taken else -len(seats)
+        Journey.objects.filter(pk=journey_id).update(
+            seats_sold=Greatest(F("seats_sold") + delta, 0),
+            version=F("version") + 1,
+            updated_at=Now(),
+        )
+
+
+def book_seats(
+        journey_id: int, seats: Iterable[tuple[int, int]], check_taken=False
+) -> None:
+    """
+    Mark ``(cargo, seat)`` pairs of a journey as sold. With check_taken,
+    raise ``SeatsTaken`` instead when any of them is sold or held already;
+    the map stays locked until the surrounding transaction ends.
+    """
+    _update_seats(journey_id, seats, taken=True, check_taken=check_taken)
+
+
+def release_seats(journey_id: int, seats: Iterable[tuple[int, int]]) -> None:
+    """Give ``(cargo, seat)`` pairs of a journey back to sale"""
+    _update_seats(journey_id, seats, taken=False)
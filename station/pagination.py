@@ -0,0 +1,233 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Opaque-cursor pagination that seeks on a unique ordering.
+
+    Instead of an OFFSET every page is selected with a ``WHERE`` clause on
+    the values of the last row already seen, so a deep page costs the same
+    index range scan as the first one. The ordering must be ascending,
+    unique (end it with ``id``) and backed by a composite index.
+
+    The total ``count`` is not part of the response unless the client asks
+    for it with ``?count=true``, because it always needs a full scan.
+    """
+
+    ordering = ("id",)
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    include_count = False
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = None
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        if self.get_include_count(request):
+            self.count = queryset.count()
+
+        if reverse:
+            queryset = queryset.order_by(
+                *[f"-{field}" for field in self.ordering]
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(position, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.first_position = self._row_position(rows[0]) if rows else position
+        self.last_position = self._row_position(rows[-1]) if rows else position
+
+        return rows
+
+    def get_paginated_response(self, data):
+        response = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.count is not None:
+            response = {"count": self.count, **response}
+
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {
+                    "type": "integer",
+                    "example": 123,
+                    "description": "Only present with ?count=true",
+                },
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include the total number of results "
+                               "(ex. ?count=true)",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def get_include_count(self, request) -> bool:
+        value = request.query_params.get(self.count_query_param)
+        if value is None:
+            return self.include_count
+
+        return value.lower() in ("1", "true", "yes")
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        payload = {"p": [self._dump_value(value) for value in position]}
+        if reverse:
+            payload["r"] = 1
+
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode()
+
+        url = remove_query_param(self.base_url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, model) -> tuple[list | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values = payload["p"]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, bool(payload.get("r"))
+
+    def _seek_filter(self, position: list, reverse: bool) -> Q:
+        """
+        Expand ``(f1, f2, ...) > (v1, v2, ...)`` into OR-ed prefixes.
+
+        The leading ``f1 >= v1`` conjunct keeps the predicate sargable for
+        the composite index on the ordering.
+        """
+        lookup = "lt" if reverse else "gt"
+        bound = "lte" if reverse else "gte"
+
+        seek = Q()
+        for i, field in enumerate(self.ordering):
+            prefix = {
+                name: value
+                for name, value in zip(self.ordering[:i], position[:i])
+            }
+            seek |= Q(**prefix, **{f"{field}__{lookup}": position[i]})
+
+        return Q(**{f"{self.ordering[0]}__{bound}": position[0]}) & seek
+
+    def _row_position(self, row) -> list:
+        if isinstance(row, dict):
+            # values() rows
+            return [row[field] for field in self.ordering]
+        return [getattr(row, field) for field in self.ordering]
+
+    @staticmethod
+    def _dump_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+
+        return value
+
+
+class JourneyPagination(KeysetPagination):
+    ordering = ("departure_time", "id")
+
+
+class NameKeysetPagination(KeysetPagination):
+    ordering = ("name", "id")
+
+
+class IdKeysetPagination(KeysetPagination):
+    ordering = ("id",)
@@ -0,0 +1,90 @@
+"""
+Query budgets: count the SQL a block of code runs and compare it with a
+declared maximum, in tests (``assert_max_queries``) and optionally at
+runtime for viewsets (``QueryBudgetMixin``).
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Execute wrapper counting the queries and the time spent in them"""
+
+    def __init__(self, capture_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.capture_sql = capture_sql
+        self.queries: list[str] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            if self.capture_sql:
+                self.queries.append(sql)
+
+
+@contextmanager
+def count_queries(using=DEFAULT_DB_ALIAS, capture_sql=False):
+    counter = QueryCounter(capture_sql=capture_sql)
+    with connections[using].execute_wrapper(counter):
+        yield counter
+
+
+@contextmanager
+def assert_max_queries(budget: int, using=DEFAULT_DB_ALIAS):
+    """Fail when the block runs more than budget queries"""
+    with count_queries(using, capture_sql=True) as counter:
+        yield counter
+
+    if counter.count > budget:
+        queries = "\n".join(
+            f"{number}. {sql}"
+            for number, sql in enumerate(counter.queries, start=1)
+        )
+        raise AssertionError(
+            f"{counter.count} queries executed, the budget is {budget}:\n"
+            f"{queries}"
+        )
+
+
+class QueryBudgetMixin:
+    """
+    Declare the maximum number of queries per viewset action, including
+    authentication. With ``QUERY_BUDGET_LOGGING`` enabled every request
+    over its budget is logged as a warning.
+    """
+
+    query_budget: dict[str, int] = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        if not getattr(settings, "QUERY_BUDGET_LOGGING", False):
+            return super().dispatch(request, *args, **kwargs)
+
+        with count_queries() as counter:
+            response = super().dispatch(request, *args, **kwargs)
+
+        action = getattr(self, "action", None)
+        budget = self.query_budget.get(action)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                "Query budget exceeded: %s.%s ran %d queries (budget %d) "
+                "in %.1f ms for %s",
+                type(self).__name__,
+                action,
+                counter.count,
+                budget,
+                counter.duration * 1000,
+                request.get_full_path(),
+            )
+
+        return response
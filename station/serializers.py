@@ -1,7 +1,29 @@
-from django.db import transaction
+import base64
+from collections import defaultdict
+from operator import itemgetter
+
+from django.db import IntegrityError
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator
+
+from station.booking import (
+    NotEnoughSeats,
+    create_group_order,
+    create_order,
+    place_hold,
+)
+from station.exceptions import SeatConflict
+from station.fast_list import RowsSerializerMixin, datetime_getter
+from station.images import (
+    known_variants,
+    list_image_url,
+    store_image,
+    variant_urls,
+)
+from station.metrics import SEAT_CONFLICTS
 from station.models import (
     TrainType,
     Train,
@@ -11,14 +33,18 @@ from station.models import (
     Journey,
     Ticket,
     Order,
+    SeatHold,
+    HeldSeat,
+    OrderRequest,
 )
+from station.occupancy import SeatsTaken, get_bitmap
 
 
 class TrainTypeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = TrainType
-        fields = "__all__"
+        fields = ("id", "name")
 
 
 class TrainSerializer(serializers.ModelSerializer):
@@ -35,11 +61,33 @@ class TrainSerializer(serializers.ModelSerializer):
         ]
 
 
-class TrainListSerializer(TrainSerializer):
+@extend_schema_field(
+    {
+        "type": "object",
+        "additionalProperties": {"type": "string", "format": "uri"},
+        "nullable": True,
+    }
+)
+class ImageVariantsField(serializers.Field):
+    """
+    URLs of the resized copies of an image by variant name, null while
+    they are being rendered
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants: dict) -> dict[str, str]:
+        return variant_urls(variants, self.context.get("request"))
+
+
+class TrainListSerializer(RowsSerializerMixin, TrainSerializer):
     train_type = serializers.SlugRelatedField(
         many=False, read_only=True, slug_field="name"
     )
-    image = serializers.ImageField(read_only=True)
+    image = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Train
@@ -51,12 +99,52 @@ class TrainListSerializer(TrainSerializer):
             "train_type",
             "capacity",
             "image",
+            "image_variants",
         )
 
+    values_fields = (
+        "id",
+        "name",
+        "cargo_num",
+        "places_in_cargo",
+        "train_type__name",
+        "image",
+        "image_variants",
+    )
+
+    def get_image(self, train: Train) -> str | None:
+        return list_image_url(
+            train.image.name, train.image_variants, self.context.get("request")
+        )
+
+    @classmethod
+    def row_getters(cls, rows, context):
+        request = context.get("request")
+
+        def image_variants(row):
+            variants = row["image_variants"]
+            if variants is None:
+                return None
+            return variant_urls(variants, request)
+
+        return {
+            "id": itemgetter("id"),
+            "name": itemgetter("name"),
+            "cargo_num": itemgetter("cargo_num"),
+            "places_in_cargo": itemgetter("places_in_cargo"),
+            "train_type": itemgetter("train_type__name"),
+            "capacity": lambda row: row["cargo_num"] * row["places_in_cargo"],
+            "image": lambda row: list_image_url(
+                row["image"], row["image_variants"], request
+            ),
+            "image_variants": image_variants,
+        }
+
 
 class TrainDetailSerializer(TrainSerializer):
     train_type = TrainTypeSerializer(many=False, read_only=True)
     image = serializers.ImageField(read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Train
@@ -68,38 +156,67 @@ class TrainDetailSerializer(TrainSerializer):
             "train_type",
             "capacity",
             "image",
+            "image_variants",
         )
 
 
 class TrainImageSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = Train
-        fields = ("id", "image")
+        fields = ("id", "image", "image_variants")
+        extra_kwargs = {"image": {"required": True}}
+
+    def update(self, instance: Train, validated_data: dict) -> Train:
+        """
+        Store the image under its content hash, the variants are rendered
+        by process_train_images unless the same image has them already
+        """
+        instance.image = store_image(validated_data["image"])
+        instance.image_variants = known_variants(instance.image.name)
+        instance.image_claimed_at = None
+        instance.save(
+            update_fields=[
+                "image",
+                "image_variants",
+                "image_claimed_at",
+                "updated_at",
+            ]
+        )
+        return instance
 
 
 class CrewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Crew
-        fields = "__all__"
+        fields = ("id", "first_name", "last_name")
 
 
 class StationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Station
-        fields = "__all__"
+        fields = ("id", "name", "latitude", "longitude")
+
+
+class NearbyStationSerializer(StationSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Station
+        fields = ("id", "name", "latitude", "longitude", "distance")
 
 
 class RouteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Route
-        fields = "__all__"
+        fields = ("id", "source", "destination", "distance")
 
 
-class RouteListSerializer(RouteSerializer):
+class RouteListSerializer(RowsSerializerMixin, RouteSerializer):
     source = serializers.SlugRelatedField(
         many=False, read_only=True, slug_field="name"
     )
@@ -107,15 +224,38 @@ class RouteListSerializer(RouteSerializer):
         many=False, read_only=True, slug_field="name"
     )
 
+    values_fields = (
+        "id",
+        "source__name",
+        "destination__name",
+        "distance",
+    )
+
+    @classmethod
+    def row_getters(cls, rows, context):
+        return {
+            "id": itemgetter("id"),
+            "source": itemgetter("source__name"),
+            "destination": itemgetter("destination__name"),
+            "distance": itemgetter("distance"),
+        }
+
 
 class JourneySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Journey
-        fields = "__all__"
+        fields = (
+            "id",
+            "route",
+            "train",
+            "departure_time",
+            "arrival_time",
+            "crew",
+        )
 
 
-class JourneyListSerializer(JourneySerializer):
+class JourneyListSerializer(RowsSerializerMixin, JourneySerializer):
     route = serializers.StringRelatedField(many=False)
     train_name = serializers.CharField(source="train.name", read_only=True)
     crew = serializers.StringRelatedField(many=True)
@@ -133,8 +273,109 @@ class JourneyListSerializer(JourneySerializer):
             "tickets_available",
         )
 
+    values_fields = (
+        "id",
+        "route__source__name",
+        "route__destination__name",
+        "train__name",
+        "departure_time",
+        "arrival_time",
+        "tickets_available",
+    )
+
+    @classmethod
+    def row_getters(cls, rows, context):
+        crew = defaultdict(list)
+        if rows:
+            # In the order of the crew prefetch of JourneyViewSet
+            for journey_id, first_name, last_name in (
+                Journey.crew.through.objects.filter(
+                    journey_id__in=[row["id"] for row in rows]
+                )
+                .order_by("crew_id")
+                .values_list(
+                    "journey_id", "crew__first_name", "crew__last_name"
+                )
+            ):
+                crew[journey_id].append(f"{first_name} {last_name}")
+
+        return {
+            "id": itemgetter("id"),
+            "route": lambda row: (
+                f"{row['route__source__name']} -> "
+                f"{row['route__destination__name']}"
+            ),
+            "train_name": itemgetter("train__name"),
+            "departure_time": datetime_getter("departure_time"),
+            "arrival_time": datetime_getter("arrival_time"),
+            "crew": lambda row: crew[row["id"]],
+            "tickets_available": itemgetter("tickets_available"),
+        }
+
+
+class TicketJourneyField(serializers.PrimaryKeyRelatedField):
+    """Journey of a ticket, looked up among those its list preloaded"""
+
+    def to_internal_value(self, data):
+        journeys = getattr(self.parent.parent, "journeys", {})
+        if not isinstance(data, bool):
+            try:
+                return journeys[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
+class TicketBatchSerializer(serializers.ListSerializer):
+    """
+    Validate a list of tickets with one query for all their journeys and
+    trains. Seats repeated within the list are found in memory instead of
+    one unique check per ticket; seats sold or held already are reported
+    by ``create_order`` under the seat map lock, as a conflict listing
+    free seats close to them.
+    """
+
+    unique_message = UniqueTogetherValidator.message.format(
+        field_names="journey, cargo, seat"
+    )
+
+    def to_internal_value(self, data):
+        self.journeys = self._load_journeys(data)
+        tickets = super().to_internal_value(data)
+
+        seen = set()
+        errors = []
+        for ticket in tickets:
+            key = (ticket["journey"].id, ticket["cargo"], ticket["seat"])
+            if key in seen:
+                errors.append(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [self.unique_message]}
+                )
+            else:
+                errors.append({})
+            seen.add(key)
+
+        if any(errors):
+            raise ValidationError(errors, code="unique")
+
+        return tickets
+
+    @staticmethod
+    def _load_journeys(data) -> dict[int, Journey]:
+        ids = set()
+        for item in data if isinstance(data, list) else ():
+            try:
+                ids.add(int(item["journey"]))
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        return Journey.objects.select_related("train").in_bulk(ids)
+
 
 class TicketSerializer(serializers.ModelSerializer):
+    journey = TicketJourneyField(
+        queryset=Journey.objects.select_related("train")
+    )
 
     def validate(self, attrs: dict):
         data = super(TicketSerializer, self).validate(attrs=attrs)
@@ -149,6 +390,9 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("id", "cargo", "seat", "journey")
+        list_serializer_class = TicketBatchSerializer
+        # Uniqueness is checked for the whole list by TicketBatchSerializer
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -183,21 +427,204 @@ class JourneyDetailSerializer(JourneySerializer):
         )
 
 
+class JourneySeatMapSerializer(serializers.ModelSerializer):
+    cargo_num = serializers.IntegerField(source="train.cargo_num")
+    places_in_cargo = serializers.IntegerField(source="train.places_in_cargo")
+    encoding = serializers.SerializerMethodField()
+    bitmap = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Journey
+        fields = (
+            "id",
+            "cargo_num",
+            "places_in_cargo",
+            "seats_sold",
+            "encoding",
+            "bitmap",
+        )
+
+    def get_encoding(self, journey: Journey) -> str:
+        return "base64"
+
+    def get_bitmap(self, journey: Journey) -> str:
+        return base64.b64encode(get_bitmap(journey)).decode()
+
+
+class ConnectionLegSerializer(serializers.Serializer):
+    journey = serializers.IntegerField(source="journey_id")
+    train_name = serializers.CharField()
+    source = serializers.IntegerField(source="source_id")
+    source_name = serializers.CharField()
+    destination = serializers.IntegerField(source="destination_id")
+    destination_name = serializers.CharField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    transfers = serializers.IntegerField()
+    legs = ConnectionLegSerializer(many=True)
+
+
 class OrderSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    """
+    An order either lists its tickets, or asks for ``passengers`` seats of
+    a ``journey`` and lets the server seat the group together
+    """
+
+    tickets = TicketSerializer(
+        many=True, read_only=False, allow_empty=False, required=False
+    )
+    journey = serializers.PrimaryKeyRelatedField(
+        queryset=Journey.objects.select_related("train"),
+        write_only=True,
+        required=False,
+    )
+    passengers = serializers.IntegerField(
+        min_value=1, write_only=True, required=False
+    )
 
     class Meta:
         model = Order
-        fields = ("id", "tickets", "created_at")
+        fields = ("id", "tickets", "journey", "passengers", "created_at")
+
+    def validate(self, attrs: dict):
+        data = super(OrderSerializer, self).validate(attrs=attrs)
+        if ("tickets" in attrs) == ("passengers" in attrs):
+            raise ValidationError(
+                "Provide either tickets or journey with passengers."
+            )
+        if "passengers" in attrs:
+            if "journey" not in attrs:
+                raise ValidationError(
+                    {"journey": "This field is required with passengers."}
+                )
+            capacity = attrs["journey"].train.capacity
+            if attrs["passengers"] > capacity:
+                raise ValidationError(
+                    {"passengers": f"The train has {capacity} seats."}
+                )
+        return data
 
     def create(self, validated_data: dict):
-        with transaction.atomic():
+        try:
+            if "passengers" in validated_data:
+                return create_group_order(
+                    validated_data.pop("journey"),
+                    validated_data.pop("passengers"),
+                    **validated_data,
+                )
+
+            validated_data.pop("journey", None)
             tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
-            return order
+            return create_order(tickets_data, **validated_data)
+        except NotEnoughSeats as error:
+            SEAT_CONFLICTS.inc(operation="order", reason="not_enough_seats")
+            raise SeatConflict(
+                detail=f"Only {error.available} seats are available."
+            )
+        except SeatsTaken as error:
+            # Sold or held already, found under the seat map lock
+            SEAT_CONFLICTS.inc(operation="order", reason="seats_taken")
+            raise SeatConflict(error.seats, error.alternatives)
+        except IntegrityError:
+            SEAT_CONFLICTS.inc(operation="order", reason="integrity")
+            raise SeatConflict()
 
 
 class OrderListSerializer(OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+
+class HeldSeatSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = HeldSeat
+        fields = ("cargo", "seat")
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    journey = serializers.PrimaryKeyRelatedField(
+        queryset=Journey.objects.select_related("train")
+    )
+    seats = HeldSeatSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = SeatHold
+        fields = ("id", "journey", "seats", "created_at", "expires_at")
+        read_only_fields = ("created_at", "expires_at")
+
+    def validate(self, attrs: dict):
+        data = super(SeatHoldSerializer, self).validate(attrs=attrs)
+        seats = [(seat["cargo"], seat["seat"]) for seat in attrs["seats"]]
+        for cargo, seat in seats:
+            Ticket.validate_ticket(
+                cargo, seat, attrs["journey"].train, ValidationError
+            )
+        if len(set(seats)) != len(seats):
+            raise ValidationError({"seats": "Seats must not repeat."})
+        return data
+
+    def create(self, validated_data: dict):
+        seats = [
+            (seat["cargo"], seat["seat"]) for seat in validated_data["seats"]
+        ]
+        try:
+            return place_hold(
+                validated_data["user"], validated_data["journey"], seats
+            )
+        except SeatsTaken as error:
+            SEAT_CONFLICTS.inc(operation="hold", reason="seats_taken")
+            raise SeatConflict(error.seats, error.alternatives)
+
+
+class TicketIntakeSerializer(serializers.Serializer):
+    cargo = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
+    journey = serializers.IntegerField(min_value=1)
+
+
+class OrderIntakeSerializer(serializers.Serializer):
+    """
+    Checks of an order that need no queries, run before it is queued.
+    The full ``OrderSerializer`` validation runs when it is processed.
+    """
+
+    tickets = TicketIntakeSerializer(
+        many=True, allow_empty=False, required=False
+    )
+    journey = serializers.IntegerField(min_value=1, required=False)
+    passengers = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs: dict):
+        data = super(OrderIntakeSerializer, self).validate(attrs=attrs)
+        if ("tickets" in attrs) == ("passengers" in attrs):
+            raise ValidationError(
+                "Provide either tickets or journey with passengers."
+            )
+        if "passengers" in attrs and "journey" not in attrs:
+            raise ValidationError(
+                {"journey": "This field is required with passengers."}
+            )
+        return data
+
+
+class OrderRequestSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(
+        view_name="station:orderrequest-detail"
+    )
+
+    class Meta:
+        model = OrderRequest
+        fields = (
+            "id",
+            "url",
+            "status",
+            "order",
+            "errors",
+            "created_at",
+            "processed_at",
+        )
@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.functions import Now
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from station.cache import bump_version_on_commit, model_version_name
+from station.connections import graphs, load_legs, service_day
+from station.metrics import install_query_counter
+from station.models import (
+    Crew,
+    Journey,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+)
+from station.occupancy import book_seats, release_seats
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    """Let MetricsMiddleware count queries on every thread's connection"""
+    install_query_counter(connection)
+
+
+@receiver(post_save, sender=Ticket)
+def book_ticket_seat(
+        sender, instance: Ticket, created: bool, raw=False, **kwargs
+):
+    """Keep the journey's seat map and seats_sold in step with a new ticket"""
+    if created and not raw:
+        book_seats(instance.journey_id, [(instance.cargo, instance.seat)])
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance: Ticket, **kwargs):
+    """Give the seat of a deleted or cancelled ticket back to the journey"""
+    release_seats(instance.journey_id, [(instance.cargo, instance.seat)])
+
+
+@receiver(m2m_changed, sender=Journey.crew.through)
+def touch_journey_crew(
+        sender, instance, action: str, reverse: bool, pk_set=None, **kwargs
+):
+    """Changing the crew changes the journey's representation"""
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        journeys = Journey.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        journeys = Journey.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        journeys = Journey.objects.filter(crew=instance)
+    else:
+        return
+
+    journeys.update(version=F("version") + 1, updated_at=Now())
+
+
+@receiver(pre_save, sender=Journey)
+def remember_journey_day(sender, instance: Journey, raw=False, **kwargs):
+    """Note the service day a journey leaves, for the connection graphs"""
+    instance._previous_departure_time = None
+    if instance.pk and not raw:
+        instance._previous_departure_time = (
+            Journey.objects.filter(pk=instance.pk)
+            .values_list("departure_time", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Journey)
+@receiver(post_delete, sender=Journey)
+def refresh_connection_graphs(sender, instance: Journey, **kwargs):
+    """Patch the cached connection graphs once the change is committed"""
+    journey_id = instance.pk
+    deleted = kwargs.get("created") is None
+    departure_time = Journey._meta.get_field("departure_time").to_python(
+        instance.departure_time
+    )
+    days = {service_day(departure_time)}
+    previous = getattr(instance, "_previous_departure_time", None)
+    if previous:
+        days.add(service_day(previous))
+
+    def patch():
+        leg = None
+        if not deleted:
+            leg = next(load_legs(Journey.objects.filter(pk=journey_id)), None)
+        graphs.journey_changed(journey_id, days, leg)
+
+    transaction.on_commit(patch)
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Train)
+@receiver(post_delete, sender=Train)
+def reset_connection_graphs(sender, **kwargs):
+    """Station names, route ends and train names are part of every leg"""
+    transaction.on_commit(graphs.clear)
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+@receiver(post_save, sender=TrainType)
+@receiver(post_delete, sender=TrainType)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=Crew)
+@receiver(post_save, sender=Train)
+@receiver(post_delete, sender=Train)
+def bump_catalog_version(sender, **kwargs):
+    """Invalidate cached catalog responses and the nearest-station index"""
+    bump_version_on_commit(model_version_name(sender))
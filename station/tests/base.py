@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from station.throttling import throttle_cache
+
+
+class ApiTestCase(TestCase):
+    """Test case whose requests start with the throttle budgets unused"""
+
+    def setUp(self):
+        super().setUp()
+        # Counts are kept in the cache, which outlives each test
+        throttle_cache().clear()
+
+
+class AuthenticatedApiTestCase(ApiTestCase):
+    """API test case with the requests made as a regular user"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.urls import path
+
+from station.async_views import concurrent_read_urls, concurrent_reads
+
+
+class ConcurrentReadsTests(SimpleTestCase):
+    def setUp(self):
+        self.threads = []
+
+        def view(request, pk=None):
+            self.threads.append(threading.get_ident())
+            response = HttpResponse(f"{request.method} {pk}")
+            response.render = lambda: setattr(response, "rendered", True)
+            return response
+
+        self.view = view
+
+    def _call(self, method, **kwargs):
+        request = getattr(RequestFactory(), method)("/")
+        return asyncio.run(concurrent_reads(self.view)(request, **kwargs))
+
+    def test_reads_run_concurrently_on_the_pool(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def blocking_view(request):
+            # Both reads must be in flight at once to pass the barrier
+            barrier.wait()
+            return self.view(request)
+
+        wrapped = concurrent_reads(blocking_view)
+
+        async def both():
+            factory = RequestFactory()
+            return await asyncio.gather(
+                wrapped(factory.get("/")), wrapped(factory.get("/"))
+            )
+
+        responses = asyncio.run(both())
+
+        self.assertEqual(len(set(self.threads)), 2)
+        self.assertTrue(all(response.rendered for response in responses))
+
+    def test_arguments_and_writes_are_passed_through(self):
+        response = self._call("get", pk=5)
+        self.assertEqual(response.content, b"GET 5")
+
+        response = self._call("post")
+        self.assertEqual(response.content, b"POST None")
+        self.assertFalse(hasattr(response, "rendered"))
+
+    def test_only_prefixed_urls_are_wrapped(self):
+        patterns = concurrent_read_urls(
+            [
+                path("journeys/", self.view, name="journeys"),
+                path("orders/", self.view, name="orders"),
+            ],
+            ("journeys",),
+        )
+
+        self.assertTrue(asyncio.iscoroutinefunction(patterns[0].callback))
+        self.assertEqual(patterns[0].name, "journeys")
+        self.assertIs(patterns[1].callback, self.view)
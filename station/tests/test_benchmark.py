@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from station.benchmark import BENCHMARK_EMAIL, BenchmarkData, compare_reports
+from station.models import Journey, Order, Route, Station, Ticket, Train
+from station.occupancy import build_bitmap
+
+
+def seed(**volumes):
+    options = {
+        "stations": 12,
+        "routes": 30,
+        "trains": 6,
+        "journeys": 60,
+        "users": 5,
+        "orders": 40,
+        "days": 5,
+    }
+    options.update(volumes)
+    call_command("seed_benchmark_data", stdout=StringIO(), **options)
+
+
+class BenchmarkDataTests(TestCase):
+    def test_same_seed_same_rows(self):
+        rows = []
+        for _ in range(2):
+            data = BenchmarkData(seed=7)
+            data.generate_stations(10)
+            rows.append(data.generate_routes(20))
+
+        self.assertEqual(rows[0], rows[1])
+        self.assertEqual(
+            len({(row["source"], row["destination"]) for row in rows[0]}), 20
+        )
+
+    def test_seed_creates_requested_volumes(self):
+        seed()
+
+        self.assertEqual(Station.objects.count(), 12)
+        self.assertEqual(Route.objects.count(), 30)
+        self.assertEqual(Train.objects.count(), 6)
+        self.assertEqual(Journey.objects.count(), 60)
+        self.assertEqual(Order.objects.count(), 40)
+        self.assertTrue(
+            Journey.objects.filter(crew__isnull=False).exists()
+        )
+
+    def test_seeded_tickets_match_seat_counters(self):
+        seed()
+
+        journeys = Journey.objects.select_related(
+            "train", "seat_map"
+        ).annotate(actual=Count("tickets"))
+        for journey in journeys:
+            self.assertEqual(journey.seats_sold, journey.actual)
+            self.assertEqual(journey.seat_map.bitmap, build_bitmap(journey))
+        self.assertEqual(
+            Ticket.objects.values("journey", "cargo", "seat")
+            .distinct()
+            .count(),
+            Ticket.objects.count(),
+        )
+
+
+class RunBenchmarksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seed()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.report_path = os.path.join(self.directory.name, "report.json")
+
+    def run_benchmarks(self, *args, **options):
+        call_command(
+            "run_benchmarks",
+            *args,
+            iterations=2,
+            warmup=0,
+            stdout=StringIO(),
+            stderr=StringIO(),
+            **options,
+        )
+
+    def test_report_covers_every_endpoint(self):
+        self.run_benchmarks(output=self.report_path)
+
+        with open(self.report_path) as file:
+            report = json.load(file)
+
+        self.assertEqual(report["rows"]["journey"], 60)
+        self.assertIn("user_token", report["cases"])
+        self.assertIn("journeys_export", report["cases"])
+        for name, result in report["cases"].items():
+            self.assertLess(result["status"], 400, name)
+            self.assertEqual(result["errors"], 0, name)
+            self.assertGreater(result["peak_memory_kb"], 0, name)
+        self.assertEqual(Order.objects.count(), 40)
+
+    def test_more_queries_than_baseline_fail(self):
+        self.run_benchmarks("--case", "journeys", output=self.report_path)
+        with open(self.report_path) as file:
+            baseline = json.load(file)
+        baseline["cases"]["journeys"]["queries"] -= 1
+        with open(self.report_path, "w") as file:
+            json.dump(baseline, file)
+
+        with self.assertRaisesMessage(CommandError, "journeys queries"):
+            self.run_benchmarks(
+                "--case",
+                "journeys",
+                baseline=self.report_path,
+                max_regression=1000,
+            )
+
+    def test_unknown_user(self):
+        with self.assertRaisesMessage(CommandError, "seed_benchmark_data"):
+            self.run_benchmarks(email=BENCHMARK_EMAIL.format(99))
+
+
+class CompareReportsTests(TestCase):
+    def test_latency_regresses_past_threshold(self):
+        baseline = {"cases": {"a": {"p50_ms": 10.0, "queries": 3}}}
+        report = {
+            "cases": {
+                "a": {
+                    "p50_ms": 11.5,
+                    "p90_ms": 1.0,
+                    "queries": 3,
+                    "peak_memory_kb": 1.0,
+                }
+            }
+        }
+
+        rows = {
+            row["metric"]: row
+            for row in compare_reports(report, baseline, max_regression=10)
+        }
+
+        self.assertEqual(set(rows), {"p50_ms", "queries"})
+        self.assertTrue(rows["p50_ms"]["regressed"])
+        self.assertFalse(rows["queries"]["regressed"])
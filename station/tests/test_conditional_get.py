@@ -0,0 +1,137 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Crew
+from station.tests.test_train_station_api import (
+    TRAIN_URL,
+    detail_journey_url,
+    detail_train_url,
+    sample_journey,
+    sample_route,
+    sample_train,
+)
+
+ORDER_URL = reverse("station:order-list")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def _revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_journey_detail_not_modified(self):
+        journey = sample_journey()
+        url = detail_journey_url(journey.id)
+        first = self.client.get(url)
+
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+
+        with self.assertNumQueries(1):
+            res = self._revalidate(url, first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], first["ETag"])
+
+    def test_journey_etag_changes_after_order(self):
+        journey = sample_journey()
+        url = detail_journey_url(journey.id)
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(
+            ORDER_URL,
+            {"tickets": [{"cargo": 1, "seat": 1, "journey": journey.id}]},
+            format="json",
+        )
+
+        res = self._revalidate(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(res.data["taken_places"], [{"cargo": 1, "seat": 1}])
+
+    def test_journey_etag_changes_after_crew_change(self):
+        journey = sample_journey()
+        url = detail_journey_url(journey.id)
+        etag = self.client.get(url)["ETag"]
+
+        journey.crew.add(Crew.objects.create(first_name="A", last_name="B"))
+
+        res = self._revalidate(url, etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["crew"]), 1)
+
+    def test_if_modified_since(self):
+        train = sample_train()
+        url = detail_train_url(train.id)
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_train_list_etag_follows_filters_and_changes(self):
+        train = sample_train(name="Express")
+        etag = self.client.get(TRAIN_URL)["ETag"]
+
+        self.assertEqual(
+            self._revalidate(TRAIN_URL, etag).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        self.assertEqual(
+            self.client.get(
+                TRAIN_URL, {"name": "express"}, HTTP_IF_NONE_MATCH=etag
+            ).status_code,
+            status.HTTP_200_OK,
+        )
+
+        train.train_type.name = "Intercity"
+        train.train_type.save()
+
+        self.assertEqual(
+            self._revalidate(TRAIN_URL, etag).status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_missing_object(self):
+        res = self.client.get(detail_journey_url(999))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", res)
+
+    def test_version_stamps_not_exposed(self):
+        journey = sample_journey()
+        journey.crew.add(Crew.objects.create(first_name="A", last_name="B"))
+        sample_route()
+
+        payloads = [
+            self.client.get(detail_journey_url(journey.id)).data,
+            self.client.get(reverse("station:route-list")).data,
+            self.client.get(reverse("station:station-list")).data,
+            self.client.get(reverse("station:crew-list")).data,
+            self.client.get(reverse("station:traintype-list")).data,
+        ]
+        payloads.append(payloads[0]["train"])
+
+        for payload in payloads:
+            if isinstance(payload, dict):
+                payload = payload.get("results", [payload])
+            for item in payload:
+                self.assertNotIn("updated_at", item)
+                self.assertNotIn("version", item)
+                self.assertNotIn("seats_sold", item)
@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from station.models import Journey, Route
+from station.tests.test_train_station_api import sample_station, sample_train
+
+CONNECTIONS_URL = reverse("station:journey-connections")
+
+
+def local(hour, minute=0, day=18):
+    return timezone.make_aware(datetime(2024, 1, day, hour, minute))
+
+
+class ConnectionSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.train = sample_train()
+        self.a, self.b, self.c = (
+            sample_station(name=name) for name in ("A", "B", "C")
+        )
+
+    def _journey(self, source, destination, departure, arrival):
+        route, _ = Route.objects.get_or_create(
+            source=source, destination=destination, defaults={"distance": 1}
+        )
+        return Journey.objects.create(
+            route=route,
+            train=self.train,
+            departure_time=departure,
+            arrival_time=arrival,
+        )
+
+    def _search(self, **params):
+        params = {"from": self.a.id, "to": self.c.id, "date": "2024-01-18",
+                  **params}
+        return self.client.get(CONNECTIONS_URL, params)
+
+    def test_direct_and_faster_transfer_itineraries(self):
+        direct = self._journey(self.a, self.c, local(8), local(20))
+        first = self._journey(self.a, self.b, local(8), local(10))
+        second = self._journey(self.b, self.c, local(10, 30), local(12))
+        # Leaves B before the minimum transfer time has passed
+        self._journey(self.b, self.c, local(10, 2), local(11))
+
+        res = self._search()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [[leg["journey"] for leg in row["legs"]] for row in res.data],
+            [[direct.id], [first.id, second.id]],
+        )
+        self.assertEqual(res.data[1]["transfers"], 1)
+        self.assertEqual(res.data[1]["legs"][0]["destination_name"], "B")
+
+    def test_overnight_leg_connects_next_day(self):
+        first = self._journey(self.a, self.b, local(22), local(6, day=19))
+        second = self._journey(
+            self.b, self.c, local(7, day=19), local(9, day=19)
+        )
+
+        res = self._search()
+
+        self.assertEqual(
+            [leg["journey"] for leg in res.data[0]["legs"]],
+            [first.id, second.id],
+        )
+
+    def test_max_transfers_limits_legs(self):
+        self._journey(self.a, self.b, local(8), local(10))
+        self._journey(self.b, self.c, local(10, 30), local(12))
+
+        res = self._search(max_transfers=0)
+
+        self.assertEqual(res.data, [])
+
+    def test_graph_is_patched_when_journey_changes(self):
+        journey = self._journey(self.a, self.c, local(8), local(20))
+        self.assertEqual(len(self._search().data), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            journey.departure_time += timedelta(days=3)
+            journey.arrival_time += timedelta(days=3)
+            journey.save()
+
+        self.assertEqual(self._search().data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._journey(self.a, self.c, local(9), local(15))
+
+        self.assertEqual(len(self._search().data), 1)
+
+    def test_missing_parameters(self):
+        res = self.client.get(CONNECTIONS_URL, {"from": "x"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("from", res.data)
+        self.assertIn("to", res.data)
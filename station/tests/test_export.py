@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from station.models import Crew
+from station.tests.base import ApiTestCase
+from station.tests.test_train_station_api import JOURNEY_URL, sample_journey
+
+JOURNEY_EXPORT_URL = reverse("station:journey-export")
+ORDER_EXPORT_URL = reverse("station:order-export")
+ORDER_URL = reverse("station:order-list")
+
+
+def content(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
+class ExportTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_journey_ndjson_matches_list(self):
+        journey = sample_journey()
+        journey.crew.add(Crew.objects.create(first_name="A", last_name="B"))
+        sample_journey(
+            departure_time="2024-01-20T15:00:00+02:00",
+            arrival_time="2024-01-21T10:00:00+02:00",
+        )
+
+        res = self.client.get(JOURNEY_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content(res).splitlines()]
+        listed = self.client.get(JOURNEY_URL).data["results"]
+        self.assertEqual(rows, json.loads(json.dumps(listed)))
+
+    def test_journey_export_applies_filters(self):
+        sample_journey()
+        later = sample_journey(
+            departure_time="2024-01-20T15:00:00+02:00",
+            arrival_time="2024-01-21T10:00:00+02:00",
+        )
+
+        res = self.client.get(
+            JOURNEY_EXPORT_URL, {"departure_from": "2024-01-20"}
+        )
+
+        rows = [json.loads(line) for line in content(res).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [later.id])
+
+    def test_journey_csv(self):
+        journey = sample_journey()
+        journey.crew.add(
+            Crew.objects.create(first_name="A", last_name="B"),
+            Crew.objects.create(first_name="C", last_name="D"),
+        )
+
+        res = self.client.get(JOURNEY_EXPORT_URL, {"output": "csv"})
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        self.assertIn("journeys.csv", res["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(content(res))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["crew"], "A B; C D")
+        self.assertEqual(rows[0]["route"], "First station -> Second station")
+        self.assertEqual(rows[0]["tickets_available"], "80")
+
+    def test_order_export_lists_own_tickets(self):
+        journey = sample_journey()
+        self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"cargo": 1, "seat": seat, "journey": journey.id}
+                    for seat in (2, 1)
+                ]
+            },
+            format="json",
+        )
+        other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        self.client.force_authenticate(other)
+        self.client.post(
+            ORDER_URL,
+            {"tickets": [{"cargo": 2, "seat": 1, "journey": journey.id}]},
+            format="json",
+        )
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(ORDER_EXPORT_URL)
+        rows = [json.loads(line) for line in content(res).splitlines()]
+
+        self.assertEqual(
+            [(row["cargo"], row["seat"]) for row in rows], [(1, 1), (1, 2)]
+        )
+        self.assertEqual(rows[0]["journey"], journey.id)
+
+    def test_unknown_output(self):
+        res = self.client.get(JOURNEY_EXPORT_URL, {"output": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
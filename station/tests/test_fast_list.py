@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.models import Crew, Journey
+from station.tests.test_train_station_api import (
+    JOURNEY_URL,
+    TRAIN_URL,
+    sample_journey,
+    sample_route,
+    sample_train,
+)
+
+ROUTE_URL = reverse("station:route-list")
+
+
+class FastListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+
+        first = sample_journey()
+        second = sample_journey(
+            departure_time="2024-01-20T08:30:00+00:00",
+            arrival_time="2024-01-20T21:15:30.250000+00:00",
+        )
+        sample_journey(departure_time="2024-01-21T00:00:00+02:00")
+        crew = [
+            Crew.objects.create(first_name=name, last_name="Driver")
+            for name in ("Ann", "Bob", "Cid")
+        ]
+        # Added out of id order
+        first.crew.add(crew[2])
+        first.crew.add(crew[0])
+        second.crew.add(crew[1])
+
+        train = first.train
+        train.image = "uploads/trains/ab/original.jpg"
+        train.image_variants = {
+            "thumbnail": "uploads/trains/variants/original-small.jpg",
+            "thumbnail_webp": "uploads/trains/variants/original-small.webp",
+        }
+        train.save()
+        second.train.image = "uploads/trains/cd/pending.png"
+        second.train.save()
+        sample_route(distance=12)
+
+    def content(self, url: str, fast: bool, **params) -> bytes:
+        cache.clear()
+        with override_settings(FAST_LIST_SERIALIZERS=fast):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content
+
+    def assert_same_content(self, url: str, **params) -> None:
+        self.assertEqual(
+            self.content(url, fast=True, **params),
+            self.content(url, fast=False, **params),
+        )
+
+    def test_lists_identical(self):
+        for url in (JOURNEY_URL, TRAIN_URL, ROUTE_URL):
+            with self.subTest(url=url):
+                self.assert_same_content(url)
+
+    def test_pages_identical(self):
+        for url in (JOURNEY_URL, TRAIN_URL, ROUTE_URL):
+            with self.subTest(url=url):
+                self.assert_same_content(url, page_size=2, count="true")
+
+                cache.clear()
+                next_url = self.client.get(url, {"page_size": 2}).data["next"]
+                self.assert_same_content(next_url)
+
+    def test_filtered_journeys_identical(self):
+        journey = Journey.objects.order_by("id").first()
+
+        self.assert_same_content(
+            JOURNEY_URL,
+            route=journey.route_id,
+            departure_from="2024-01-18",
+        )
+        self.assert_same_content(JOURNEY_URL, train="0")
+
+    def test_crew_in_id_order(self):
+        cache.clear()
+        response = self.client.get(JOURNEY_URL)
+
+        self.assertEqual(
+            response.data["results"][0]["crew"], ["Ann Driver", "Cid Driver"]
+        )
+
+    def test_fast_list_queries(self):
+        cache.clear()
+        sample_train()
+
+        # Page of journeys, then their crew
+        with self.assertNumQueries(2):
+            self.client.get(JOURNEY_URL)
+        # State for the ETag, then the page of trains
+        with self.assertNumQueries(2):
+            self.client.get(TRAIN_URL, {"name": "train"})
@@ -0,0 +1,116 @@
+from django.test import SimpleTestCase
+
+from rest_framework import status
+
+from station.models import Ticket
+from station.occupancy import find_seat_block, seat_index, set_seats
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import (
+    ORDER_URL,
+    order_tickets,
+    sample_journey,
+    sample_train,
+)
+
+
+def taken(*seats, places_in_cargo=10):
+    return set_seats(
+        b"",
+        (seat_index(cargo, seat, places_in_cargo) for cargo, seat in seats),
+    )
+
+
+class FindSeatBlockTests(SimpleTestCase):
+    def test_tightest_adjacent_block(self):
+        # Cargo 1: seats 1-2 and 4-10 free, cargo 2: seats 1-3 free
+        bitmap = taken((1, 3), *((2, seat) for seat in range(4, 11)))
+
+        self.assertEqual(find_seat_block(bitmap, set(), 2, 10, 2), [0, 1])
+        self.assertEqual(
+            find_seat_block(bitmap, set(), 2, 10, 3), [10, 11, 12]
+        )
+        self.assertEqual(
+            find_seat_block(bitmap, set(), 2, 10, 5), [3, 4, 5, 6, 7]
+        )
+
+    def test_blocked_seats_are_skipped(self):
+        self.assertEqual(find_seat_block(b"", {0, 2}, 1, 10, 2), [3, 4])
+
+    def test_falls_back_to_one_cargo(self):
+        # Cargo 1: 1-3 and 5-7 free, cargo 2: every other seat free
+        bitmap = taken(
+            (1, 4), (1, 8), (1, 9), (1, 10),
+            *((2, seat) for seat in range(2, 11, 2)),
+        )
+
+        self.assertEqual(
+            find_seat_block(bitmap, set(), 2, 10, 5), [0, 1, 2, 4, 5]
+        )
+
+    def test_falls_back_to_fewest_cargos(self):
+        # Free: cargo 1 seats 1-2, cargo 2 seats 1-4, cargo 3 seat 1
+        bitmap = taken(
+            *((1, seat) for seat in range(3, 11)),
+            *((2, seat) for seat in range(5, 11)),
+            *((3, seat) for seat in range(2, 11)),
+        )
+
+        self.assertEqual(
+            find_seat_block(bitmap, set(), 3, 10, 6), [0, 1, 10, 11, 12, 13]
+        )
+        self.assertIsNone(find_seat_block(bitmap, set(), 3, 10, 8))
+
+
+class GroupBookingApiTests(AuthenticatedApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journey = sample_journey(
+            train=sample_train(cargo_num=2, places_in_cargo=4)
+        )
+
+    def _book(self, passengers: int):
+        return self.client.post(
+            ORDER_URL,
+            {"journey": self.journey.id, "passengers": passengers},
+            format="json",
+        )
+
+    def test_group_seated_together(self):
+        order_tickets(self.client, self.journey, (1, 2))
+
+        res = self._book(3)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(t["cargo"], t["seat"]) for t in res.data["tickets"]],
+            [(2, 1), (2, 2), (2, 3)],
+        )
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 4)
+
+    def test_not_enough_seats(self):
+        self._book(7)
+
+        res = self._book(2)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["detail"], "Only 1 seats are available.")
+        self.assertEqual(Ticket.objects.count(), 7)
+
+    def test_invalid_payloads(self):
+        for payload in [
+            {"passengers": 2},
+            {"journey": self.journey.id, "passengers": 0},
+            {"journey": self.journey.id, "passengers": 9},
+            {},
+            {
+                "journey": self.journey.id,
+                "passengers": 1,
+                "tickets": [
+                    {"cargo": 1, "seat": 1, "journey": self.journey.id}
+                ],
+            },
+        ]:
+            with self.subTest(payload=payload):
+                res = self.client.post(ORDER_URL, payload, format="json")
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from rest_framework import status
+
+from station.models import IdempotencyKey, Order, OrderRequest, Ticket
+from station.query_budget import count_queries
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import order_tickets, sample_journey
+
+
+class IdempotentOrderTests(AuthenticatedApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journey = sample_journey()
+
+    def _order(self, key, seat=1, user=None):
+        if user:
+            self.client.force_authenticate(user)
+        return order_tickets(
+            self.client, self.journey, (1, seat), HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self._order("key-1")
+
+        with count_queries(capture_sql=True) as counter:
+            retry = self._order("key-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertFalse(
+            [sql for sql in counter.queries if "station_journey" in sql]
+        )
+
+    @override_settings(ORDER_INTAKE_ASYNC=True)
+    def test_retry_replays_response_headers(self):
+        first = self._order("key-1")
+
+        retry = self._order("key-1")
+
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(retry.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(retry["Location"], first["Location"])
+        self.assertEqual(retry["Location"], first.data["url"])
+        self.assertEqual(OrderRequest.objects.count(), 1)
+
+    def test_key_reused_for_different_request(self):
+        self._order("key-1")
+
+        res = self._order("key-1", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        self._order("key-1")
+
+        res = self._order("key-2")
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(IdempotencyKey.objects.filter(key="key-2").exists())
+
+        Ticket.objects.all().delete()
+        res = self._order("key-2")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_keys_are_per_user(self):
+        self._order("key-1")
+        other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+
+        res = self._order("key-1", seat=2, user=other)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("Idempotent-Replayed", res)
+
+    def test_expired_key_runs_request_again(self):
+        self._order("key-1")
+        IdempotencyKey.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        Ticket.objects.all().delete()
+
+        res = self._order("key-1")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_invalid_key(self):
+        res = self._order("k" * 65)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sweep_expired_keys(self):
+        self._order("key-1")
+        self._order("key-2", seat=2)
+        IdempotencyKey.objects.filter(key="key-1").update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        out = StringIO()
+        call_command("sweep_expired", stdout=out)
+
+        self.assertIn("Deleted 1 idempotency keys", out.getvalue())
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)),
+            ["key-2"],
+        )
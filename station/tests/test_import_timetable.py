@@ -0,0 +1,225 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from station.cache import get_version, model_version_name
+from station.models import Crew, Journey, Route, Station, Train, TrainType
+
+
+class ImportTimetableTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_csv(self, name: str, rows: list[dict]) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def write_jsonl(self, name: str, rows: list[dict]) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.writelines(json.dumps(row) + "\n" for row in rows)
+        return path
+
+    def import_timetable(self, **files) -> str:
+        out = StringIO()
+        call_command("import_timetable", stdout=out, **files)
+        return out.getvalue()
+
+    def catalog_files(self) -> dict:
+        return {
+            "stations": self.write_csv(
+                "stations.csv",
+                [
+                    {"name": "Kyiv", "latitude": 50.45, "longitude": 30.52},
+                    {"name": "Lviv", "latitude": 49.84, "longitude": 24.03},
+                ],
+            ),
+            "trains": self.write_csv(
+                "trains.csv",
+                [
+                    {
+                        "name": "Intercity 1",
+                        "cargo_num": 5,
+                        "places_in_cargo": 40,
+                        "train_type": "Intercity",
+                    },
+                ],
+            ),
+            "routes": self.write_csv(
+                "routes.csv",
+                [{"source": "Kyiv", "destination": "Lviv", "distance": 540}],
+            ),
+        }
+
+    def test_import_all_kinds(self):
+        journeys = self.write_jsonl(
+            "journeys.jsonl",
+            [
+                {
+                    "source": "Kyiv",
+                    "destination": "Lviv",
+                    "train": "Intercity 1",
+                    "departure_time": "2024-01-20T08:00:00+02:00",
+                    "arrival_time": "2024-01-20T13:00:00+02:00",
+                    "crew": ["Anna Shevchenko", "Ivan Franko"],
+                },
+                {
+                    "source": "Kyiv",
+                    "destination": "Lviv",
+                    "train": "Intercity 1",
+                    "departure_time": "2024-01-21T08:00:00",
+                    "arrival_time": "2024-01-21T13:00:00",
+                    "crew": [{"first_name": "Ivan", "last_name": "Franko"}],
+                },
+            ],
+        )
+
+        output = self.import_timetable(
+            journeys=journeys, **self.catalog_files()
+        )
+
+        self.assertIn("Imported 2 stations", output)
+        self.assertIn("Imported 2 journeys", output)
+        self.assertEqual(TrainType.objects.get().name, "Intercity")
+        route = Route.objects.get()
+        self.assertEqual(route.source.name, "Kyiv")
+        self.assertEqual(route.distance, 540)
+        self.assertEqual(Train.objects.get().train_type.name, "Intercity")
+        self.assertEqual(Crew.objects.count(), 2)
+
+        first, second = Journey.objects.order_by("departure_time")
+        self.assertEqual(first.route, route)
+        self.assertEqual(
+            sorted(first.crew.values_list("last_name", flat=True)),
+            ["Franko", "Shevchenko"],
+        )
+        self.assertEqual(
+            list(second.crew.values_list("last_name", flat=True)), ["Franko"]
+        )
+        self.assertIsNotNone(second.departure_time.tzinfo)
+
+    def test_csv_crew_is_semicolon_separated(self):
+        journeys = self.write_csv(
+            "journeys.csv",
+            [
+                {
+                    "source": "Kyiv",
+                    "destination": "Lviv",
+                    "train": "Intercity 1",
+                    "departure_time": "2024-01-20T08:00:00+02:00",
+                    "arrival_time": "2024-01-20T13:00:00+02:00",
+                    "crew": "Anna Shevchenko; Ivan Franko",
+                },
+            ],
+        )
+
+        self.import_timetable(journeys=journeys, **self.catalog_files())
+
+        self.assertEqual(Journey.objects.get().crew.count(), 2)
+
+    def test_rerun_skips_existing_rows(self):
+        files = self.catalog_files()
+        self.import_timetable(**files)
+
+        output = self.import_timetable(**files)
+
+        self.assertIn("Imported 0 stations", output)
+        self.assertIn("Imported 0 routes", output)
+        self.assertEqual(Station.objects.count(), 2)
+        self.assertEqual(Train.objects.count(), 1)
+
+    def test_rerun_skips_existing_journeys(self):
+        files = self.catalog_files()
+        journey = {
+            "source": "Kyiv",
+            "destination": "Lviv",
+            "train": "Intercity 1",
+            "departure_time": "2024-01-20T08:00:00+02:00",
+            "arrival_time": "2024-01-20T13:00:00+02:00",
+            "crew": ["Anna Shevchenko"],
+        }
+        self.import_timetable(
+            journeys=self.write_jsonl("journeys.jsonl", [journey]), **files
+        )
+        later = {
+            **journey,
+            "departure_time": "2024-01-20T10:00:00+02:00",
+            "crew": ["Ivan Franko"],
+        }
+
+        output = self.import_timetable(
+            journeys=self.write_jsonl(
+                "more_journeys.jsonl",
+                [
+                    # Same departure in UTC
+                    {**journey, "departure_time": "2024-01-20T06:00:00Z"},
+                    later,
+                    later,
+                ],
+            ),
+            **files,
+        )
+
+        self.assertIn("Imported 1 journeys", output)
+        self.assertEqual(Journey.objects.count(), 2)
+        self.assertEqual(Crew.objects.count(), 2)
+
+    def test_malformed_crew_reports_row(self):
+        journeys = self.write_jsonl(
+            "journeys.jsonl",
+            [
+                {
+                    "source": "Kyiv",
+                    "destination": "Lviv",
+                    "train": "Intercity 1",
+                    "departure_time": "2024-01-20T08:00:00+02:00",
+                    "arrival_time": "2024-01-20T13:00:00+02:00",
+                    "crew": [{"first_name": "Ivan"}],
+                },
+            ],
+        )
+
+        with self.assertRaisesMessage(
+                CommandError, "Row 1: crew {'first_name': 'Ivan'} needs a"
+        ):
+            self.import_timetable(journeys=journeys, **self.catalog_files())
+
+    def test_unknown_station_reports_row(self):
+        stations = self.catalog_files()["stations"]
+        routes = self.write_csv(
+            "more_routes.csv",
+            [
+                {"source": "Kyiv", "destination": "Lviv", "distance": 540},
+                {"source": "Kyiv", "destination": "Odesa", "distance": 475},
+            ],
+        )
+
+        with self.assertRaisesMessage(
+                CommandError, "Row 2: unknown station 'Odesa'"
+        ):
+            self.import_timetable(stations=stations, routes=routes)
+
+    def test_bulk_insert_bumps_catalog_versions(self):
+        version = get_version(model_version_name(Station))
+
+        self.import_timetable(stations=self.catalog_files()["stations"])
+
+        self.assertNotEqual(
+            get_version(model_version_name(Station)), version
+        )
+
+    def test_requires_a_file(self):
+        with self.assertRaises(CommandError):
+            self.import_timetable()
@@ -0,0 +1,138 @@
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from station.models import Route
+from station.tests.base import ApiTestCase
+from station.tests.test_train_station_api import (
+    JOURNEY_URL,
+    sample_journey,
+    sample_station,
+)
+from station.views import JourneyViewSet
+
+
+def local(day, hour=12):
+    return timezone.make_aware(datetime(2024, 1, day, hour))
+
+
+class JourneySearchFilterTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.kyiv = sample_station(name="Kyiv")
+        self.lviv = sample_station(name="Lviv")
+        self.odesa = sample_station(name="Odesa")
+
+    def _journey(self, source, destination, day, hour=12):
+        route = Route.objects.create(
+            source=source, destination=destination, distance=100
+        )
+        return sample_journey(
+            route=route,
+            departure_time=local(day, hour),
+            arrival_time=local(day, hour + 5),
+        )
+
+    def _ids(self, params):
+        res = self.client.get(JOURNEY_URL, params)
+        return [row["id"] for row in res.data["results"]]
+
+    def test_filter_by_station_pair(self):
+        kyiv_lviv = self._journey(self.kyiv, self.lviv, 18)
+        self._journey(self.kyiv, self.odesa, 18)
+        self._journey(self.lviv, self.kyiv, 18)
+
+        ids = self._ids(
+            {"source": self.kyiv.id, "destination": self.lviv.id}
+        )
+
+        self.assertEqual(ids, [kyiv_lviv.id])
+
+    def test_filter_by_departure_range(self):
+        self._journey(self.kyiv, self.lviv, 17)
+        morning = self._journey(self.kyiv, self.lviv, 18, hour=8)
+        evening = self._journey(self.kyiv, self.lviv, 19, hour=18)
+        late = self._journey(self.kyiv, self.lviv, 20, hour=1)
+
+        self.assertEqual(
+            self._ids(
+                {"departure_from": "2024-01-18", "departure_to": "2024-01-19"}
+            ),
+            [morning.id, evening.id],
+        )
+        self.assertEqual(
+            self._ids({"departure_from": "2024-01-18T09:00"}),
+            [evening.id, late.id],
+        )
+
+    def test_departure_time_uses_local_day(self):
+        # Midnight in Kyiv is still the previous day in UTC
+        journey = self._journey(self.kyiv, self.lviv, 18, hour=0)
+
+        self.assertEqual(
+            self._ids({"departure_time": "2024-01-18"}), [journey.id]
+        )
+        self.assertEqual(self._ids({"departure_time": "2024-01-17"}), [])
+
+    def test_invalid_departure_range(self):
+        res = self.client.get(JOURNEY_URL, {"departure_from": "tomorrow"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_station_ids(self):
+        for params in ({"source": "x"}, {"destination": "1,a"}):
+            with self.subTest(params=params):
+                res = self.client.get(JOURNEY_URL, params)
+
+                self.assertEqual(
+                    res.status_code, status.HTTP_400_BAD_REQUEST
+                )
+                self.assertIn(next(iter(params)), res.data)
+
+
+class JourneySearchQueryPlanTests(TestCase):
+    """The search filters must compile to predicates the indexes serve"""
+
+    def _plan(self, params: dict) -> str:
+        view = JourneyViewSet()
+        view.action = "list"
+        view.request = Request(APIRequestFactory().get(JOURNEY_URL, params))
+        queryset = view.get_queryset()
+
+        if connection.vendor == "postgresql":
+            # Tiny test tables are always cheaper to scan sequentially
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        return queryset.explain()
+
+    def test_departure_range_uses_departure_index(self):
+        plan = self._plan(
+            {"departure_from": "2024-01-18", "departure_to": "2024-01-19"}
+        )
+
+        self.assertIn("journey_departure_id_idx", plan)
+
+    def test_departure_date_uses_departure_index(self):
+        plan = self._plan({"departure_time": "2024-01-18"})
+
+        self.assertIn("journey_departure_id_idx", plan)
+
+    def test_station_pair_uses_route_index(self):
+        plan = self._plan({"source": "1", "destination": "2"})
+
+        self.assertIn("route_source_destination_idx", plan)
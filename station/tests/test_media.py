@@ -0,0 +1,190 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.http import Http404
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.exceptions import UploadTooLarge
+from station.media import serve_media
+from station.tests.base import ApiTestCase
+from station.tests.test_train_images import image_file, upload_url
+from station.tests.test_train_station_api import sample_train
+from station.uploads import SizeLimitUploadHandler
+
+CONTENT = bytes(range(256)) * 4
+HASHED_NAME = f"uploads/trains/ab/{'ab' * 32}.png"
+
+
+def media_url(name: str) -> str:
+    return reverse("media", kwargs={"path": name})
+
+
+class MediaTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.write(HASHED_NAME)
+
+    def write(self, name: str) -> str:
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(CONTENT)
+        return path
+
+    def get(self, name=HASHED_NAME, **headers):
+        return self.client.get(media_url(name), **headers)
+
+    def test_content_named_file_cached_for_good(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), CONTENT)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+
+    def test_other_names_cached_briefly(self):
+        self.write("uploads/trains/express.png")
+
+        response = self.get("uploads/trains/express.png")
+
+        self.assertEqual(response["Cache-Control"], "public, max-age=3600")
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[10:20])
+
+    def test_open_and_suffix_ranges(self):
+        response = self.get(HTTP_RANGE="bytes=1000-")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[1000:])
+
+        response = self.get(HTTP_RANGE="bytes=-24")
+        self.assertEqual(response["Content-Range"], "bytes 1000-1023/1024")
+        self.assertEqual(b"".join(response.streaming_content), CONTENT[-24:])
+
+        response = self.get(HTTP_RANGE="bytes=1000-5000")
+        self.assertEqual(response["Content-Range"], "bytes 1000-1023/1024")
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE="bytes=1024-")
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        )
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_whole_file_for_other_ranges(self):
+        for header in ("bytes=0-1,5-6", "items=0-1", "bytes=9-2"):
+            response = self.get(HTTP_RANGE=header)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self.get(
+            HTTP_RANGE="bytes=0-1", HTTP_IF_RANGE=http_date(0)
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_not_modified(self):
+        modified = self.get()["Last-Modified"]
+
+        response = self.get(HTTP_IF_MODIFIED_SINCE=modified)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT="/protected-media/")
+    def test_accel_redirect(self):
+        response = self.get()
+
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{HASHED_NAME}"
+        )
+        self.assertEqual(response.content, b"")
+        self.assertIn("immutable", response["Cache-Control"])
+
+    def test_missing_and_outside_files(self):
+        self.assertEqual(
+            self.get("uploads/none.png").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.get("uploads/trains/").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        with self.assertRaises(Http404):
+            serve_media(RequestFactory().get("/"), "../secret.txt")
+
+    def test_only_reads(self):
+        response = self.client.post(media_url(HASHED_NAME))
+
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+
+class UploadTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "admin@admin.com", "testpass", is_staff=True
+            )
+        )
+        self.train = sample_train()
+
+    @override_settings(MAX_UPLOAD_SIZE=256)
+    def test_upload_over_limit_refused(self):
+        response = self.client.post(
+            upload_url(self.train.id),
+            {"image": image_file(size=(300, 300), mode="RGBA")},
+            format="multipart",
+        )
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        )
+        self.assertEqual(response.data["detail"].code, "upload_too_large")
+
+    @override_settings(MAX_UPLOAD_SIZE=1024)
+    def test_chunks_over_limit_refused(self):
+        handler = SizeLimitUploadHandler()
+
+        chunk = b"x" * 1024
+        self.assertEqual(handler.receive_data_chunk(chunk, 0), chunk)
+        with self.assertRaises(UploadTooLarge):
+            handler.receive_data_chunk(b"x", 1024)
+
+    def test_model_upload_named_by_content(self):
+        self.train.image = image_file(name="express.png")
+        self.train.save()
+
+        self.assertRegex(
+            self.train.image.name, r"^uploads/trains/\w{2}/\w{64}\.png$"
+        )
@@ -0,0 +1,171 @@
+import re
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.metrics import Counter, Histogram, MetricsRegistry
+from station.tests.test_train_station_api import JOURNEY_URL, sample_journey
+
+METRICS_URL = reverse("metrics")
+ORDER_URL = reverse("station:order-list")
+HOLD_URL = reverse("station:seathold-list")
+
+
+def sample_value(text: str, sample: str) -> float:
+    match = re.search(rf"^{re.escape(sample)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+class MetricsRegistryTests(TestCase):
+    def test_exposition_format(self):
+        registry = MetricsRegistry()
+        counter = Counter("jobs_total", "Jobs", ("kind",), registry=registry)
+        histogram = Histogram(
+            "job_seconds", "Job time", buckets=(0.1, 1), registry=registry
+        )
+
+        counter.inc(kind='a "b"')
+        counter.inc(2, kind='a "b"')
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+
+        self.assertEqual(
+            registry.exposition(),
+            "# HELP job_seconds Job time\n"
+            "# TYPE job_seconds histogram\n"
+            'job_seconds_bucket{le="0.1"} 1\n'
+            'job_seconds_bucket{le="1"} 2\n'
+            'job_seconds_bucket{le="+Inf"} 2\n'
+            "job_seconds_sum 0.55\n"
+            "job_seconds_count 2\n"
+            "# HELP jobs_total Jobs\n"
+            "# TYPE jobs_total counter\n"
+            'jobs_total{kind="a \\"b\\""} 3\n',
+        )
+
+    def test_wrong_labels(self):
+        counter = Counter(
+            "jobs_total", "Jobs", ("kind",), registry=MetricsRegistry()
+        )
+
+        with self.assertRaises(ValueError):
+            counter.inc(queue="x")
+
+    def test_processes_add_up_through_metrics_dir(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        workers = [MetricsRegistry(), MetricsRegistry()]
+        counters = [
+            Counter("jobs_total", "Jobs", registry=registry)
+            for registry in workers
+        ]
+
+        with override_settings(METRICS_DIR=directory.name):
+            counters[0].inc(2)
+            counters[1].inc(3)
+            workers[1].flush(force=True)
+
+            text = workers[0].exposition()
+
+        self.assertEqual(sample_value(text, "jobs_total"), 5)
+
+
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+
+    def scrape(self) -> str:
+        response = self.client.get(METRICS_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    def test_request_latency_and_queries_per_action(self):
+        latency = (
+            "station_request_duration_seconds_count{view=\"JourneyViewSet\","
+            "action=\"list\",method=\"GET\",status=\"200\"}"
+        )
+        queries = (
+            'station_request_queries_sum{view="JourneyViewSet",'
+            'action="list"}'
+        )
+        before = self.scrape()
+
+        self.client.get(JOURNEY_URL)
+
+        after = self.scrape()
+        self.assertEqual(
+            sample_value(after, latency), sample_value(before, latency) + 1
+        )
+        self.assertGreater(
+            sample_value(after, queries), sample_value(before, queries)
+        )
+
+    def test_orders_and_tickets_counted_on_commit(self):
+        before = self.scrape()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                ORDER_URL,
+                {"journey": self.journey.id, "passengers": 3},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        after = self.scrape()
+        for sample, added in (
+            ("station_orders_created_total", 1),
+            ("station_tickets_sold_total", 3),
+        ):
+            self.assertEqual(
+                sample_value(after, sample),
+                sample_value(before, sample) + added,
+            )
+
+    def test_seat_conflicts(self):
+        sample = (
+            'station_seat_conflicts_total{operation="order",'
+            'reason="seats_taken"}'
+        )
+        self.client.post(
+            HOLD_URL,
+            {"journey": self.journey.id, "seats": [{"cargo": 1, "seat": 1}]},
+            format="json",
+        )
+        before = sample_value(self.scrape(), sample)
+        other = APIClient()
+        other.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "pass")
+        )
+
+        response = other.post(
+            ORDER_URL,
+            {"tickets": [{"journey": self.journey.id, "cargo": 1, "seat": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(sample_value(self.scrape(), sample), before + 1)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token(self):
+        self.assertEqual(
+            self.client.get(METRICS_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        response = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION="Bearer secret"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from station.geo import haversine_km
+from station.tests.test_train_station_api import sample_station
+
+NEARBY_URL = reverse("station:station-nearby")
+
+
+class NearbyStationsApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.kyiv = sample_station(
+            name="Kyiv", latitude=50.4501, longitude=30.5234
+        )
+        self.brovary = sample_station(
+            name="Brovary", latitude=50.5110, longitude=30.7909
+        )
+        self.lviv = sample_station(
+            name="Lviv", latitude=49.8397, longitude=24.0297
+        )
+
+    def test_nearby_stations_ordered_by_distance(self):
+        res = self.client.get(
+            NEARBY_URL, {"lat": 50.44, "lon": 30.52, "radius": 50}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row["name"] for row in res.data], ["Kyiv", "Brovary"]
+        )
+        self.assertAlmostEqual(
+            res.data[1]["distance"],
+            haversine_km(50.44, 30.52, 50.5110, 30.7909),
+            places=3,
+        )
+
+    def test_limit_and_large_radius(self):
+        res = self.client.get(
+            NEARBY_URL, {"lat": 49.9, "lon": 24.1, "radius": 1000, "limit": 2}
+        )
+
+        self.assertEqual([row["name"] for row in res.data], ["Lviv", "Kyiv"])
+
+    def test_search_crosses_antimeridian(self):
+        sample_station(name="East", latitude=0, longitude=179.95)
+
+        res = self.client.get(NEARBY_URL, {"lat": 0, "lon": -179.95})
+
+        self.assertEqual([row["name"] for row in res.data], ["East"])
+        self.assertLess(res.data[0]["distance"], 12)
+
+    def test_invalid_parameters(self):
+        res = self.client.get(NEARBY_URL, {"lat": 120})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("lat", res.data)
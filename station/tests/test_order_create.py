@@ -0,0 +1,131 @@
+from rest_framework import status
+
+from station.exceptions import SeatConflict
+from station.models import Journey, Order, SeatMap, Ticket
+from station.occupancy import is_taken, seat_index
+from station.query_budget import assert_max_queries, count_queries
+from station.serializers import OrderSerializer
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import (
+    ORDER_URL,
+    order_tickets,
+    sample_journey,
+)
+
+UNIQUE_MESSAGE = "The fields journey, cargo, seat must make a unique set."
+
+
+class OrderCreateTests(AuthenticatedApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journey = sample_journey()
+
+    def test_group_booking_query_count_is_constant(self):
+        small = sample_journey()
+        with count_queries() as counter:
+            order_tickets(self.client, small, (1, 1), (1, 2))
+
+        seats = [(1 + i // 20, 1 + i % 20) for i in range(50)]
+        with assert_max_queries(counter.count):
+            res = order_tickets(self.client, self.journey, *seats)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Ticket.objects.count(), 52)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 50)
+
+    def test_order_across_journeys_updates_seat_maps(self):
+        other = sample_journey()
+
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"cargo": 1, "seat": 1, "journey": self.journey.id},
+                    {"cargo": 2, "seat": 3, "journey": other.id},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        for journey, cargo, seat in [(self.journey, 1, 1), (other, 2, 3)]:
+            journey = Journey.objects.select_related("train", "seat_map").get(
+                pk=journey.pk
+            )
+            self.assertEqual(journey.seats_sold, 1)
+            self.assertTrue(
+                is_taken(
+                    journey.seat_map.bitmap,
+                    seat_index(cargo, seat, journey.train.places_in_cargo),
+                )
+            )
+
+    def test_duplicate_seat_in_request(self):
+        res = order_tickets(self.client, self.journey, (1, 1), (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["tickets"],
+            [{}, {"non_field_errors": [UNIQUE_MESSAGE]}],
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_sold_seat_conflicts_with_alternatives(self):
+        order_tickets(self.client, self.journey, (1, 1))
+
+        res = order_tickets(self.client, self.journey, (1, 2), (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["seats"], [{"cargo": 1, "seat": 1}])
+        self.assertEqual(res.data["alternatives"], [{"cargo": 1, "seat": 3}])
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_sold_seat_without_seat_map(self):
+        order_tickets(self.client, self.journey, (1, 1))
+        SeatMap.objects.all().delete()
+
+        res = order_tickets(self.client, self.journey, (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["alternatives"], [{"cargo": 1, "seat": 2}])
+
+    def test_seat_out_of_range_and_unknown_journey(self):
+        res = self.client.post(
+            ORDER_URL,
+            {
+                "tickets": [
+                    {"cargo": 1, "seat": 21, "journey": self.journey.id},
+                    {"cargo": 1, "seat": 1, "journey": 999},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", res.data["tickets"][0])
+        self.assertIn("journey", res.data["tickets"][1])
+
+    def test_seat_sold_after_validation(self):
+        serializer = OrderSerializer(
+            data={
+                "tickets": [
+                    {"cargo": 1, "seat": 1, "journey": self.journey.id}
+                ]
+            }
+        )
+        self.assertTrue(serializer.is_valid())
+        order_tickets(self.client, self.journey, (1, 1))
+
+        with self.assertRaises(SeatConflict) as error:
+            serializer.save(user=self.user)
+
+        self.assertEqual(error.exception.detail["seats"], [
+            {"cargo": 1, "seat": 1}
+        ])
+        self.assertEqual(error.exception.detail["alternatives"], [
+            {"cargo": 1, "seat": 2}
+        ])
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 1)
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import override_settings
+from django.utils import timezone
+
+from rest_framework import status
+
+from station.intake import (
+    CLAIM_TIMEOUT,
+    claim_order_requests,
+    process_order_request,
+    process_order_requests,
+)
+from station.models import Order, OrderRequest, Ticket
+from station.serializers import OrderSerializer
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import (
+    ORDER_URL,
+    order_tickets,
+    sample_journey,
+)
+
+
+@override_settings(ORDER_INTAKE_ASYNC=True)
+class AsyncOrderIntakeTests(AuthenticatedApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journey = sample_journey()
+
+    def _process(self):
+        out = StringIO()
+        call_command("process_orders", stdout=out)
+        return out.getvalue()
+
+    def test_order_is_queued_and_processed(self):
+        res = order_tickets(self.client, self.journey, (1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["status"], "pending")
+        self.assertEqual(res["Location"], res.data["url"])
+        self.assertFalse(Order.objects.exists())
+
+        self.assertIn("Processed 1 order requests", self._process())
+
+        res = self.client.get(res.data["url"])
+        self.assertEqual(res.data["status"], "done")
+        order = Order.objects.get(pk=res.data["order"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(order.tickets.count(), 2)
+
+    def test_failed_request_records_errors(self):
+        url = order_tickets(self.client, self.journey, (1, 1)).data["url"]
+        order_tickets(self.client, self.journey, (1, 1))
+        order_tickets(self.client, self.journey, (1, 99))
+
+        self._process()
+
+        self.assertEqual(self.client.get(url).data["status"], "done")
+        failed = OrderRequest.objects.filter(status="failed")
+        self.assertEqual(failed.count(), 2)
+        self.assertTrue(all(request.errors for request in failed))
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_unexpected_error_fails_only_its_request(self):
+        first = order_tickets(self.client, self.journey, (1, 1)).data["url"]
+        second = order_tickets(self.client, self.journey, (1, 2)).data["url"]
+        save = OrderSerializer.save
+        calls = []
+
+        def fail_first(serializer, **kwargs):
+            calls.append(serializer)
+            if len(calls) == 1:
+                raise OperationalError("connection lost")
+            return save(serializer, **kwargs)
+
+        with mock.patch.object(
+                OrderSerializer, "save", autospec=True, side_effect=fail_first
+        ), self.assertLogs("station.intake", "ERROR"):
+            self.assertEqual(process_order_requests(), 2)
+
+        self.assertEqual(self.client.get(first).data["status"], "failed")
+        self.assertEqual(self.client.get(second).data["status"], "done")
+        self.assertEqual(process_order_requests(), 0)
+
+    def test_stale_claims_are_taken_again(self):
+        order_tickets(self.client, self.journey, (1, 1))
+        order_tickets(self.client, self.journey, (1, 2))
+        now = timezone.now()
+        fresh, stale = OrderRequest.objects.order_by("created_at")
+        OrderRequest.objects.filter(pk=fresh.pk).update(
+            status="processing", claimed_at=now
+        )
+        OrderRequest.objects.filter(pk=stale.pk).update(
+            status="processing",
+            claimed_at=now - CLAIM_TIMEOUT - timedelta(seconds=1),
+        )
+
+        self.assertEqual(process_order_requests(), 1)
+
+        fresh.refresh_from_db()
+        stale.refresh_from_db()
+        self.assertEqual(fresh.status, "processing")
+        self.assertEqual(stale.status, "done")
+
+    def test_request_claimed_again_is_placed_once(self):
+        order_tickets(self.client, self.journey, (1, 1))
+        # The first worker stalls past the timeout after claiming
+        [slow] = claim_order_requests()
+        OrderRequest.objects.filter(pk=slow.pk).update(
+            claimed_at=slow.claimed_at - CLAIM_TIMEOUT - timedelta(seconds=1)
+        )
+        [taken] = claim_order_requests()
+
+        self.assertTrue(process_order_request(taken))
+        self.assertFalse(process_order_request(slow))
+
+        order_request = OrderRequest.objects.get()
+        self.assertEqual(order_request.status, "done")
+        self.assertEqual(order_request.order, Order.objects.get())
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_request_claimed_again_is_not_failed(self):
+        order_tickets(self.client, self.journey, (1, 1))
+        [slow] = claim_order_requests()
+
+        # Claimed again once the failed placement released the request
+        with mock.patch.object(
+                OrderSerializer, "save", side_effect=OperationalError("gone")
+        ), mock.patch(
+            "station.intake._hold_claim", side_effect=[True, False]
+        ), self.assertLogs("station.intake", "ERROR"):
+            self.assertFalse(process_order_request(slow))
+
+        self.assertEqual(OrderRequest.objects.get().status, "processing")
+
+    def test_cheap_validation_before_queueing(self):
+        res = self.client.post(
+            ORDER_URL, {"tickets": [{"cargo": "x"}]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OrderRequest.objects.exists())
+
+    def test_status_is_private(self):
+        url = order_tickets(self.client, self.journey, (1, 1)).data["url"]
+        other = get_user_model().objects.create_user(
+            "other@test.com", "testpass"
+        )
+        self.client.force_authenticate(other)
+
+        self.assertEqual(
+            self.client.get(url).status_code, status.HTTP_404_NOT_FOUND
+        )
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from station.models import Station
+from station.tests.base import ApiTestCase
+from station.tests.test_train_station_api import (
+    JOURNEY_URL,
+    sample_journey,
+    sample_route,
+    sample_train,
+)
+
+STATION_URL = reverse("station:station-list")
+
+
+class KeysetPaginationTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        route = sample_route()
+        train = sample_train()
+        start = datetime(2024, 1, 18, 8, tzinfo=timezone.utc)
+        # Two journeys share each departure time to exercise the id tiebreak
+        self.journeys = [
+            sample_journey(
+                route=route,
+                train=train,
+                departure_time=start + timedelta(hours=i // 2),
+                arrival_time=start + timedelta(hours=i // 2 + 3),
+            )
+            for i in range(7)
+        ]
+
+    def _walk(self, url, params=None):
+        ids = []
+        pages = 0
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(row["id"] for row in res.data["results"])
+            pages += 1
+            if not res.data["next"]:
+                return ids, pages, res
+            res = self.client.get(res.data["next"])
+
+    def test_pages_follow_departure_time_then_id(self):
+        ids, pages, _ = self._walk(JOURNEY_URL, {"page_size": 3})
+
+        expected = [journey.id for journey in self.journeys]
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(JOURNEY_URL, {"page_size": 3})
+        second = self.client.get(first.data["next"])
+
+        self.assertIsNone(first.data["previous"])
+        back = self.client.get(second.data["previous"])
+
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+        self.assertEqual(
+            self.client.get(back.data["next"]).data["results"],
+            second.data["results"],
+        )
+
+    def test_count_only_when_requested(self):
+        res = self.client.get(JOURNEY_URL, {"page_size": 3})
+        self.assertNotIn("count", res.data)
+
+        res = self.client.get(JOURNEY_URL, {"page_size": 3, "count": "true"})
+        self.assertEqual(res.data["count"], 7)
+        self.assertNotIn("count=", res.data["next"])
+
+    def test_invalid_cursor(self):
+        res = self.client.get(JOURNEY_URL, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_catalog_ordered_by_name(self):
+        for name in ("Lviv", "Kyiv", "Odesa"):
+            Station.objects.create(name=name, latitude=1, longitude=1)
+
+        _, _, res = self._walk(STATION_URL, {"page_size": 100})
+        names = [row["name"] for row in res.data["results"]]
+
+        self.assertEqual(names, sorted(names))
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from station.models import Crew, Order, Ticket
+from station.query_budget import assert_max_queries, count_queries
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import (
+    JOURNEY_URL,
+    ORDER_URL,
+    TRAIN_URL,
+    detail_journey_url,
+    sample_journey,
+    sample_train,
+)
+from station.views import JourneyViewSet, OrderViewSet, TrainViewSet
+
+
+class QueryBudgetTests(AuthenticatedApiTestCase):
+    def _journey_with_crew(self):
+        journey = sample_journey()
+        journey.crew.add(
+            Crew.objects.create(first_name="Ivan", last_name="Franko"),
+            Crew.objects.create(first_name="Lesya", last_name="Ukrainka"),
+        )
+        return journey
+
+    def _sell(self, journeys):
+        order = Order.objects.create(user=self.user)
+        for seat, journey in enumerate(journeys, start=1):
+            Ticket.objects.create(
+                order=order, journey=journey, cargo=1, seat=seat
+            )
+
+    def _queries(self, url):
+        with count_queries() as counter:
+            self.client.get(url)
+        return counter.count
+
+    def test_journey_list_is_constant(self):
+        self._journey_with_crew()
+        single = self._queries(JOURNEY_URL)
+
+        for _ in range(5):
+            self._journey_with_crew()
+
+        with assert_max_queries(JourneyViewSet.query_budget["list"]):
+            self.client.get(JOURNEY_URL)
+        self.assertEqual(self._queries(JOURNEY_URL), single)
+
+    def test_journey_detail_within_budget(self):
+        journey = self._journey_with_crew()
+        self._sell([journey])
+
+        with assert_max_queries(JourneyViewSet.query_budget["retrieve"]):
+            self.client.get(detail_journey_url(journey.id))
+
+    def test_order_list_is_constant(self):
+        self._sell([self._journey_with_crew()])
+        single = self._queries(ORDER_URL)
+
+        for _ in range(3):
+            self._sell([self._journey_with_crew() for _ in range(3)])
+
+        with assert_max_queries(OrderViewSet.query_budget["list"]):
+            self.client.get(ORDER_URL)
+        self.assertEqual(self._queries(ORDER_URL), single)
+
+    def test_train_list_within_budget(self):
+        for _ in range(5):
+            sample_train()
+
+        with assert_max_queries(TrainViewSet.query_budget["list"]):
+            self.client.get(TRAIN_URL)
+
+    def test_assert_max_queries_fails_over_budget(self):
+        with self.assertRaisesMessage(AssertionError, "the budget is 0"):
+            with assert_max_queries(0):
+                list(Crew.objects.all())
+
+    @override_settings(QUERY_BUDGET_LOGGING=True)
+    def test_runtime_mode_logs_requests_over_budget(self):
+        sample_journey()
+
+        with self.assertLogs("station.query_budget", "WARNING") as logs:
+            with mock.patch.object(
+                JourneyViewSet, "query_budget", {"list": 0}
+            ):
+                self.client.get(JOURNEY_URL)
+
+        self.assertIn("JourneyViewSet.list", logs.output[0])
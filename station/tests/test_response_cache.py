@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from station.tests.test_train_station_api import (
+    TRAIN_URL,
+    detail_train_url,
+    sample_route,
+    sample_station,
+    sample_train,
+)
+
+STATION_URL = reverse("station:station-list")
+ROUTE_URL = reverse("station:route-list")
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def _names(self, url):
+        return [row["name"] for row in self.client.get(url).data["results"]]
+
+    def test_repeated_list_served_from_cache(self):
+        sample_station(name="Kyiv")
+        first = self.client.get(STATION_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(STATION_URL)
+
+        self.assertEqual(first.data, second.data)
+
+    def test_save_and_delete_invalidate_list(self):
+        station = sample_station(name="Kyiv")
+        self.assertEqual(self._names(STATION_URL), ["Kyiv"])
+
+        sample_station(name="Lviv")
+        self.assertEqual(self._names(STATION_URL), ["Kyiv", "Lviv"])
+
+        station.delete()
+        self.assertEqual(self._names(STATION_URL), ["Lviv"])
+
+    def test_route_list_follows_station_changes(self):
+        route = sample_route()
+        self.client.get(ROUTE_URL)
+
+        route.source.name = "Renamed"
+        route.source.save()
+
+        res = self.client.get(ROUTE_URL)
+        self.assertEqual(res.data["results"][0]["source"], "Renamed")
+
+    def test_train_detail_follows_train_type_changes(self):
+        train = sample_train()
+        self.client.get(detail_train_url(train.id))
+
+        train.train_type.name = "Intercity"
+        train.train_type.save()
+
+        res = self.client.get(detail_train_url(train.id))
+        self.assertEqual(res.data["train_type"]["name"], "Intercity")
+
+    def test_query_parameters_are_cached_separately(self):
+        sample_train(name="Express")
+        sample_train(name="Regional")
+
+        self.client.get(TRAIN_URL, {"name": "express"})
+        res = self.client.get(TRAIN_URL, {"name": "regional"})
+
+        self.assertEqual(
+            [row["name"] for row in res.data["results"]], ["Regional"]
+        )
@@ -0,0 +1,57 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from rest_framework import status
+
+from station.models import Journey, Order, Ticket
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import (
+    JOURNEY_URL,
+    order_tickets,
+    sample_journey,
+)
+
+
+class SeatCounterTests(AuthenticatedApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journey = sample_journey()
+
+    def test_order_increments_counter(self):
+        res = order_tickets(self.client, self.journey, (1, 1), (1, 2), (2, 5))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 3)
+
+        res = self.client.get(JOURNEY_URL)
+        self.assertEqual(res.data["results"][0]["tickets_available"], 77)
+
+    def test_failed_order_leaves_counter_untouched(self):
+        order_tickets(self.client, self.journey, (1, 1))
+        res = order_tickets(self.client, self.journey, (1, 2), (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 1)
+
+    def test_ticket_and_order_deletion_release_seats(self):
+        order_tickets(self.client, self.journey, (1, 1), (1, 2), (1, 3))
+
+        Ticket.objects.filter(seat=1).delete()
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 2)
+
+        Order.objects.all().delete()
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 0)
+
+    def test_reconcile_seats_rebuilds_drifted_counter(self):
+        order_tickets(self.client, self.journey, (1, 1), (1, 2))
+        Journey.objects.update(seats_sold=40)
+
+        call_command("reconcile_seats", stdout=StringIO())
+
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 2)
@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+
+from station.models import HeldSeat, SeatHold, Ticket
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import order_tickets, sample_journey
+
+HOLD_URL = reverse("station:seathold-list")
+
+
+def detail_hold_url(hold_id):
+    return reverse("station:seathold-detail", args=[hold_id])
+
+
+def confirm_hold_url(hold_id):
+    return reverse("station:seathold-confirm", args=[hold_id])
+
+
+class SeatHoldApiTests(AuthenticatedApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = get_user_model().objects.create_user(
+            "other@test.com",
+            "testpass",
+        )
+        self.journey = sample_journey()
+
+    def _hold(self, *seats, user=None):
+        self.client.force_authenticate(user or self.user)
+        return self.client.post(
+            HOLD_URL,
+            {
+                "journey": self.journey.id,
+                "seats": [
+                    {"cargo": cargo, "seat": seat} for cargo, seat in seats
+                ],
+            },
+            format="json",
+        )
+
+    def _expire(self, hold_id):
+        SeatHold.objects.filter(pk=hold_id).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_hold_and_confirm(self):
+        res = self._hold((1, 1), (1, 2))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data["seats"],
+            [{"cargo": 1, "seat": 1}, {"cargo": 1, "seat": 2}],
+        )
+
+        res = self.client.post(confirm_hold_url(res.data["id"]))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["tickets"]), 2)
+        self.assertFalse(SeatHold.objects.exists())
+        self.journey.refresh_from_db()
+        self.assertEqual(self.journey.seats_sold, 2)
+
+    def test_held_seat_conflict_suggests_alternatives(self):
+        self._hold((1, 1), (1, 2))
+
+        res = self._hold((1, 2), (1, 3), user=self.other)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["seats"], [{"cargo": 1, "seat": 2}])
+        self.assertEqual(res.data["alternatives"], [{"cargo": 1, "seat": 4}])
+
+    def test_order_for_held_seat_conflicts(self):
+        self._hold((1, 1))
+
+        self.client.force_authenticate(self.other)
+        res = order_tickets(self.client, self.journey, (1, 1))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["alternatives"], [{"cargo": 1, "seat": 2}])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_sold_seat_cannot_be_held(self):
+        hold_id = self._hold((1, 1)).data["id"]
+        self.client.post(confirm_hold_url(hold_id))
+
+        res = self._hold((1, 1), user=self.other)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_expired_hold(self):
+        hold_id = self._hold((1, 1)).data["id"]
+        self._expire(hold_id)
+
+        res = self.client.post(confirm_hold_url(hold_id))
+        self.assertEqual(res.status_code, status.HTTP_410_GONE)
+
+        res = self._hold((1, 1), user=self.other)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.filter(pk=hold_id).exists())
+
+    def test_release_hold(self):
+        hold_id = self._hold((1, 1)).data["id"]
+
+        res = self.client.delete(detail_hold_url(hold_id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            self._hold((1, 1), user=self.other).status_code,
+            status.HTTP_201_CREATED,
+        )
+
+    def test_holds_are_private(self):
+        hold_id = self._hold((1, 1)).data["id"]
+
+        self.client.force_authenticate(self.other)
+
+        self.assertEqual(self.client.get(HOLD_URL).data, [])
+        res = self.client.post(confirm_hold_url(hold_id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_seats(self):
+        self.assertEqual(
+            self._hold((1, 21)).status_code, status.HTTP_400_BAD_REQUEST
+        )
+        self.assertEqual(
+            self._hold((1, 1), (1, 1)).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_sweep_expired_deletes_only_expired_holds(self):
+        expired_id = self._hold((1, 1)).data["id"]
+        active_id = self._hold((1, 2)).data["id"]
+        self._expire(expired_id)
+
+        out = StringIO()
+        call_command("sweep_expired", stdout=out)
+
+        self.assertIn("Deleted 1 seat holds", out.getvalue())
+        self.assertEqual(
+            list(SeatHold.objects.values_list("id", flat=True)),
+            [SeatHold.objects.get(pk=active_id).pk],
+        )
+        self.assertEqual(HeldSeat.objects.count(), 1)
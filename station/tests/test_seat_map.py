@@ -0,0 +1,91 @@
+import base64
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from rest_framework import status
+
+from station.models import Order, SeatMap, Ticket
+from station.occupancy import is_taken, seat_index
+from station.tests.base import AuthenticatedApiTestCase
+from station.tests.test_train_station_api import order_tickets, sample_journey
+
+
+def seat_map_url(journey_id):
+    return reverse("station:journey-seat-map", args=[journey_id])
+
+
+class SeatMapApiTests(AuthenticatedApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journey = sample_journey()
+
+    def _sell(self, *seats):
+        res = order_tickets(self.client, self.journey, *seats)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def _taken_seats(self, bitmap: bytes) -> list[tuple[int, int]]:
+        return [
+            (cargo, seat)
+            for cargo in range(1, 5)
+            for seat in range(1, 21)
+            if is_taken(bitmap, seat_index(cargo, seat, 20))
+        ]
+
+    def test_seat_map_reflects_sold_tickets(self):
+        self._sell((1, 1), (2, 20), (4, 7))
+
+        res = self.client.get(seat_map_url(self.journey.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["cargo_num"], 4)
+        self.assertEqual(res.data["places_in_cargo"], 20)
+        self.assertEqual(res.data["seats_sold"], 3)
+        bitmap = base64.b64decode(res.data["bitmap"])
+        self.assertEqual(len(bitmap), 10)
+        self.assertEqual(self._taken_seats(bitmap), [(1, 1), (2, 20), (4, 7)])
+
+    def test_binary_seat_map(self):
+        self._sell((1, 3))
+
+        res = self.client.get(
+            seat_map_url(self.journey.id), {"encoding": "binary"}
+        )
+
+        self.assertEqual(res["Content-Type"], "application/octet-stream")
+        self.assertEqual(res["X-Places-In-Cargo"], "20")
+        self.assertEqual(self._taken_seats(res.content), [(1, 3)])
+
+    def test_deleted_ticket_frees_seat(self):
+        self._sell((1, 1), (1, 2))
+        Ticket.objects.get(seat=1).delete()
+
+        res = self.client.get(seat_map_url(self.journey.id))
+
+        bitmap = base64.b64decode(res.data["bitmap"])
+        self.assertEqual(self._taken_seats(bitmap), [(1, 2)])
+
+    def test_missing_seat_map_is_built_from_tickets(self):
+        self._sell((3, 4))
+        SeatMap.objects.all().delete()
+
+        res = self.client.get(seat_map_url(self.journey.id))
+        bitmap = base64.b64decode(res.data["bitmap"])
+        self.assertEqual(self._taken_seats(bitmap), [(3, 4)])
+
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(
+            journey=self.journey, order=order, cargo=3, seat=5
+        )
+        bitmap = SeatMap.objects.get(journey=self.journey).bitmap
+        self.assertEqual(self._taken_seats(bytes(bitmap)), [(3, 4), (3, 5)])
+
+    def test_reconcile_rebuilds_seat_maps(self):
+        self._sell((2, 2))
+        SeatMap.objects.update(bitmap=b"\xff" * 10)
+
+        call_command("reconcile_seats", "--seat-maps", stdout=StringIO())
+
+        bitmap = SeatMap.objects.get(journey=self.journey).bitmap
+        self.assertEqual(self._taken_seats(bytes(bitmap)), [(2, 2)])
@@ -0,0 +1,48 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from station.tests.test_train_station_api import JOURNEY_URL, sample_journey
+
+DB_TIMING = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        sample_journey()
+
+    def test_header_reports_every_phase(self):
+        with self.assertLogs("station.timing", "INFO"):
+            response = self.client.get(JOURNEY_URL)
+
+        header = response["Server-Timing"]
+        self.assertGreater(int(DB_TIMING.search(header).group(1)), 0)
+        for metric in ("serialize", "render", "total"):
+            self.assertRegex(header, rf"{metric};dur=[\d.]+")
+
+    def test_log_line_names_viewset_and_action(self):
+        with self.assertLogs("station.timing", "INFO") as logs:
+            self.client.get(JOURNEY_URL)
+
+        [record] = logs.records
+        self.assertIn("view=JourneyViewSet action=list", record.getMessage())
+        self.assertEqual(record.timing["status"], 200)
+        self.assertEqual(record.timing["path"], JOURNEY_URL)
+        self.assertGreater(record.timing["queries"], 0)
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_disabled_without_sampling(self):
+        response = APIClient().get(JOURNEY_URL)
+
+        self.assertFalse(response.has_header("Server-Timing"))
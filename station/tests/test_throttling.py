@@ -0,0 +1,149 @@
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.tests.test_train_station_api import JOURNEY_URL, sample_journey
+from station.throttling import ScopedThrottle, UserThrottle, clear_throttles
+
+ORDER_URL = reverse("station:order-list")
+
+RATES = {"anon": "100/day", "user": "3/min", "orders": "1/hour"}
+THROTTLED = override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": RATES,
+    }
+)
+
+
+def user_request(pk=1):
+    return SimpleNamespace(
+        user=SimpleNamespace(is_authenticated=True, pk=pk), META={}
+    )
+
+
+@THROTTLED
+class SlidingWindowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 600.0
+        self.view = SimpleNamespace(action="list")
+
+    def throttle(self, throttle_class=UserThrottle):
+        throttle = throttle_class()
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def allowed(self, request=None, view=None) -> bool:
+        return self.throttle().allow_request(
+            request or user_request(), view or self.view
+        )
+
+    def test_rate_within_window(self):
+        allowed = [self.allowed() for _ in range(4)]
+
+        self.assertEqual(allowed, [True, True, True, False])
+
+    def test_previous_window_slides_out(self):
+        for _ in range(3):
+            self.allowed()
+
+        # Half of the previous window still counts: 1.5 requests
+        self.now += 90
+        allowed = [self.allowed() for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+
+        # A quarter of it: 0.75
+        self.now += 15
+        self.assertTrue(self.allowed())
+
+    def test_wait_until_allowed(self):
+        for _ in range(3):
+            self.allowed()
+        throttle = self.throttle()
+        self.now += 30
+
+        self.assertFalse(throttle.allow_request(user_request(), self.view))
+        wait = throttle.wait()
+        self.now += wait + 0.01
+
+        self.assertAlmostEqual(wait, 30)
+        self.assertTrue(self.allowed())
+
+    def test_constant_memory_per_client(self):
+        for _ in range(3):
+            self.allowed()
+
+        self.assertEqual(
+            list(cache._cache),
+            [cache.make_key("station:throttle:user:1:10")],
+        )
+
+    def test_clients_counted_apart(self):
+        for _ in range(3):
+            self.allowed()
+
+        self.assertTrue(self.allowed(user_request(pk=2)))
+
+    def test_scoped_view_has_own_budget(self):
+        view = SimpleNamespace(
+            action="create", throttle_scopes={"create": "orders"}
+        )
+        scoped = self.throttle(ScopedThrottle)
+
+        self.assertTrue(scoped.allow_request(user_request(), view))
+        self.assertFalse(scoped.allow_request(user_request(), view))
+        # Not counted against the user budget
+        self.assertTrue(self.allowed(view=view))
+        self.assertIsNone(
+            self.throttle().get_cache_key(user_request(), view)
+        )
+
+    def test_clear_throttles(self):
+        self.now = time.time()
+        for _ in range(3):
+            self.allowed()
+
+        clear_throttles(1)
+
+        self.assertTrue(self.allowed())
+
+
+@THROTTLED
+class ThrottledEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.journey = sample_journey()
+
+    def order(self):
+        return self.client.post(
+            ORDER_URL,
+            {"journey": self.journey.id, "passengers": 1},
+            format="json",
+        )
+
+    def test_orders_and_reads_have_separate_budgets(self):
+        self.assertEqual(self.order().status_code, status.HTTP_201_CREATED)
+
+        response = self.order()
+
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertIn("Retry-After", response)
+        self.assertEqual(
+            self.client.get(JOURNEY_URL).status_code, status.HTTP_200_OK
+        )
@@ -0,0 +1,205 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from station.cache import get_version, model_version_name
+from station.connections import graphs
+from station.images import (
+    CLAIM_TIMEOUT,
+    claim_train_images,
+    process_train_images,
+)
+from station.models import Train
+from station.tests.test_train_station_api import TRAIN_URL, sample_train
+
+
+def upload_url(train_id: int) -> str:
+    return reverse("station:train-upload-image", args=[train_id])
+
+
+def image_file(size=(1200, 800), mode="RGB", name="train.png"):
+    buffer = BytesIO()
+    Image.new(mode, size, "red").save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+class TrainImageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com",
+            "testpass",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.user)
+        self.train = sample_train()
+
+    def upload(self, train_id=None, **kwargs):
+        return self.client.post(
+            upload_url(train_id or self.train.id),
+            {"image": image_file(**kwargs)},
+            format="multipart",
+        )
+
+    def test_upload_defers_variants(self):
+        response = self.upload()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["image_variants"])
+        self.train.refresh_from_db()
+        self.assertRegex(
+            self.train.image.name, r"^uploads/trains/\w{2}/\w{64}\.png$"
+        )
+        self.assertIsNone(self.train.image_variants)
+        listed = self.client.get(TRAIN_URL).data["results"][0]
+        self.assertTrue(listed["image"].endswith(self.train.image.name))
+
+    def test_upload_requires_image(self):
+        response = self.client.post(upload_url(self.train.id), {})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_process_renders_variants(self):
+        self.upload()
+
+        self.assertEqual(process_train_images(), 1)
+
+        self.train.refresh_from_db()
+        variants = self.train.image_variants
+        self.assertEqual(
+            sorted(variants),
+            ["medium", "medium_webp", "thumbnail", "thumbnail_webp"],
+        )
+        with default_storage.open(variants["thumbnail_webp"]) as file:
+            with Image.open(file) as thumbnail:
+                self.assertEqual(thumbnail.format, "WEBP")
+                self.assertEqual(thumbnail.size, (320, 213))
+        self.assertTrue(variants["thumbnail"].endswith(".jpg"))
+
+        listed = self.client.get(TRAIN_URL).data["results"][0]
+        self.assertTrue(listed["image"].endswith(variants["thumbnail"]))
+        self.assertTrue(
+            listed["image_variants"]["medium_webp"].endswith(
+                variants["medium_webp"]
+            )
+        )
+        self.assertEqual(process_train_images(), 0)
+
+    def test_small_image_not_enlarged(self):
+        self.upload(size=(100, 50))
+        process_train_images()
+
+        self.train.refresh_from_db()
+        with default_storage.open(self.train.image_variants["medium"]) as f:
+            with Image.open(f) as medium:
+                self.assertEqual(medium.size, (100, 50))
+
+    def test_transparency_kept(self):
+        self.upload(mode="RGBA")
+        process_train_images()
+
+        self.train.refresh_from_db()
+        thumbnail = self.train.image_variants["thumbnail"]
+        self.assertTrue(thumbnail.endswith(".png"))
+
+    def test_duplicate_upload_stored_once(self):
+        other = sample_train(train_type=self.train.train_type)
+        self.upload()
+        process_train_images()
+
+        response = self.upload(train_id=other.id, name="copy.png")
+
+        other.refresh_from_db()
+        self.train.refresh_from_db()
+        self.assertEqual(other.image.name, self.train.image.name)
+        self.assertEqual(other.image_variants, self.train.image_variants)
+        self.assertEqual(
+            len(response.data["image_variants"]), len(other.image_variants)
+        )
+        directory = os.path.dirname(default_storage.path(other.image.name))
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_unreadable_image_skipped(self):
+        self.upload()
+        self.train.refresh_from_db()
+        with open(default_storage.path(self.train.image.name), "wb") as file:
+            file.write(b"not an image")
+
+        with self.assertLogs("station.images", "ERROR"):
+            process_train_images()
+
+        self.train.refresh_from_db()
+        self.assertEqual(self.train.image_variants, {})
+        listed = self.client.get(TRAIN_URL).data["results"][0]
+        self.assertTrue(listed["image"].endswith(self.train.image.name))
+
+    def test_render_updates_without_save_signals(self):
+        self.upload()
+        version = get_version(model_version_name(Train))
+
+        with mock.patch.object(graphs, "clear") as clear:
+            with self.captureOnCommitCallbacks(execute=True):
+                process_train_images()
+
+        clear.assert_not_called()
+        self.assertNotEqual(get_version(model_version_name(Train)), version)
+        self.train.refresh_from_db()
+        self.assertIsNone(self.train.image_claimed_at)
+
+    def test_claimed_trains_left_to_their_worker(self):
+        self.upload()
+        self.train.refresh_from_db()
+
+        self.assertEqual(
+            claim_train_images(), {self.train.image.name: [self.train.id]}
+        )
+        self.assertEqual(process_train_images(), 0)
+
+        Train.objects.filter(pk=self.train.id).update(
+            image_claimed_at=timezone.now() - CLAIM_TIMEOUT
+        )
+        self.assertEqual(process_train_images(), 1)
+
+    def test_new_upload_while_rendering_stays_pending(self):
+        self.upload()
+        claimed = claim_train_images()
+        self.upload(size=(600, 400))
+
+        # The render of the first upload finishes after the second one
+        with mock.patch(
+                "station.images.claim_train_images", return_value=claimed
+        ):
+            process_train_images()
+
+        self.train.refresh_from_db()
+        self.assertIsNone(self.train.image_variants)
+        self.assertEqual(process_train_images(), 1)
+
+    def test_command_uses_process_pool(self):
+        self.upload()
+
+        call_command("process_train_images", processes=1, stdout=StringIO())
+
+        self.train.refresh_from_db()
+        self.assertEqual(len(self.train.image_variants), 4)
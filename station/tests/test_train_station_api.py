@@ -1,5 +1,4 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
 from django.urls import reverse
 
 from rest_framework.test import APIClient
@@ -19,9 +18,11 @@ from station.serializers import (
     JourneyListSerializer,
     JourneyDetailSerializer,
 )
+from station.tests.base import ApiTestCase
 
 TRAIN_URL = reverse("station:train-list")
 JOURNEY_URL = reverse("station:journey-list")
+ORDER_URL = reverse("station:order-list")
 
 
 def sample_station(**params):
@@ -76,6 +77,17 @@ def sample_journey(**params):
     return journey
 
 
+def order_tickets(client, journey, *seats, **extra):
+    """Order the (cargo, seat) pairs of the journey"""
+    payload = {
+        "tickets": [
+            {"cargo": cargo, "seat": seat, "journey": journey.id}
+            for cargo, seat in seats
+        ]
+    }
+    return client.post(ORDER_URL, payload, format="json", **extra)
+
+
 def detail_train_url(train_id):
     return reverse("station:train-detail", args=[train_id])
 
@@ -84,8 +96,9 @@ def detail_journey_url(journey_id):
     return reverse("station:journey-detail", args=[journey_id])
 
 
-class UnauthenticatedTrainApiTests(TestCase):
+class UnauthenticatedTrainApiTests(ApiTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
     def test_auth_required(self):
@@ -93,8 +106,9 @@ class UnauthenticatedTrainApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class AuthenticatedTrainApiTests(TestCase):
+class AuthenticatedTrainApiTests(ApiTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "test@test.com",
@@ -112,7 +126,7 @@ class AuthenticatedTrainApiTests(TestCase):
         serializer = TrainListSerializer(trains, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_trains_by_train_types(self):
         train_type1 = TrainType.objects.create(name="TrainType 1")
@@ -131,9 +145,9 @@ class AuthenticatedTrainApiTests(TestCase):
         serializer2 = TrainListSerializer(train2)
         serializer3 = TrainListSerializer(train3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_filter_trains_by_name(self):
         train1 = sample_train(name="Train")
@@ -146,9 +160,9 @@ class AuthenticatedTrainApiTests(TestCase):
         serializer2 = TrainListSerializer(train2)
         serializer3 = TrainListSerializer(train3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_retrieve_train_detail(self):
         train = sample_train()
@@ -174,8 +188,9 @@ class AuthenticatedTrainApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
-class UnauthenticatedJourneyApiTests(TestCase):
+class UnauthenticatedJourneyApiTests(ApiTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
 
     def test_auth_required(self):
@@ -183,8 +198,9 @@ class UnauthenticatedJourneyApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class AuthenticatedJourneyApiTests(TestCase):
+class AuthenticatedJourneyApiTests(ApiTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "test@test.com",
@@ -199,7 +215,7 @@ class AuthenticatedJourneyApiTests(TestCase):
         serializer = JourneyListSerializer(journeys, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_filter_journeys_by_routes(self):
         route1 = sample_route(distance=111)
@@ -218,9 +234,9 @@ class AuthenticatedJourneyApiTests(TestCase):
         serializer2 = JourneyListSerializer(journey2)
         serializer3 = JourneyListSerializer(journey3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_filter_journeys_by_trains(self):
         train1 = sample_train(name="Train 1")
@@ -239,9 +255,9 @@ class AuthenticatedJourneyApiTests(TestCase):
         serializer2 = JourneyListSerializer(journey2)
         serializer3 = JourneyListSerializer(journey3)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     def test_filter_journeys_by_departure_time(self):
         departure_time = "2024-01-18"
@@ -254,8 +270,8 @@ class AuthenticatedJourneyApiTests(TestCase):
         serializer1 = JourneyListSerializer(journey1)
         serializer2 = JourneyListSerializer(journey2)
 
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     def test_retrieve_journey_detail(self):
         journey = sample_journey()
@@ -288,8 +304,9 @@ class AuthenticatedJourneyApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
-class AdminTrainApiTests(TestCase):
+class AdminTrainApiTests(ApiTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "admin@admin.com", "testpass", is_staff=True
@@ -310,8 +327,9 @@ class AdminTrainApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
 
-class AdminJourneyApiTests(TestCase):
+class AdminJourneyApiTests(ApiTestCase):
     def setUp(self):
+        super().setUp()
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
             "admin@admin.com", "testpass", is_staff=True
@@ -0,0 +1,157 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from station.tests.test_train_station_api import TRAIN_URL
+from user.authentication import UserAccessToken, user_rows
+
+TOKEN_URL = reverse("user:token_obtain_pair")
+REFRESH_URL = reverse("user:token_refresh")
+ME_URL = reverse("user:manage")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_rows.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+            first_name="Test",
+        )
+
+    def authenticate(self, token) -> None:
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def user_queries(self, method: str, url: str, **kwargs):
+        """Response and number of queries on the user table"""
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, **kwargs)
+        table = get_user_model()._meta.db_table
+        queries = [
+            query for query in context.captured_queries
+            if f'"{table}"' in query["sql"]
+        ]
+        return response, len(queries)
+
+    def test_obtained_token_needs_no_user_query(self):
+        response = self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": "testpass"}
+        )
+        self.authenticate(response.data["access"])
+
+        response, queries = self.user_queries("get", TRAIN_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, 0)
+
+    def test_refreshed_token_keeps_claims(self):
+        response = self.client.post(
+            TOKEN_URL, {"email": "test@test.com", "password": "testpass"}
+        )
+        response = self.client.post(
+            REFRESH_URL, {"refresh": response.data["refresh"]}
+        )
+        self.authenticate(response.data["access"])
+
+        response, queries = self.user_queries("get", ME_URL)
+
+        self.assertEqual(response.data["email"], "test@test.com")
+        self.assertEqual(queries, 0)
+
+    def test_update_through_claims_user_keeps_other_fields(self):
+        self.authenticate(UserAccessToken.for_user(self.user))
+
+        response = self.client.patch(
+            ME_URL, {"email": "new@test.com", "password": "newpass"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@test.com")
+        self.assertEqual(self.user.first_name, "Test")
+        self.assertTrue(self.user.check_password("newpass"))
+
+    def test_change_invalidates_claims(self):
+        self.authenticate(UserAccessToken.for_user(self.user))
+        self.client.patch(ME_URL, {"email": "new@test.com"})
+
+        response, queries = self.user_queries("get", ME_URL)
+
+        self.assertEqual(response.data["email"], "new@test.com")
+        self.assertEqual(queries, 1)
+
+    def test_admin_change_applies_to_issued_tokens(self):
+        self.authenticate(UserAccessToken.for_user(self.user))
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(ME_URL)
+
+        self.assertTrue(response.data["is_staff"])
+
+    def test_deactivated_user_rejected(self):
+        self.authenticate(UserAccessToken.for_user(self.user))
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(TRAIN_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_claims_loads_user_once(self):
+        self.authenticate(AccessToken.for_user(self.user))
+
+        _, first = self.user_queries("get", TRAIN_URL)
+        response, second = self.user_queries("get", ME_URL)
+
+        self.assertEqual((first, second), (1, 0))
+        self.assertEqual(response.data["email"], "test@test.com")
+
+    def test_cached_row_expires_with_token_lifetime(self):
+        self.authenticate(AccessToken.for_user(self.user))
+        self.client.get(TRAIN_URL)
+        # Deactivated through another process, whose version bump this
+        # process's cache does not see
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False
+        )
+
+        response = self.client.get(TRAIN_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        later = (
+            time.monotonic()
+            + api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        )
+        with mock.patch.object(user_rows, "timer", lambda: later):
+            response = self.client.get(TRAIN_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_rejected(self):
+        self.authenticate(UserAccessToken.for_user(self.user))
+        self.user.delete()
+
+        response = self.client.get(TRAIN_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_keeps_claims(self):
+        self.authenticate(UserAccessToken.for_user(self.user))
+        update_last_login(None, self.user)
+
+        _, queries = self.user_queries("get", TRAIN_URL)
+
+        self.assertEqual(queries, 0)
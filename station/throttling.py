@@ -0,0 +1,169 @@
+"""
+Sliding window throttles sharing their counts through a cache.
+
+DRF's rate throttles keep a list of request timestamps per client and
+rewrite it on every request, in a cache that defaults to per-process
+memory. These throttles keep two integers per client instead, the number
+of requests in the current and in the previous fixed window, and estimate
+the requests of the last ``duration`` seconds as
+
+    previous * (share of the previous window still in range) + current
+
+Counts are added with ``cache.add``/``cache.incr``, which are atomic on
+Redis and Memcached, so every worker pointed at the same
+``THROTTLE_CACHE`` enforces one budget.
+
+Views get separate budgets with ``throttle_scope`` or, per action,
+``throttle_scopes``; requests to a scope with a configured rate count
+against that scope instead of the ``anon``/``user`` budget.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+KEY_PREFIX = "station:throttle"
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def throttle_cache():
+    return caches[getattr(settings, "THROTTLE_CACHE", "default")]
+
+
+def throttle_key(scope: str, ident) -> str:
+    return f"{KEY_PREFIX}:{scope}:{ident}"
+
+
+def view_scope(view) -> str | None:
+    """Scope of the view's current action, if its rate is configured"""
+    scopes = getattr(view, "throttle_scopes", None) or {}
+    scope = scopes.get(getattr(view, "action", None)) or getattr(
+        view, "throttle_scope", None
+    )
+    if scope in api_settings.DEFAULT_THROTTLE_RATES:
+        return scope
+    return None
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    def get_rate(self) -> str:
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f"No default throttle rate set for '{self.scope}' scope"
+            )
+
+    @property
+    def cache(self):
+        return throttle_cache()
+
+    def key_for(self, ident) -> str:
+        return throttle_key(self.scope, ident)
+
+    def allow_request(self, request, view) -> bool:
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, elapsed = divmod(self.now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        previous_key = f"{self.key}:{int(window) - 1}"
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 0)
+        self.previous = counts.get(previous_key, 0)
+        self.elapsed = elapsed / self.duration
+
+        if self.estimate() >= self.num_requests:
+            return self.throttle_failure()
+
+        # Kept through the next window, where it is the previous one
+        if not self.cache.add(current_key, 1, timeout=2 * self.duration):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                # Expired between add and incr
+                self.cache.add(current_key, 1, timeout=2 * self.duration)
+        return True
+
+    def estimate(self) -> float:
+        return self.previous * (1 - self.elapsed) + self.current
+
+    def wait(self) -> float | None:
+        """Seconds until the estimate drops below the rate"""
+        rate = self.num_requests
+        if self.current < rate:
+            # The previous window slides out first
+            fraction = 1 - (rate - self.current) / self.previous
+            return max(0.0, (fraction - self.elapsed) * self.duration)
+        # Then this one, once it has become the previous window
+        fraction = 1 - rate / self.current
+        return (1 - self.elapsed + fraction) * self.duration
+
+
+class AnonThrottle(SlidingWindowThrottle):
+    """Budget of anonymous clients by IP address"""
+
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        if view_scope(view):
+            return None
+        return self.key_for(self.get_ident(request))
+
+
+class UserThrottle(SlidingWindowThrottle):
+    """Budget of authenticated users, or of the IP address otherwise"""
+
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if view_scope(view):
+            return None
+        if request.user and request.user.is_authenticated:
+            return self.key_for(request.user.pk)
+        return self.key_for(self.get_ident(request))
+
+
+class ScopedThrottle(SlidingWindowThrottle):
+    """Budget per user and scope of the views with a scoped rate"""
+
+    def __init__(self):
+        # The rate depends on the view being throttled
+        self.rate = None
+
+    def allow_request(self, request, view) -> bool:
+        self.scope = view_scope(view)
+        if self.scope is None:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return self.key_for(request.user.pk)
+        return self.key_for(self.get_ident(request))
+
+
+def clear_throttles(*idents) -> None:
+    """Forget the recent requests of user ids or IP addresses"""
+    now = time.time()
+    keys = []
+    for scope, rate in api_settings.DEFAULT_THROTTLE_RATES.items():
+        if rate is None:
+            continue
+        window = int(now // PERIODS[rate.split("/")[1][0]])
+        for ident in idents:
+            key = throttle_key(scope, ident)
+            keys += [f"{key}:{window}", f"{key}:{window - 1}"]
+    throttle_cache().delete_many(keys)
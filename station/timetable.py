@@ -0,0 +1,337 @@
+"""
+Bulk timetable import.
+
+Rows are streamed from CSV or JSONL files, their foreign keys resolved
+through in-memory maps of natural keys (station, train, train type and crew
+names) and written with batched ``bulk_create``, one transaction per batch.
+Model signals do not fire for bulk inserts, so ``finish`` invalidates the
+caches they would have invalidated.
+"""
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from station.cache import bump_version, model_version_name
+from station.connections import graphs
+from station.models import Crew, Journey, Route, Station, Train, TrainType
+
+IMPORT_BATCH_SIZE = 5000
+
+
+class TimetableError(ValueError):
+    pass
+
+
+def read_rows(path: str) -> Iterator[dict]:
+    """Rows of a .csv file with a header or a .jsonl file, one at a time"""
+    suffix = Path(path).suffix.lower()
+    if suffix not in (".csv", ".jsonl", ".ndjson"):
+        raise TimetableError(f"{path}: use a .csv or .jsonl file")
+
+    with open(path, newline="", encoding="utf-8") as file:
+        if suffix == ".csv":
+            yield from csv.DictReader(file)
+            return
+
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class TimetableImporter:
+    """
+    Import stations, trains, routes and journeys with their crew. Rows
+    naming an existing station, train or route, and journeys of a route
+    and train already departing at their time, are skipped, so an import
+    can be resumed or rerun.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.stations = dict(Station.objects.values_list("name", "id"))
+        self.train_types = dict(TrainType.objects.values_list("name", "id"))
+        self.trains = dict(Train.objects.values_list("name", "id"))
+        self.routes = {
+            (source_id, destination_id): route_id
+            for route_id, source_id, destination_id in (
+                Route.objects.values_list("id", "source_id", "destination_id")
+            )
+        }
+        self.crew = {
+            (first_name, last_name): crew_id
+            for crew_id, first_name, last_name in Crew.objects.values_list(
+                "id", "first_name", "last_name"
+            )
+        }
+        self.imported: set[type] = set()
+        # Looked up once, get_current_timezone is slow on a hot path
+        self.timezone = timezone.get_current_timezone()
+
+    @staticmethod
+    def _value(row: dict, field: str, number: int, cast=str):
+        value = row.get(field)
+        if value in (None, ""):
+            raise TimetableError(f"Row {number}: {field} is required")
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            raise TimetableError(f"Row {number}: invalid {field} {value!r}")
+
+    def _lookup(self, mapping: dict, key, what: str, number: int):
+        try:
+            return mapping[key]
+        except KeyError:
+            raise TimetableError(f"Row {number}: unknown {what} {key!r}")
+
+    def _datetime(self, row: dict, field: str, number: int):
+        moment = self._value(row, field, number, parse_datetime)
+        if moment is None:
+            raise TimetableError(f"Row {number}: invalid {field}")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment, self.timezone)
+        return moment
+
+    def _insert(self, model, objects: list, mapping: dict, key) -> int:
+        """Create new objects and remember their ids under key(object)"""
+        if objects:
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+            mapping.update((key(obj), obj.id) for obj in objects)
+            self.imported.add(model)
+        return len(objects)
+
+    def _import(self, rows: Iterable[dict], build_batch) -> int:
+        created = 0
+        number = 0
+        for batch in _batches(rows, self.batch_size):
+            with transaction.atomic():
+                created += build_batch(batch, number)
+            number += len(batch)
+        return created
+
+    def import_stations(self, rows: Iterable[dict]) -> int:
+        def batch(rows: list[dict], offset: int) -> int:
+            new = {}
+            for number, row in enumerate(rows, start=offset + 1):
+                name = self._value(row, "name", number)
+                if name not in self.stations and name not in new:
+                    new[name] = Station(
+                        name=name,
+                        latitude=self._value(row, "latitude", number, float),
+                        longitude=self._value(
+                            row, "longitude", number, float
+                        ),
+                    )
+            return self._insert(
+                Station, list(new.values()), self.stations, lambda s: s.name
+            )
+
+        return self._import(rows, batch)
+
+    def import_trains(self, rows: Iterable[dict]) -> int:
+        def batch(rows: list[dict], offset: int) -> int:
+            new = {}
+            types = {}
+            for number, row in enumerate(rows, start=offset + 1):
+                name = self._value(row, "name", number)
+                train_type = self._value(row, "train_type", number)
+                if train_type not in self.train_types:
+                    types.setdefault(train_type, TrainType(name=train_type))
+                if name not in self.trains and name not in new:
+                    new[name] = (
+                        Train(
+                            name=name,
+                            cargo_num=self._value(
+                                row, "cargo_num", number, int
+                            ),
+                            places_in_cargo=self._value(
+                                row, "places_in_cargo", number, int
+                            ),
+                        ),
+                        train_type,
+                    )
+
+            self._insert(
+                TrainType,
+                list(types.values()),
+                self.train_types,
+                lambda train_type: train_type.name,
+            )
+            for train, train_type in new.values():
+                train.train_type_id = self.train_types[train_type]
+            return self._insert(
+                Train,
+                [train for train, _ in new.values()],
+                self.trains,
+                lambda train: train.name,
+            )
+
+        return self._import(rows, batch)
+
+    def _route_key(self, row: dict, number: int) -> tuple[int, int]:
+        return (
+            self._lookup(
+                self.stations,
+                self._value(row, "source", number),
+                "station",
+                number,
+            ),
+            self._lookup(
+                self.stations,
+                self._value(row, "destination", number),
+                "station",
+                number,
+            ),
+        )
+
+    def import_routes(self, rows: Iterable[dict]) -> int:
+        def batch(rows: list[dict], offset: int) -> int:
+            new = {}
+            for number, row in enumerate(rows, start=offset + 1):
+                key = self._route_key(row, number)
+                if key not in self.routes and key not in new:
+                    new[key] = Route(
+                        source_id=key[0],
+                        destination_id=key[1],
+                        distance=self._value(row, "distance", number, int),
+                    )
+            return self._insert(
+                Route,
+                list(new.values()),
+                self.routes,
+                lambda route: (route.source_id, route.destination_id),
+            )
+
+        return self._import(rows, batch)
+
+    @staticmethod
+    def _crew_names(value, number: int) -> list[tuple[str, str]]:
+        """Crew as "First Last; ..." in CSV or a list of names or objects"""
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = [name for name in value.split(";") if name.strip()]
+
+        if not isinstance(value, list):
+            raise TimetableError(f"Row {number}: invalid crew {value!r}")
+
+        names = []
+        for member in value:
+            if isinstance(member, dict):
+                first_name = member.get("first_name")
+                last_name = member.get("last_name")
+            elif isinstance(member, str):
+                first_name, _, last_name = member.strip().partition(" ")
+                last_name = last_name.strip()
+            else:
+                first_name = last_name = None
+            if not (
+                    first_name
+                    and last_name
+                    and isinstance(first_name, str)
+                    and isinstance(last_name, str)
+            ):
+                raise TimetableError(
+                    f"Row {number}: crew {member!r} needs a first and last "
+                    f"name"
+                )
+            names.append((first_name, last_name))
+        return names
+
+    @staticmethod
+    def _existing_journeys(keys) -> set[tuple]:
+        """The (route, train, departure time) keys already imported"""
+        if not keys:
+            return set()
+        route_ids, train_ids, departure_times = zip(*keys)
+        return set(
+            Journey.objects.filter(
+                route_id__in=set(route_ids),
+                train_id__in=set(train_ids),
+                departure_time__in=set(departure_times),
+            ).values_list("route_id", "train_id", "departure_time")
+        )
+
+    def import_journeys(self, rows: Iterable[dict]) -> int:
+        def batch(rows: list[dict], offset: int) -> int:
+            new = {}
+            for number, row in enumerate(rows, start=offset + 1):
+                route_id = self._lookup(
+                    self.routes, self._route_key(row, number), "route", number
+                )
+                journey = Journey(
+                    route_id=route_id,
+                    train_id=self._lookup(
+                        self.trains,
+                        self._value(row, "train", number),
+                        "train",
+                        number,
+                    ),
+                    departure_time=self._datetime(
+                        row, "departure_time", number
+                    ),
+                    arrival_time=self._datetime(row, "arrival_time", number),
+                )
+                names = self._crew_names(row.get("crew"), number)
+                new.setdefault(
+                    (
+                        journey.route_id,
+                        journey.train_id,
+                        journey.departure_time,
+                    ),
+                    (journey, names),
+                )
+            for key in self._existing_journeys(new):
+                new.pop(key, None)
+
+            journeys = [journey for journey, _ in new.values()]
+            crews = [names for _, names in new.values()]
+            new_crew = {}
+            for names in crews:
+                for first_name, last_name in names:
+                    if (first_name, last_name) not in self.crew:
+                        new_crew.setdefault(
+                            (first_name, last_name),
+                            Crew(first_name=first_name, last_name=last_name),
+                        )
+
+            self._insert(
+                Crew,
+                list(new_crew.values()),
+                self.crew,
+                lambda crew: (crew.first_name, crew.last_name),
+            )
+            Journey.objects.bulk_create(journeys, batch_size=self.batch_size)
+            Journey.crew.through.objects.bulk_create(
+                (
+                    Journey.crew.through(
+                        journey_id=journey.id, crew_id=self.crew[name]
+                    )
+                    for journey, names in zip(journeys, crews)
+                    for name in dict.fromkeys(names)
+                ),
+                batch_size=self.batch_size,
+            )
+            if journeys:
+                self.imported.add(Journey)
+            return len(journeys)
+
+        return self._import(rows, batch)
+
+    def finish(self) -> None:
+        """Invalidate what the skipped save signals would have"""
+        for model in self.imported - {Journey}:
+            bump_version(model_version_name(model))
+        if self.imported:
+            graphs.clear()
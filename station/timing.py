@@ -0,0 +1,133 @@
+"""
+Sampled per-request timings.
+
+``ServerTimingMiddleware`` times a share of the requests
+(``SERVER_TIMING_SAMPLE_RATE``, from 0 to 1) and reports the database time
+and query count, the view code outside the database (mostly serializers),
+rendering and the total in a ``Server-Timing`` header and a
+``request_timing`` log line tagged with the viewset and action. With the
+rate at 0 the middleware is not loaded at all.
+"""
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from station.query_budget import QueryCounter
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = QueryCounter()
+        self.view = ""
+        self.action = ""
+        self.view_start: float | None = None
+        self.view_db = 0.0
+        self.serialize: float | None = None
+        self.render_start: float | None = None
+        self.render: float | None = None
+
+    def view_called(self, view_func, method: str) -> None:
+        cls = getattr(view_func, "cls", None)
+        self.view = cls.__name__ if cls else view_func.__name__
+        actions = getattr(view_func, "actions", None) or {}
+        self.action = actions.get(method.lower(), "")
+        self.view_start = time.perf_counter()
+        self.view_db = self.queries.duration
+
+    def view_returned(self) -> None:
+        now = time.perf_counter()
+        if self.view_start is not None:
+            self.serialize = (
+                now - self.view_start
+                - (self.queries.duration - self.view_db)
+            )
+        self.render_start = now
+
+    def rendered(self) -> None:
+        self.render = time.perf_counter() - self.render_start
+
+    def metrics(self) -> dict[str, float]:
+        """Durations in milliseconds by Server-Timing metric name"""
+        metrics = {"db": self.queries.duration * 1000}
+        if self.serialize is not None:
+            metrics["serialize"] = self.serialize * 1000
+        if self.render is not None:
+            metrics["render"] = self.render * 1000
+        metrics["total"] = (time.perf_counter() - self.start) * 1000
+        return metrics
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings = request._server_timings = RequestTimings()
+        with connection.execute_wrapper(timings.queries):
+            response = self.get_response(request)
+
+        metrics = timings.metrics()
+        parts = [
+            f"{name};dur={duration:.1f}" for name, duration in metrics.items()
+        ]
+        # db comes first
+        parts[0] += f';desc="{timings.queries.count} queries"'
+        header = ", ".join(parts)
+        if response.has_header("Server-Timing"):
+            header = f"{response['Server-Timing']}, {header}"
+        response["Server-Timing"] = header
+
+        self.log(request, response, timings, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = getattr(request, "_server_timings", None)
+        if timings is not None:
+            timings.view_called(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        timings = getattr(request, "_server_timings", None)
+        if timings is not None:
+            timings.view_returned()
+            response.add_post_render_callback(
+                lambda rendered: timings.rendered()
+            )
+        return response
+
+    @staticmethod
+    def log(
+            request, response, timings: RequestTimings, metrics: dict
+    ) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
+
+        fields = {
+            "view": timings.view or "-",
+            "action": timings.action or "-",
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": timings.queries.count,
+        }
+        fields.update(
+            (f"{name}_ms", round(duration, 1))
+            for name, duration in metrics.items()
+        )
+        logger.info(
+            "request_timing %s",
+            " ".join(f"{name}={value}" for name, value in fields.items()),
+            extra={"timing": fields},
+        )
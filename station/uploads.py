@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+from station.exceptions import UploadTooLarge
+
+
+def max_upload_size() -> int:
+    return getattr(settings, "MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """
+    Refuse uploads over MAX_UPLOAD_SIZE: from the Content-Length before
+    any of the body is read, and chunk by chunk for bodies that declare
+    less than they send. Passes the chunks on to the next handler, which
+    writes them to disk.
+    """
+
+    def _refuse(self):
+        raise UploadTooLarge(
+            f"Uploads are limited to {filesizeformat(max_upload_size())}."
+        )
+
+    def handle_raw_input(
+            self, input_data, META, content_length, boundary, encoding=None
+    ):
+        if content_length > max_upload_size():
+            self._refuse()
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes:
+        if start + len(raw_data) > max_upload_size():
+            self._refuse()
+        return raw_data
+
+    def file_complete(self, file_size: int):
+        return None
@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import routers
 
+from station.async_views import concurrent_read_urls
+
 from station.views import (
     TrainTypeViewSet,
     TrainViewSet,
@@ -8,6 +11,8 @@ from station.views import (
     RouteViewSet,
     JourneyViewSet,
     OrderViewSet,
+    SeatHoldViewSet,
+    OrderRequestViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -18,7 +23,14 @@ router.register("stations", StationViewSet)
 router.register("routes", RouteViewSet)
 router.register("journeys", JourneyViewSet)
 router.register("orders", OrderViewSet)
+router.register("holds", SeatHoldViewSet)
+router.register("order_requests", OrderRequestViewSet)
 
 urlpatterns = router.urls
 
+if settings.ASGI_CONCURRENT_READS:
+    urlpatterns = concurrent_read_urls(
+        urlpatterns, ("journeys", "stations", "routes", "trains")
+    )
+
 app_name = "station"
@@ -1,12 +1,17 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Type
 
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import mixins, viewsets, status
 
-from django.db.models import F, Count
+from django.conf import settings
+from django.db.models import Count, F, Max, Prefetch
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
@@ -19,12 +24,40 @@ from station.models import (
     Route,
     Journey,
     Order,
+    Ticket,
+    SeatHold,
+    OrderRequest,
 )
+from station.booking import HoldExpiredError, confirm_hold
+from station.cache import cache_response
+from station.conditional import conditional_get, latest
+from station.exceptions import HoldExpired
+from station.fast_list import FastListMixin
+from station.connections import MAX_TRANSFERS, day_bounds, find_connections
+from station.export import (
+    CONTENT_TYPES,
+    JOURNEY_FIELDS,
+    TICKET_FIELDS,
+    export_response,
+    journey_rows,
+    ticket_rows,
+)
+from station.geo import nearby_stations
+from station.idempotency import idempotent
+from station.intake import enqueue_order
+from station.occupancy import get_bitmap
+from station.pagination import (
+    JourneyPagination,
+    NameKeysetPagination,
+    IdKeysetPagination,
+)
+from station.query_budget import QueryBudgetMixin
 from station.serializers import (
     TrainTypeSerializer,
     TrainSerializer,
     CrewSerializer,
     StationSerializer,
+    NearbyStationSerializer,
     RouteSerializer,
     JourneySerializer,
     TrainListSerializer,
@@ -32,22 +65,57 @@ from station.serializers import (
     RouteListSerializer,
     JourneyListSerializer,
     JourneyDetailSerializer,
+    JourneySeatMapSerializer,
+    ItinerarySerializer,
     OrderSerializer,
     OrderListSerializer,
     TrainImageSerializer,
+    SeatHoldSerializer,
+    OrderIntakeSerializer,
+    OrderRequestSerializer,
+)
+
+EXPORT_OUTPUT_PARAMETER = OpenApiParameter(
+    "output",
+    type=OpenApiTypes.STR,
+    enum=list(CONTENT_TYPES),
+    description="Export format, ndjson by default (ex. ?output=csv)",
 )
 
 
+def export_output(request) -> str:
+    output = request.query_params.get("output", "ndjson")
+    if output not in CONTENT_TYPES:
+        raise ValidationError(
+            {"output": f"Choose one of: {', '.join(CONTENT_TYPES)}."}
+        )
+    return output
+
+
+NEARBY_RADIUS_KM = 50
+NEARBY_MAX_RADIUS_KM = 1000
+NEARBY_MAX_LIMIT = 100
+
+
 class TrainTypeViewSet(
+    QueryBudgetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = TrainType.objects.all()
     serializer_class = TrainTypeSerializer
+    cache_models = (TrainType,)
+    query_budget = {"list": 2}
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
 class TrainViewSet(
+    QueryBudgetMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -55,6 +123,9 @@ class TrainViewSet(
 ):
     queryset = Train.objects.select_related("train_type")
     serializer_class = TrainSerializer
+    cache_models = (Train, TrainType)
+    query_budget = {"list": 2, "retrieve": 2}
+    pagination_class = NameKeysetPagination
 
     @staticmethod
     def _params_to_ints(qs) -> list[int]:
@@ -125,35 +196,167 @@ class TrainViewSet(
             ),
         ]
     )
+    @conditional_get("list_state")
+    @cache_response
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @conditional_get("retrieve_state")
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def list_state(self, request, *args, **kwargs):
+        """Version stamp of every train matching the filters"""
+        state = self.filter_queryset(self.get_queryset()).aggregate(
+            count=Count("id"),
+            updated_at=Max("updated_at"),
+            train_type_updated_at=Max("train_type__updated_at"),
+        )
+        return (
+            tuple(state.values()),
+            latest(state["updated_at"], state["train_type_updated_at"]),
+        )
+
+    def retrieve_state(self, request, *args, **kwargs):
+        try:
+            state = (
+                Train.objects.filter(pk=kwargs["pk"])
+                .values_list("updated_at", "train_type__updated_at")
+                .first()
+            )
+        except (ValueError, TypeError):
+            return None
+
+        return state and (state, latest(*state))
+
 
 class CrewViewSet(
+    QueryBudgetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
+    cache_models = (Crew,)
+    query_budget = {"list": 2}
+    pagination_class = IdKeysetPagination
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
 
 class StationViewSet(
+    QueryBudgetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Station.objects.all()
     serializer_class = StationSerializer
+    cache_models = (Station,)
+    query_budget = {"list": 2, "nearby": 2}
+    pagination_class = NameKeysetPagination
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def get_serializer_class(self) -> Type[
+        NearbyStationSerializer |
+        StationSerializer
+    ]:
+        if self.action == "nearby":
+            return NearbyStationSerializer
+
+        return self.serializer_class
+
+    @staticmethod
+    def _float_param(params, name: str, default=None, low=None, high=None):
+        value = params.get(name, default)
+        if value is None:
+            raise ValidationError({name: "This parameter is required."})
+
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValidationError({name: "A valid number is required."})
+
+        if (low is not None and value < low) or (
+            high is not None and value > high
+        ):
+            raise ValidationError(
+                {name: f"Must be in available range: ({low}, {high})"}
+            )
+
+        return value
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "lat",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Latitude of the point (ex. ?lat=50.45)",
+            ),
+            OpenApiParameter(
+                "lon",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Longitude of the point (ex. ?lon=30.52)",
+            ),
+            OpenApiParameter(
+                "radius",
+                type=OpenApiTypes.FLOAT,
+                description=f"Search radius in km, {NEARBY_RADIUS_KM} by "
+                            f"default (ex. ?radius=25)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description=f"Maximum number of stations, up to "
+                            f"{NEARBY_MAX_LIMIT} (ex. ?limit=5)",
+            ),
+        ],
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def nearby(self, request):
+        """Stations closest to a point with their distance in km"""
+        params = request.query_params
+        lat = self._float_param(params, "lat", low=-90, high=90)
+        lon = self._float_param(params, "lon", low=-180, high=180)
+        radius = self._float_param(
+            params, "radius", default=NEARBY_RADIUS_KM, low=0,
+            high=NEARBY_MAX_RADIUS_KM,
+        )
+        limit = int(self._float_param(
+            params, "limit", default=10, low=1, high=NEARBY_MAX_LIMIT
+        ))
+
+        serializer = self.get_serializer(
+            nearby_stations(lat, lon, radius, limit), many=True
+        )
+        return Response(serializer.data)
 
 
 class RouteViewSet(
+    QueryBudgetMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Route.objects.select_related("source", "destination")
     serializer_class = RouteSerializer
+    cache_models = (Route, Station)
+    query_budget = {"list": 2}
+    pagination_class = IdKeysetPagination
+
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     def get_serializer_class(self) -> Type[
         RouteListSerializer |
@@ -166,6 +369,8 @@ class RouteViewSet(
 
 
 class JourneyViewSet(
+    QueryBudgetMixin,
+    FastListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
@@ -173,33 +378,109 @@ class JourneyViewSet(
 ):
     queryset = (
         Journey.objects.all()
-        .select_related("route__source", "route__destination")
+        .select_related("route__source", "route__destination", "train")
+        .prefetch_related(
+            Prefetch("crew", queryset=Crew.objects.order_by("id"))
+        )
         .annotate(
             tickets_available=(
-                F("train__cargo_num") * F("train__places_in_cargo") - Count("tickets")
+                F("train__cargo_num") * F("train__places_in_cargo")
+                - F("seats_sold")
             )
         )
     )
     serializer_class = JourneySerializer
+    query_budget = {
+        "list": 4,
+        "retrieve": 4,
+        "seat_map": 2,
+        "connections": 3,
+    }
+    pagination_class = JourneyPagination
 
     @staticmethod
     def _params_to_ints(qs) -> list[int]:
         """Converts a list of string IDs to a list of integers"""
         return [int(str_id) for str_id in qs.split(",")]
 
+    @classmethod
+    def _param_to_ids(cls, value: str, name: str) -> list[int]:
+        """Comma separated ids of a filter, 400 when one is not a number"""
+        try:
+            return cls._params_to_ints(value)
+        except ValueError:
+            raise ValidationError({name: "Use comma separated integer ids."})
+
+    @staticmethod
+    def _param_to_datetime(value: str, name: str, end=False) -> datetime:
+        """
+        Parse an ISO 8601 datetime or date; a date stands for the start of
+        that local day, or for the start of the next one when end is set
+        """
+        try:
+            day = parse_date(value)
+            moment = None if day else parse_datetime(value)
+        except ValueError:
+            moment = day = None
+
+        if day:
+            start, stop = day_bounds(day)
+            return stop if end else start
+
+        if moment is None:
+            raise ValidationError(
+                {name: "Use format Y-m-d or Y-m-dTH:M[:S][+HH:MM]."}
+            )
+
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+
+        return moment
+
     def get_queryset(self):
         """Retrieve the journeys with filters"""
+        if self.action == "seat_map":
+            return Journey.objects.select_related("train", "seat_map")
+
+        if self.action == "retrieve":
+            return self.queryset.select_related(
+                "train__train_type"
+            ).prefetch_related("tickets")
+
         departure_time = self.request.query_params.get("departure_time")
+        departure_from = self.request.query_params.get("departure_from")
+        departure_to = self.request.query_params.get("departure_to")
         train = self.request.query_params.get("train")
         route = self.request.query_params.get("route")
+        source = self.request.query_params.get("source")
+        destination = self.request.query_params.get("destination")
 
         queryset = self.queryset
 
+        # Compare departure_time with the bounds of the local day instead
+        # of casting every row with __date, so the index can be used
         if departure_time:
             departure_time = datetime.strptime(
                 departure_time, "%Y-%m-%d"
             ).date()
-            queryset = queryset.filter(departure_time__date=departure_time)
+            start, end = day_bounds(departure_time)
+            queryset = queryset.filter(
+                departure_time__gte=start, departure_time__lt=end
+            )
+
+        if departure_from:
+            queryset = queryset.filter(
+                departure_time__gte=self._param_to_datetime(
+                    departure_from, "departure_from"
+                )
+            )
+
+        if departure_to:
+            queryset = queryset.filter(
+                departure_time__lt=self._param_to_datetime(
+                    departure_to, "departure_to", end=True
+                )
+            )
 
         if train:
             train_ids = self._params_to_ints(train)
@@ -209,12 +490,60 @@ class JourneyViewSet(
             route_ids = self._params_to_ints(route)
             queryset = queryset.filter(route__id__in=route_ids)
 
-        return queryset.distinct()
+        if source:
+            source_ids = self._param_to_ids(source, "source")
+            queryset = queryset.filter(route__source_id__in=source_ids)
+
+        if destination:
+            destination_ids = self._param_to_ids(
+                destination, "destination"
+            )
+            queryset = queryset.filter(
+                route__destination_id__in=destination_ids
+            )
+
+        return queryset
+
+    @conditional_get("retrieve_state")
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def retrieve_state(self, request, *args, **kwargs):
+        """
+        Version stamp of the journey and of everything its detail shows,
+        read in one query without touching tickets
+        """
+        try:
+            state = (
+                Journey.objects.filter(pk=kwargs["pk"])
+                .annotate(
+                    crew_updated_at=Max("crew__updated_at"),
+                    crew_count=Count("crew"),
+                )
+                .values_list(
+                    "version",
+                    "updated_at",
+                    "train__updated_at",
+                    "train__train_type__updated_at",
+                    "route__updated_at",
+                    "route__source__updated_at",
+                    "route__destination__updated_at",
+                    "crew_updated_at",
+                    "crew_count",
+                )
+                .first()
+            )
+        except (ValueError, TypeError):
+            return None
+
+        return state and (state, latest(*state[1:-1]))
 
     def get_serializer_class(self) -> Type[
         JourneyListSerializer |
         JourneyDetailSerializer |
-        JourneySerializer
+        JourneySerializer |
+        JourneySeatMapSerializer |
+        ItinerarySerializer
     ]:
         if self.action == "list":
             return JourneyListSerializer
@@ -222,8 +551,130 @@ class JourneyViewSet(
         if self.action == "retrieve":
             return JourneyDetailSerializer
 
+        if self.action == "seat_map":
+            return JourneySeatMapSerializer
+
+        if self.action == "connections":
+            return ItinerarySerializer
+
         return self.serializer_class
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "encoding",
+                type=OpenApiTypes.STR,
+                enum=["base64", "binary"],
+                description="Return the bitmap as raw bytes instead of JSON "
+                            "(ex. ?encoding=binary)",
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=True, url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """
+        Occupancy of every seat as a bitmap of cargo_num * places_in_cargo
+        bits: seat (cargo, seat) is bit (cargo - 1) * places_in_cargo +
+        (seat - 1), most significant bit of each byte first
+        """
+        journey = self.get_object()
+
+        if request.query_params.get("encoding") == "binary":
+            return HttpResponse(
+                get_bitmap(journey),
+                content_type="application/octet-stream",
+                headers={
+                    "X-Cargo-Num": str(journey.train.cargo_num),
+                    "X-Places-In-Cargo": str(journey.train.places_in_cargo),
+                },
+            )
+
+        serializer = self.get_serializer(journey)
+        return Response(serializer.data)
+
+    def _connection_params(self) -> tuple[int, int, date, int]:
+        params = self.request.query_params
+        errors = {}
+        values = {}
+
+        for name in ("from", "to"):
+            try:
+                values[name] = int(params[name])
+            except KeyError:
+                errors[name] = "This parameter is required."
+            except ValueError:
+                errors[name] = "A valid station id is required."
+
+        try:
+            day = params.get("date")
+            values["date"] = (
+                datetime.strptime(day, "%Y-%m-%d").date() if day
+                else timezone.localdate()
+            )
+        except ValueError:
+            errors["date"] = "Date has wrong format. Use Y-m-d."
+
+        try:
+            values["max_transfers"] = min(
+                int(params.get("max_transfers", 3)), MAX_TRANSFERS
+            )
+        except ValueError:
+            errors["max_transfers"] = "A valid integer is required."
+
+        if errors:
+            raise ValidationError(errors)
+
+        return (
+            values["from"],
+            values["to"],
+            values["date"],
+            values["max_transfers"],
+        )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Departure station id (ex. ?from=1)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.INT,
+                required=True,
+                description="Arrival station id (ex. ?to=3)",
+            ),
+            OpenApiParameter(
+                "date",
+                type=OpenApiTypes.STR,
+                description="Service day in format Y-m-d, today by default "
+                            "(ex. ?date=2024-02-20)",
+            ),
+            OpenApiParameter(
+                "max_transfers",
+                type=OpenApiTypes.INT,
+                description=f"Maximum number of changes, up to "
+                            f"{MAX_TRANSFERS} (ex. ?max_transfers=2)",
+            ),
+        ],
+        responses=ItinerarySerializer(many=True),
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def connections(self, request):
+        """
+        Itineraries from one station to another, possibly changing trains:
+        the first one has the fewest transfers, each next one arrives
+        earlier at the cost of more transfers
+        """
+        origin, destination, day, max_transfers = self._connection_params()
+        itineraries = find_connections(
+            origin, destination, day, max_transfers=max_transfers
+        )
+
+        serializer = self.get_serializer(itineraries, many=True)
+        return Response(serializer.data)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -237,16 +688,56 @@ class JourneyViewSet(
                 description="Filter by departure time in format Y-m-d "
                             "(ex. ?departure_time=2024-02-20)",
             ),
+            OpenApiParameter(
+                "departure_from",
+                type=OpenApiTypes.STR,
+                description="Departing at or after a date or datetime "
+                            "(ex. ?departure_from=2024-02-20T08:00)",
+            ),
+            OpenApiParameter(
+                "departure_to",
+                type=OpenApiTypes.STR,
+                description="Departing before a datetime or until the end "
+                            "of a date (ex. ?departure_to=2024-02-21)",
+            ),
             OpenApiParameter(
                 "route",
                 type={"type": "list", "items": {"type": "number"}},
                 description="Filter by route id (ex. ?route=1,2)",
             ),
+            OpenApiParameter(
+                "source",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by departure station id (ex. ?source=1)",
+            ),
+            OpenApiParameter(
+                "destination",
+                type={"type": "list", "items": {"type": "number"}},
+                description="Filter by arrival station id "
+                            "(ex. ?destination=3,4)",
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[EXPORT_OUTPUT_PARAMETER],
+        responses={(status.HTTP_200_OK, "application/x-ndjson"): str},
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def export(self, request):
+        """
+        Stream every journey matching the list filters as NDJSON or CSV,
+        ordered by departure time
+        """
+        return export_response(
+            JOURNEY_FIELDS,
+            journey_rows(self.filter_queryset(self.get_queryset())),
+            export_output(request),
+            "journeys",
+        )
+
 
 class OrderPagination(PageNumberPagination):
     page_size = 10
@@ -254,21 +745,30 @@ class OrderPagination(PageNumberPagination):
 
 
 class OrderViewSet(
+    QueryBudgetMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
 ):
     queryset = Order.objects.prefetch_related(
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "journey__route__source",
+                "journey__route__destination",
+                "journey__train",
+            ),
+        ),
         "tickets__journey__crew",
-        "tickets__journey__route",
-        "tickets__journey__train"
     )
     pagination_class = OrderPagination
     serializer_class = OrderSerializer
+    query_budget = {"list": 5}
+    throttle_scopes = {"create": "orders"}
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return self.queryset.filter(user=self.request.user)
 
     def get_serializer_class(self) -> Type[
         OrderListSerializer |
@@ -279,5 +779,115 @@ class OrderViewSet(
 
         return self.serializer_class
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description="Retries with the same key and body return the "
+                            "response of the first request instead of "
+                            "ordering again (ex. a UUID)",
+            ),
+        ],
+        responses={
+            status.HTTP_201_CREATED: OrderSerializer,
+            status.HTTP_202_ACCEPTED: OrderRequestSerializer,
+        },
+        description="With ORDER_INTAKE_ASYNC on, the order is queued and "
+                    "202 points to its status.",
+    )
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        if not settings.ORDER_INTAKE_ASYNC:
+            return super().create(request, *args, **kwargs)
+
+        intake = OrderIntakeSerializer(data=request.data)
+        intake.is_valid(raise_exception=True)
+        order_request = enqueue_order(request.user, request.data)
+
+        data = OrderRequestSerializer(
+            order_request, context=self.get_serializer_context()
+        ).data
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": data["url"]},
+        )
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    @extend_schema(
+        parameters=[EXPORT_OUTPUT_PARAMETER],
+        responses={(status.HTTP_200_OK, "application/x-ndjson"): str},
+    )
+    @action(methods=["GET"], detail=False, pagination_class=None)
+    def export(self, request):
+        """Stream the tickets of all your orders as NDJSON or CSV"""
+        return export_response(
+            TICKET_FIELDS,
+            ticket_rows(Ticket.objects.filter(order__user=request.user)),
+            export_output(request),
+            "orders",
+        )
+
+
+class SeatHoldViewSet(
+    QueryBudgetMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = SeatHold.objects.prefetch_related("seats")
+    serializer_class = SeatHoldSerializer
+    query_budget = {"list": 3, "retrieve": 3}
+    throttle_scopes = {"create": "orders", "confirm": "orders"}
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        queryset = self.queryset.filter(user=self.request.user)
+
+        if self.action == "list":
+            queryset = queryset.filter(expires_at__gt=timezone.now())
+
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @extend_schema(
+        request=None,
+        responses={status.HTTP_201_CREATED: OrderSerializer},
+        description="Turn the hold into an order of its seats. "
+                    "An expired hold answers 410.",
+    )
+    @action(methods=["POST"], detail=True, url_path="confirm")
+    def confirm(self, request, pk=None):
+        """Endpoint for buying the held seats"""
+        try:
+            order = confirm_hold(self.get_object())
+        except HoldExpiredError:
+            raise HoldExpired()
+
+        return Response(
+            OrderSerializer(order).data, status=status.HTTP_201_CREATED
+        )
+
+
+class OrderRequestViewSet(
+    QueryBudgetMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Status of an order queued by the asynchronous intake"""
+
+    queryset = OrderRequest.objects.all()
+    serializer_class = OrderRequestSerializer
+    query_budget = {"retrieve": 2}
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
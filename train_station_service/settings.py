@@ -44,12 +44,12 @@ INSTALLED_APPS = [
     "drf_spectacular",
     "station",
     "user",
-    "debug_toolbar",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "station.metrics.MetricsMiddleware",
+    "station.timing.ServerTimingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -58,6 +58,25 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Serve journey and catalog reads from the thread pool under ASGI
+ASGI_CONCURRENT_READS = bool(
+    int(os.environ.get("DJANGO_ASGI_CONCURRENT_READS", default=0))
+)
+
+if ASGI_CONCURRENT_READS:
+    # Sync-only middleware would pin every request to one thread again
+    MIDDLEWARE.remove("station.timing.ServerTimingMiddleware")
+elif DEBUG:
+    # The toolbar costs every request even when hidden, keep it to DEBUG
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(2, "debug_toolbar.middleware.DebugToolbarMiddleware")
+
+# Share of requests, from 0 to 1, timed into a Server-Timing header and a
+# request_timing log line
+SERVER_TIMING_SAMPLE_RATE = float(
+    os.environ.get("DJANGO_SERVER_TIMING_SAMPLE_RATE", default=0)
+)
+
 ROOT_URLCONF = "train_station_service.urls"
 
 TEMPLATES = [
@@ -93,6 +112,44 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Use a shared backend (e.g. DatabaseCache or Memcached) when running
+# several workers, so cached responses and their versions are shared
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "DJANGO_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", default=""),
+    }
+}
+
+# Upper bound for cached catalog responses, they are invalidated by version
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Build journey, train and route lists from values() rows, skipping the
+# model instances and serializer fields
+FAST_LIST_SERIALIZERS = bool(
+    int(os.environ.get("DJANGO_FAST_LIST_SERIALIZERS", default=1))
+)
+
+# Seconds a seat hold keeps its seats before they go back on sale
+SEAT_HOLD_TTL = int(os.environ.get("DJANGO_SEAT_HOLD_TTL", default=600))
+
+# Queue orders for the process_orders command and answer 202 right away
+ORDER_INTAKE_ASYNC = bool(
+    int(os.environ.get("DJANGO_ORDER_INTAKE_ASYNC", default=0))
+)
+
+# Seconds an Idempotency-Key keeps replaying the response of its request
+IDEMPOTENCY_KEY_TTL = int(
+    os.environ.get("DJANGO_IDEMPOTENCY_KEY_TTL", default=60 * 60 * 24)
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -132,6 +189,20 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/vol/web/media"
 
+# Uploads are written to temporary files chunk by chunk, not kept in memory
+FILE_UPLOAD_HANDLERS = [
+    "station.uploads.SizeLimitUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+MAX_UPLOAD_SIZE = int(
+    os.environ.get("DJANGO_MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+)
+
+# Internal location of a front proxy serving MEDIA_ROOT, for example
+# "/protected-media/" with nginx; media views then answer with an
+# X-Accel-Redirect instead of the file
+MEDIA_ACCEL_REDIRECT = os.environ.get("DJANGO_MEDIA_ACCEL_REDIRECT") or None
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -145,17 +216,57 @@ INTERNAL_IPS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "station.permissions.IsAdminOrIfAuthenticatedReadOnly",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "station.throttling.AnonThrottle",
+        "station.throttling.UserThrottle",
+        "station.throttling.ScopedThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "30/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "10/day",
+        "user": "30/day",
+        # Order and hold writes, counted apart from the reads
+        "orders": "10/hour",
+    },
+}
+
+# Cache the throttles count requests in; point it at Redis or Memcached
+# (DJANGO_CACHE_BACKEND) so all workers share one budget
+THROTTLE_CACHE = "default"
+
+# Log every request that runs more queries than its viewset action declares
+QUERY_BUDGET_LOGGING = bool(
+    int(os.environ.get("DJANGO_QUERY_BUDGET_LOGGING", default=0))
+)
+
+# Directory shared by the worker processes of a host, each writes its
+# metrics there and /metrics serves their totals. Unset, /metrics only
+# reports the process that answers it
+METRICS_DIR = os.environ.get("DJANGO_METRICS_DIR") or None
+METRICS_FLUSH_INTERVAL = float(
+    os.environ.get("DJANGO_METRICS_FLUSH_INTERVAL", default=1)
+)
+# Bearer token /metrics asks scrapers for, open when unset
+METRICS_TOKEN = os.environ.get("DJANGO_METRICS_TOKEN") or None
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "station.timing": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
 }
 
 SPECTACULAR_SETTINGS = {
@@ -175,4 +286,10 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": False,
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.UserTokenObtainPairSerializer"
+    ),
 }
+
+# Users whose rows each process keeps for tokens without current claims
+USER_CACHE_SIZE = int(os.environ.get("DJANGO_USER_CACHE_SIZE", 1024))
@@ -0,0 +1,160 @@
+"""
+JWT authentication without a user query per request.
+
+Tokens issued by ``UserRefreshToken`` carry the user's ``email``,
+``is_staff`` and ``is_active`` next to its id, and the version the user had
+when the token was issued. While that version is still current,
+``request.user`` is built from the claims alone, with the other fields
+deferred like ``only()`` would and loaded on first access.
+
+Saving or deleting a user bumps its version in the shared cache, so tokens
+issued before the change, and tokens without the claims, load the user's
+row instead, through a small per-process LRU keyed by the version. With a
+per-process cache such as ``LocMemCache`` the bump is only seen by the
+process that made it, so rows are also reloaded once they are
+``ACCESS_TOKEN_LIFETIME`` old: no process acts on a deactivated user or a
+revoked staff flag for longer than a token issued before the change would.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from station.cache import get_version, model_version_name
+
+VERSION_CLAIM = "user_version"
+# Fields set from the claim of the same name
+CLAIM_FIELDS = ("email", "is_staff", "is_active")
+
+
+def user_version_name(user_id) -> str:
+    return f"{model_version_name(get_user_model())}:{user_id}"
+
+
+def add_user_claims(token, user):
+    for name in CLAIM_FIELDS:
+        token[name] = getattr(user, name)
+    token[VERSION_CLAIM] = get_version(user_version_name(user.pk))
+    return token
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user claims"""
+
+    @classmethod
+    def for_user(cls, user) -> "UserRefreshToken":
+        return add_user_claims(super().for_user(user), user)
+
+
+class UserAccessToken(AccessToken):
+    @classmethod
+    def for_user(cls, user) -> "UserAccessToken":
+        return add_user_claims(super().for_user(user), user)
+
+
+def build_user(fields: dict):
+    """User instance with only the given fields loaded"""
+    model = get_user_model()
+    # from_db takes the values in the order of the model's fields
+    names = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in fields
+    ]
+    return model.from_db(
+        router.db_for_read(model), names, [fields[name] for name in names]
+    )
+
+
+class UserRowCache:
+    """
+    Process-local LRU of user rows tagged with their versions, each kept
+    for at most ACCESS_TOKEN_LIFETIME
+    """
+
+    timer = time.monotonic
+
+    def __init__(self):
+        self._rows: OrderedDict[object, tuple[int, float, dict]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size() -> int:
+        return getattr(settings, "USER_CACHE_SIZE", 1024)
+
+    def get(self, user_id, version: int) -> dict | None:
+        now = self.timer()
+        with self._lock:
+            cached = self._rows.get(user_id)
+            if cached and cached[0] == version and cached[1] > now:
+                self._rows.move_to_end(user_id)
+                return cached[2]
+
+        model = get_user_model()
+        row = (
+            model.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values(*(field.attname for field in model._meta.concrete_fields))
+            .first()
+        )
+        if row is None:
+            return None
+
+        expires = now + api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+        with self._lock:
+            self._rows[user_id] = (version, expires, row)
+            self._rows.move_to_end(user_id)
+            while len(self._rows) > self._size():
+                self._rows.popitem(last=False)
+        return row
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+
+user_rows = UserRowCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash of the row
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        version = get_version(user_version_name(user_id))
+        if validated_token.get(VERSION_CLAIM) == version:
+            fields = {api_settings.USER_ID_FIELD: user_id}
+            fields.update(
+                (name, validated_token[name]) for name in CLAIM_FIELDS
+            )
+        else:
+            fields = user_rows.get(user_id, version)
+            if fields is None:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                )
+
+        if not fields["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return build_user(fields)
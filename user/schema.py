@@ -0,0 +1,7 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Same bearer scheme as the simplejwt authentication it extends"""
+
+    target_class = "user.authentication.CachedJWTAuthentication"
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from train_station_service.settings import AUTH_USER_MODEL
+from user.authentication import UserRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -25,3 +27,9 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issue tokens that authenticate without loading the user"""
+
+    token_class = UserRefreshToken
@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from station.cache import bump_version_on_commit
+from user.authentication import user_version_name
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def bump_user_version(sender, instance, update_fields=None, **kwargs):
+    """Stop trusting the claims of tokens issued before the change"""
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    bump_version_on_commit(user_version_name(instance.pk))